@@ -2,26 +2,44 @@
 Endpoints for document management and retrieval.
 """
 
-from typing import List
+from typing import List, Optional
 import os
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_db
 from app.services.document_service import DocumentService
-from app.schemas.document import DocumentResponse
+from app.services.progress_store import get_progress_store
+from app.schemas.document import DocumentResponse, DocumentSummary
 
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[DocumentResponse])
-async def get_documents(db: AsyncSession = Depends(get_db)):
+@router.get("/", response_model=List[DocumentSummary])
+async def get_documents(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    user_id: Optional[str] = Query(None, description="Only list documents of this user"),
+    status: Optional[str] = Query(None, description="Only list documents with this processing status"),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Retrieve all documents.
+    Retrieve a page of documents, newest first.
+    
+    The cursor for the next page is returned in the ``X-Next-Cursor`` header;
+    the header is absent on the last page.
     """
     document_service = DocumentService(db)
-    documents = await document_service.list_documents()
+    try:
+        documents, next_cursor = await document_service.list_document_summaries(
+            user_id=user_id, limit=limit, cursor=cursor, processing_status=status
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return documents
 
 
@@ -31,7 +49,7 @@ async def get_document(document_id: str, db: AsyncSession = Depends(get_db)):
     Retrieve a single document by ID.
     """
     document_service = DocumentService(db)
-    document = await document_service.get_document(document_id)
+    document = await document_service.get_document(document_id, with_content=True)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     return document
@@ -46,6 +64,7 @@ async def delete_document(document_id: str, db: AsyncSession = Depends(get_db)):
     success = await document_service.delete_document(document_id)
     if not success:
         raise HTTPException(status_code=404, detail="Document not found")
+    await get_progress_store().discard(document_id)
     return {"message": "Document deleted successfully"}
 
 
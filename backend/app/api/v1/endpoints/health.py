@@ -5,7 +5,7 @@ Health check endpoints for monitoring backend status.
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import get_db, check_db_connection
+from app.db.database import get_db, check_db_connection, pool_status
 from app.services.ai_service import get_ai_service
 from app.schemas.common import HealthCheck
 
@@ -43,7 +43,8 @@ async def detailed_health_check(db: AsyncSession = Depends(get_db)):
         "version": "1.0.0",
         "components": {
             "database": {
-                "status": "healthy" if db_healthy else "unhealthy"
+                "status": "healthy" if db_healthy else "unhealthy",
+                **pool_status()
             },
             "ai_service": ai_status
         }
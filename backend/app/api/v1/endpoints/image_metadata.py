@@ -25,7 +25,7 @@ async def get_document_images(document_id: str, db: AsyncSession = Depends(get_d
         ImageMetadataList containing all images in the document
     """
     document_service = DocumentService(db)
-    document = await document_service.get_document(document_id)
+    document = await document_service.get_document(document_id, with_content=True)
     
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -128,7 +128,7 @@ async def analyze_document_images(
         Status message
     """
     document_service = DocumentService(db)
-    document = await document_service.get_document(document_id)
+    document = await document_service.get_document(document_id, with_content=True)
     
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
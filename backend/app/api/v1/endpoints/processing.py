@@ -2,24 +2,37 @@
 Document processing endpoints for AI analysis.
 """
 
-from typing import Optional, Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
+import json
+from typing import Optional, Dict, Any, List
+from uuid import uuid4
+
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from app.db.database import get_db
+from app.core.config import get_settings
+from app.db.database import AsyncSessionLocal, get_db
+from app.models.document import Document
 from app.services.document_service import DocumentService
-from app.services.document_processor import DocumentProcessor
+from app.services.job_queue import JobQueue
+from app.services.processing_runner import FINAL_STATUSES, record_status
+from app.services.progress_broker import get_progress_broker
+from app.services.progress_store import compute_etag, get_progress_store, status_fields
 from app.schemas.document import DocumentResponse
-from pathlib import Path
 
 
 router = APIRouter()
+settings = get_settings()
 
 
 class ProcessingRequest(BaseModel):
     """Request model for document processing."""
     enable_ai_processing: bool = True
+    force_reanalysis: bool = False
+    priority: int = 0
     processing_options: Optional[Dict[str, Any]] = None
 
 
@@ -30,24 +43,138 @@ class ProcessingResponse(BaseModel):
     status: str
 
 
+class BatchProcessingRequest(ProcessingRequest):
+    """Request model for processing many documents at once."""
+    document_ids: List[str] = Field(..., min_length=1)
+    session_id: Optional[str] = None  # Socket.IO room receiving batch updates
+
+
+class BatchProcessingResponse(BaseModel):
+    """Response model for batch processing."""
+    message: str
+    batch_id: str
+    queued: List[str]
+    skipped: List[str]
+    not_found: List[str]
+
+
+@router.post("/batch", response_model=BatchProcessingResponse)
+async def process_batch(
+    request: BatchProcessingRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Queue many documents for processing as one batch.
+    
+    All jobs are queued in a single transaction and share the workers' parser
+    pool and AI scheduler. Aggregate progress is emitted as ``batch_update``
+    Socket.IO events to ``session_id`` (or to a room named after the batch).
+    
+    Args:
+        request: Batch processing configuration
+        db: Database session
+        
+    Returns:
+        BatchProcessingResponse with the batch ID and per-document outcome
+    """
+    document_ids = list(dict.fromkeys(request.document_ids))
+    if len(document_ids) > settings.max_batch_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large. Maximum {settings.max_batch_size} documents allowed"
+        )
+    
+    result = await db.execute(
+        select(Document.id, Document.processing_status)
+        .where(Document.id.in_(document_ids), Document.is_deleted == False)
+    )
+    statuses = dict(result.all())
+    
+    batch_id = str(uuid4())
+    queue = JobQueue()
+    queued, skipped, not_found = [], [], []
+    for document_id in document_ids:
+        if document_id not in statuses:
+            not_found.append(document_id)
+        elif statuses[document_id] in ("queued", "processing"):
+            skipped.append(document_id)
+        else:
+            try:
+                async with db.begin_nested():
+                    await queue.enqueue(
+                        document_id,
+                        payload={
+                            "enable_ai_processing": request.enable_ai_processing,
+                            "force_reanalysis": request.force_reanalysis,
+                            "processing_options": request.processing_options or {},
+                            "session_id": request.session_id
+                        },
+                        priority=request.priority,
+                        batch_id=batch_id,
+                        session=db
+                    )
+            except IntegrityError:
+                # Queued by another request since the status check
+                skipped.append(document_id)
+                continue
+            queued.append(document_id)
+    
+    if queued:
+        await db.execute(
+            update(Document)
+            .where(Document.id.in_(queued))
+            .values(processing_status="queued", processing_error=None)
+        )
+    await db.commit()
+    for document_id in queued:
+        await record_status(document_id, {"processing_status": "queued", "processing_error": None}, progress=0)
+    
+    return BatchProcessingResponse(
+        message=f"{len(queued)} documents queued for processing",
+        batch_id=batch_id,
+        queued=queued,
+        skipped=skipped,
+        not_found=not_found
+    )
+
+
+@router.get("/batch/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """
+    Get aggregate progress of a processing batch.
+    
+    Args:
+        batch_id: ID returned by the batch processing endpoint
+        
+    Returns:
+        Job counts by status
+    """
+    progress = await JobQueue().batch_progress(batch_id)
+    if not progress["total"]:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    return {"batch_id": batch_id, **progress}
+
+
 @router.post("/{document_id}", response_model=ProcessingResponse)
 async def process_document(
     document_id: str, 
     request: ProcessingRequest = ProcessingRequest(),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Process a document with AI analysis.
+    Queue a document for processing with AI analysis.
+    
+    The job is stored in the durable job queue and picked up by a worker
+    process (or the embedded worker), so it survives API restarts.
     
     Args:
         document_id: ID of the document to process
         request: Processing configuration
-        background_tasks: FastAPI background tasks
         db: Database session
         
     Returns:
-        ProcessingResponse indicating processing has started
+        ProcessingResponse indicating processing has been queued
     """
     document_service = DocumentService(db)
     document = await document_service.get_document(document_id)
@@ -55,65 +182,158 @@ async def process_document(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    if document.processing_status == "processing":
+    if document.processing_status in ("queued", "processing"):
         raise HTTPException(status_code=400, detail="Document is already being processed")
     
-    # Start processing in background
-    background_tasks.add_task(
-        _process_document_background,
+    # Queue the job and update the status in one transaction
+    await JobQueue().enqueue(
         document_id,
-        request.enable_ai_processing,
-        request.processing_options or {},
-        db
+        payload={
+            "enable_ai_processing": request.enable_ai_processing,
+            "force_reanalysis": request.force_reanalysis,
+            "processing_options": request.processing_options or {}
+        },
+        priority=request.priority,
+        session=db
     )
-    
-    # Update status immediately
+    try:
+        await db.flush()
+    except IntegrityError:
+        # Another request queued the document since the status check
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Document is already being processed")
     await document_service.update_document(
         document_id,
-        {"processing_status": "processing"}
+        {"processing_status": "queued", "processing_error": None}
     )
+    await record_status(document_id, {"processing_status": "queued", "processing_error": None}, progress=0)
     
     return ProcessingResponse(
-        message="Document processing started",
+        message="Document queued for processing",
         document_id=document_id,
-        status="processing"
+        status="queued"
     )
 
 
 @router.get("/{document_id}/status")
 async def get_processing_status(
     document_id: str,
-    request: Request,
-    db: AsyncSession = Depends(get_db)
+    request: Request
 ):
     """
     Get the processing status of a document.
     
+    Served from the progress store. The database is read the first time a
+    document is polled and, when the store is process-local, on every poll
+    until processing has finished, since the job may run in another process
+    whose updates only reach this one through the database. The response
+    carries an ETag, and requests whose ``If-None-Match`` matches get an
+    empty 304 response.
+    
     Args:
         document_id: ID of the document
-        db: Database session
         
     Returns:
         Processing status information
     """
-    document_service = DocumentService(db)
-    document = await document_service.get_document(document_id)
+    store = get_progress_store()
+    entry = await store.get(document_id)
+    if entry is None or (not store.shared and entry.get("status") not in FINAL_STATUSES):
+        async with AsyncSessionLocal() as db:
+            status = await DocumentService(db).get_document_status(document_id)
+        if not status:
+            raise HTTPException(status_code=404, detail="Document not found")
+        fields = status_fields(status)
+        if fields.get("status") == "completed":
+            fields["progress"] = 100
+        entry = await store.reconcile(document_id, fields)
     
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found")
+    etag = compute_etag(entry)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
     
     # Generate the markdown URL
     markdown_url = str(request.url_for("download_markdown", document_id=document_id))
     
-    return {
-        "document_id": document_id,
-        "status": document.processing_status,
-        "started_at": document.processing_started_at,
-        "completed_at": document.processing_completed_at,
-        "error": document.processing_error,
-        "result": document.extracted_text if document.processing_status == "completed" else None,
-        "markdown_url": markdown_url
-    }
+    return JSONResponse(
+        {
+            "document_id": document_id,
+            "status": entry.get("status"),
+            "stage": entry.get("stage"),
+            "progress": entry.get("progress"),
+            "message": entry.get("message"),
+            "started_at": entry.get("started_at"),
+            "completed_at": entry.get("completed_at"),
+            "error": entry.get("error"),
+            "markdown_size": entry.get("markdown_size"),
+            "markdown_sha256": entry.get("markdown_sha256"),
+            "markdown_url": markdown_url
+        },
+        headers=headers
+    )
+
+
+@router.get("/{document_id}/events")
+async def stream_processing_events(
+    document_id: str,
+    request: Request
+):
+    """
+    Stream a document's processing progress as Server-Sent Events.
+    
+    The current status is sent first as a ``status`` event, followed by
+    ``progress`` events as processing advances and ``status`` events on status
+    changes. The stream ends after the document is completed or failed. Slow
+    clients skip intermediate events rather than delaying processing.
+    
+    Events published by standalone workers reach the stream only when
+    ``PROGRESS_STORE_REDIS_URL`` is set; otherwise the embedded worker must
+    process the document.
+    
+    Args:
+        document_id: ID of the document
+        
+    Returns:
+        text/event-stream response
+    """
+    store = get_progress_store()
+    entry = await store.get(document_id)
+    if entry is None:
+        async with AsyncSessionLocal() as db:
+            status = await DocumentService(db).get_document_status(document_id)
+        if not status:
+            raise HTTPException(status_code=404, detail="Document not found")
+        entry = await store.update(document_id, **status_fields(status))
+    
+    keepalive = settings.progress_keepalive_interval
+    
+    async def events():
+        async with get_progress_broker().subscribe(document_id) as subscription:
+            # Re-read after subscribing so no change between the two is missed
+            current = await store.get(document_id) or entry
+            yield _sse("status", {"documentId": document_id, **current})
+            if current.get("status") in FINAL_STATUSES:
+                return
+            while not subscription.closed:
+                item = await subscription.get(timeout=keepalive)
+                if item is None:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(item["event"], item["data"])
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
 
 @router.get("/{document_id}/result")
@@ -133,7 +353,7 @@ async def get_processing_result(
         Processing result content
     """
     document_service = DocumentService(db)
-    document = await document_service.get_document(document_id)
+    document = await document_service.get_document(document_id, with_content=True)
     
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
@@ -149,67 +369,8 @@ async def get_processing_result(
     
     return {
         "document_id": document_id,
-        "extracted_text": document.extracted_text,
+        "extracted_text": await document_service.read_markdown(document),
         "ai_description": document.ai_description,
         "completed_at": document.processing_completed_at,
         "markdown_url": markdown_url
     }
-
-
-async def _process_document_background(
-    document_id: str,
-    enable_ai_processing: bool,
-    processing_options: Dict[str, Any],
-    db: AsyncSession
-):
-    """
-    Background task for processing documents.
-    
-    Args:
-        document_id: ID of the document to process
-        enable_ai_processing: Whether to enable AI processing
-        processing_options: Processing configuration
-        db: Database session
-    """
-    document_service = DocumentService(db)
-    document_processor = DocumentProcessor()
-    
-    try:
-        document = await document_service.get_document(document_id)
-        if not document:
-            return
-        
-        file_path = Path(document.file_path)
-        
-        # Process the document
-        markdown_content = ""
-        markdown_path = ""
-        async for progress in document_processor.process_document(
-            file_path, 
-            document_id, 
-            enable_ai_processing
-        ):
-            if progress.stage == "completion" and hasattr(progress, 'result'):
-                markdown_content = progress.result
-                markdown_path = progress.details.get("markdown_path", "")
-        
-        # Update document with results
-        await document_service.update_document(
-            document_id,
-            {
-                "processing_status": "completed",
-                "extracted_text": markdown_content,
-                "ai_description": f"Document processed successfully with AI={enable_ai_processing}",
-                "markdown_path": markdown_path
-            }
-        )
-        
-    except Exception as e:
-        # Update document with error
-        await document_service.update_document(
-            document_id,
-            {
-                "processing_status": "failed",
-                "processing_error": str(e)
-            }
-        )
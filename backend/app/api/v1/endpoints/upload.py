@@ -8,8 +8,9 @@ from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import get_db
-from app.services.document_service import DocumentService
+from app.services.document_service import DocumentService, UploadItem
 from app.core.config import get_upload_config
+from app.utils.file_utils import UploadTooLargeError
 from app.schemas.document import DocumentResponse, DocumentCreate
 
 
@@ -35,8 +36,8 @@ async def upload_file(
     """
     upload_config = get_upload_config()
     
-    # Validate file size
-    if file.size > upload_config["max_size"]:
+    # Reject early when the client declared the size; the stream is checked as well
+    if file.size is not None and file.size > upload_config["max_size"]:
         raise HTTPException(
             status_code=413,
             detail=f"File too large. Maximum size is {upload_config['max_size']} bytes"
@@ -50,21 +51,16 @@ async def upload_file(
             detail=f"File type {file_ext} not allowed. Allowed types: {upload_config['allowed_types']}"
         )
     
-    # Read file content
-    try:
-        file_content = await file.read()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to read file: {str(e)}")
-    
-    # Create document using service
+    # Stream file to disk
     document_service = DocumentService(db)
     try:
-        document = await document_service.create_document(
+        document = await document_service.create_document_from_upload(
             filename=file.filename,
-            file_content=file_content,
+            upload=file,
             file_type=file_ext,
             mime_type=file.content_type or "application/octet-stream",
-            user_id=user_id
+            user_id=user_id,
+            max_size=upload_config["max_size"]
         )
         
         return DocumentResponse(
@@ -74,11 +70,16 @@ async def upload_file(
             file_size=document.file_size,
             file_type=document.file_type,
             mime_type=document.mime_type,
+            content_hash=document.content_hash,
             processing_status=document.processing_status,
+            processing_completed_at=document.processing_completed_at,
+            markdown_path=document.markdown_path,
             created_at=document.created_at,
             user_id=document.user_id
         )
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save document: {str(e)}")
 
@@ -108,12 +109,11 @@ async def upload_multiple_files(
             detail=f"Too many files. Maximum is {upload_config['max_files']} files per upload"
         )
     
-    uploaded_documents = []
     document_service = DocumentService(db)
     
     for file in files:
         # Validate each file
-        if file.size > upload_config["max_size"]:
+        if file.size is not None and file.size > upload_config["max_size"]:
             raise HTTPException(
                 status_code=413,
                 detail=f"File {file.filename} too large. Maximum size is {upload_config['max_size']} bytes"
@@ -126,33 +126,43 @@ async def upload_multiple_files(
                 detail=f"File type {file_ext} not allowed for {file.filename}. Allowed types: {upload_config['allowed_types']}"
             )
     
-    # Process all files
-    for file in files:
-        try:
-            file_content = await file.read()
-            file_ext = os.path.splitext(file.filename)[1].lower()
-            
-            document = await document_service.create_document(
-                filename=file.filename,
-                file_content=file_content,
-                file_type=file_ext,
-                mime_type=file.content_type or "application/octet-stream",
-                user_id=user_id
-            )
-            
-            uploaded_documents.append(DocumentResponse(
-                id=document.id,
-                filename=document.filename,
-                original_filename=document.original_filename,
-                file_size=document.file_size,
-                file_type=document.file_type,
-                mime_type=document.mime_type,
-                processing_status=document.processing_status,
-                created_at=document.created_at,
-                user_id=document.user_id
-            ))
-            
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to process file {file.filename}: {str(e)}")
+    # Store all files concurrently and insert their records together
+    try:
+        documents = await document_service.create_documents_from_uploads(
+            [
+                UploadItem(
+                    filename=file.filename,
+                    upload=file,
+                    file_type=os.path.splitext(file.filename)[1].lower(),
+                    mime_type=file.content_type or "application/octet-stream"
+                )
+                for file in files
+            ],
+            user_id=user_id,
+            max_size=upload_config["max_size"],
+            max_concurrency=upload_config["max_concurrency"]
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to process files: {str(e)}")
+    
+    uploaded_documents = [
+        DocumentResponse(
+            id=document.id,
+            filename=document.filename,
+            original_filename=document.original_filename,
+            file_size=document.file_size,
+            file_type=document.file_type,
+            mime_type=document.mime_type,
+            content_hash=document.content_hash,
+            processing_status=document.processing_status,
+            processing_completed_at=document.processing_completed_at,
+            markdown_path=document.markdown_path,
+            created_at=document.created_at,
+            user_id=document.user_id
+        )
+        for document in documents
+    ]
     
     return uploaded_documents
@@ -26,10 +26,51 @@ class Settings(BaseSettings):
     openai_max_retries: int = Field(default=3, description="Maximum number of retry attempts")
     openai_retry_delay: float = Field(default=1.0, description="Initial retry delay in seconds")
     openai_timeout: int = Field(default=30, description="Request timeout in seconds")
+    openai_max_concurrency: int = Field(default=8, description="Maximum concurrent Vision API requests per process")
+    openai_requests_per_minute: int = Field(default=500, description="Vision API request budget per minute (0 disables)")
+    openai_tokens_per_minute: int = Field(default=0, description="Vision API token budget per minute; set to your account tier's limit (0 disables)")
+    
+    # AI analysis cache settings
+    ai_cache_enabled: bool = Field(default=True, description="Cache structured image analyses across documents and runs")
+    ai_cache_path: str = Field(default="./temp/ai_cache.sqlite3", description="SQLite database file for the AI analysis cache")
+    ai_cache_ttl_seconds: int = Field(default=30 * 24 * 3600, description="Lifetime of cached analyses in seconds (0 disables expiry)")
+    ai_cache_max_entries: int = Field(default=50000, description="Maximum number of cached analyses before LRU eviction")
     
     # OCR settings
     ocr_fallback_enabled: bool = Field(default=True, description="Enable OCR fallback when Vision API fails")
     tesseract_path: Optional[str] = Field(default=None, description="Path to Tesseract executable")
+    ocr_max_workers: int = Field(default=2, description="Maximum number of concurrent OCR jobs")
+    ocr_timeout: float = Field(default=30.0, description="Per-image OCR timeout in seconds (0 disables)")
+    ocr_language: str = Field(default="eng", description="Tesseract language code")
+    
+    # PDF parsing settings
+    pdf_parse_workers: int = Field(default=0, description="Worker processes for page-parallel PDF parsing (0 disables)")
+    pdf_pages_per_shard: int = Field(default=16, description="Maximum number of pages handed to one parse worker at a time")
+    pdf_parallel_min_pages: int = Field(default=32, description="Minimum page count before PDF parsing is sharded")
+    pdf_layout_cache_size: int = Field(default=0, description="Decoded PDF page layouts kept in memory per process (0 disables)")
+    pdf_paragraph_coalescing: bool = Field(default=True, description="Merge wrapped PDF text lines into paragraphs")
+    pdf_table_detection: bool = Field(default=True, description="Detect PDF tables from ruling lines and whitespace-aligned columns")
+    pdf_ocr_enabled: bool = Field(default=False, description="OCR PDF pages that have no text layer locally with Tesseract")
+    pdf_ocr_dpi: int = Field(default=300, description="Resolution used to rasterise PDF pages for OCR")
+    
+    # Job queue settings
+    job_lease_seconds: float = Field(default=120.0, description="Lease length of a claimed processing job in seconds")
+    job_retry_delay: float = Field(default=10.0, description="Base delay before retrying a failed job in seconds (doubled per attempt)")
+    job_max_attempts: int = Field(default=3, description="Attempts before a processing job is marked failed")
+    worker_concurrency: int = Field(default=2, description="Processing jobs run concurrently by one worker")
+    worker_poll_interval: float = Field(default=1.0, description="Seconds a worker waits when the job queue is empty")
+    embedded_worker_enabled: bool = Field(default=True, description="Run a job queue worker inside the API process")
+    max_batch_size: int = Field(default=500, description="Maximum number of documents in one batch processing request")
+    
+    # Progress update settings
+    progress_max_pending: int = Field(default=1000, description="Documents with undelivered progress events before stale events are dropped")
+    progress_http_timeout: float = Field(default=5.0, description="Timeout for progress updates posted to the frontend in seconds")
+    progress_subscriber_queue_size: int = Field(default=100, description="Undelivered events kept per progress stream subscriber")
+    progress_http_enabled: bool = Field(default=True, description="Also post progress events to the frontend over HTTP")
+    progress_keepalive_interval: float = Field(default=15.0, description="Seconds between keep-alive comments on progress event streams")
+    progress_store_max_entries: int = Field(default=10000, description="Documents whose latest progress is kept in memory")
+    progress_store_ttl: float = Field(default=3600.0, description="Seconds the latest progress of a document is kept")
+    progress_store_redis_url: str = Field(default="", description="Redis URL for sharing progress and progress events between processes (empty keeps them in-process)")
     
     # CORS settings
     cors_origins: str = Field(
@@ -40,6 +81,9 @@ class Settings(BaseSettings):
     # Upload settings
     max_upload_size: int = Field(default=10 * 1024 * 1024, description="Maximum upload size in bytes (10MB)")
     max_files_per_upload: int = Field(default=5, description="Maximum number of files per upload")
+    upload_chunk_size: int = Field(default=1024 * 1024, description="Bytes read per chunk when streaming uploads to disk")
+    upload_max_concurrency: int = Field(default=4, description="Maximum number of files of a multi-file upload written at once")
+    upload_dedup_enabled: bool = Field(default=True, description="Reuse stored files and parse results of identical completed uploads")
     allowed_file_types: List[str] = Field(
         default=[".pdf", ".docx", ".txt", ".md", ".doc"],
         description="Allowed file extensions"
@@ -49,6 +93,9 @@ class Settings(BaseSettings):
     temp_dir: str = Field(default="./temp", description="Temporary directory for file processing")
     upload_dir: str = Field(default="./uploads", description="Directory for uploaded files")
     markdown_dir: str = Field(default="./markdown", description="Directory for generated markdown files")
+    markdown_flush_size: int = Field(default=256 * 1024, description="Bytes of generated markdown buffered before flushing to disk")
+    blob_store_dir: str = Field(default="./temp/blobs", description="Directory for blobs spilled from memory")
+    blob_store_memory_limit: int = Field(default=256 * 1024 * 1024, description="Memory budget for in-memory blobs in bytes")
     
     # Server settings
     host: str = Field(default="0.0.0.0", description="Server host")
@@ -56,6 +103,15 @@ class Settings(BaseSettings):
     
     # Database settings
     database_url: str = Field(default="sqlite:///./docparser.db", description="Database URL")
+    db_pool_size: int = Field(default=10, description="Connections kept open in the database pool")
+    db_max_overflow: int = Field(default=20, description="Extra connections opened beyond the pool size under load")
+    db_pool_timeout: float = Field(default=30.0, description="Seconds to wait for a pooled connection")
+    db_pool_recycle: int = Field(default=1800, description="Seconds after which pooled connections are replaced (-1 disables)")
+    db_pool_pre_ping: bool = Field(default=True, description="Test pooled connections before use")
+    sqlite_journal_mode: str = Field(default="WAL", description="SQLite journal mode")
+    sqlite_synchronous: str = Field(default="NORMAL", description="SQLite synchronous setting")
+    sqlite_busy_timeout: int = Field(default=5000, description="Milliseconds SQLite waits for a lock before failing")
+    sqlite_mmap_size: int = Field(default=256 * 1024 * 1024, description="Bytes of the SQLite database file memory-mapped")
     
     # Logging settings
     log_level: str = Field(default="INFO", description="Logging level")
@@ -151,11 +207,44 @@ def get_openai_config() -> dict:
         "max_retries": settings.openai_max_retries,
         "retry_delay": settings.openai_retry_delay,
         "timeout": settings.openai_timeout,
+        "max_concurrency": settings.openai_max_concurrency,
+        "requests_per_minute": settings.openai_requests_per_minute,
+        "tokens_per_minute": settings.openai_tokens_per_minute,
+        "cache_enabled": settings.ai_cache_enabled,
+        "cache_path": settings.ai_cache_path,
+        "cache_ttl_seconds": settings.ai_cache_ttl_seconds,
+        "cache_max_entries": settings.ai_cache_max_entries,
         "ocr_fallback_enabled": settings.ocr_fallback_enabled,
         "tesseract_path": settings.tesseract_path,
     }
 
 
+def get_ocr_config() -> dict:
+    """Get OCR configuration."""
+    return {
+        "max_workers": settings.ocr_max_workers,
+        "timeout": settings.ocr_timeout,
+        "language": settings.ocr_language,
+        "tesseract_path": settings.tesseract_path,
+    }
+
+
+def get_pdf_parser_config() -> dict:
+    """Get PDF parser configuration."""
+    return {
+        "parallel_workers": settings.pdf_parse_workers,
+        "pages_per_shard": settings.pdf_pages_per_shard,
+        "parallel_min_pages": settings.pdf_parallel_min_pages,
+        "layout_cache_size": settings.pdf_layout_cache_size,
+        "paragraph_coalescing": settings.pdf_paragraph_coalescing,
+        "table_detection": settings.pdf_table_detection,
+        "ocr_enabled": settings.pdf_ocr_enabled,
+        "ocr_dpi": settings.pdf_ocr_dpi,
+        "ocr_language": settings.ocr_language,
+        "ocr_timeout": settings.ocr_timeout,
+    }
+
+
 def get_cors_config() -> dict:
     """Get CORS configuration."""
     return {
@@ -163,6 +252,7 @@ def get_cors_config() -> dict:
         "allow_credentials": True,
         "allow_methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
         "allow_headers": ["*"],
+        "expose_headers": ["X-Next-Cursor"],
     }
 
 
@@ -171,6 +261,9 @@ def get_upload_config() -> dict:
     return {
         "max_size": settings.max_upload_size,
         "max_files": settings.max_files_per_upload,
+        "chunk_size": settings.upload_chunk_size,
+        "max_concurrency": settings.upload_max_concurrency,
+        "dedup_enabled": settings.upload_dedup_enabled,
         "allowed_types": settings.allowed_file_types,
         "temp_dir": settings.temp_dir,
         "upload_dir": settings.upload_dir,
@@ -181,6 +274,16 @@ def get_database_config() -> dict:
     """Get database configuration."""
     return {
         "url": settings.database_url,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "sqlite_journal_mode": settings.sqlite_journal_mode,
+        "sqlite_synchronous": settings.sqlite_synchronous,
+        "sqlite_busy_timeout": settings.sqlite_busy_timeout,
+        "sqlite_mmap_size": settings.sqlite_mmap_size,
+        "echo": settings.debug,
     }
 
 
@@ -4,13 +4,14 @@ Uses SQLAlchemy with async support.
 """
 
 import asyncio
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import text
+from sqlalchemy import event, make_url, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from app.core.config import get_settings
+from app.core.config import get_database_config, get_settings
 
 
 settings = get_settings()
@@ -21,12 +22,119 @@ class Base(DeclarativeBase):
     pass
 
 
+def async_database_url(url: str) -> str:
+    """
+    Map a database URL to its async driver.
+    
+    Args:
+        url: Database URL, e.g. ``sqlite:///./docparser.db`` or ``postgresql://...``
+        
+    Returns:
+        URL using aiosqlite or asyncpg; URLs naming a driver are returned unchanged
+    """
+    for prefix, async_prefix in (
+        ("sqlite://", "sqlite+aiosqlite://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+    ):
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+def _set_sqlite_pragmas(dbapi_connection, config: Dict[str, Any], in_memory: bool) -> None:
+    """Apply the configured pragmas to a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        if not in_memory:
+            # WAL lets readers proceed while a writer holds the lock
+            cursor.execute(f"PRAGMA journal_mode={config['sqlite_journal_mode']}")
+            cursor.execute(f"PRAGMA mmap_size={int(config['sqlite_mmap_size'])}")
+        cursor.execute(f"PRAGMA synchronous={config['sqlite_synchronous']}")
+        cursor.execute(f"PRAGMA busy_timeout={int(config['sqlite_busy_timeout'])}")
+    finally:
+        cursor.close()
+
+
+def build_engine(config: Optional[Dict[str, Any]] = None) -> AsyncEngine:
+    """
+    Create the async engine for the configured database.
+    
+    SQLite connections get WAL journaling, ``synchronous``, ``busy_timeout``
+    and mmap pragmas so concurrent workers wait for locks instead of failing.
+    Server databases such as PostgreSQL get a sized, pre-pinged and recycled
+    connection pool.
+    
+    Args:
+        config: Database configuration; defaults to ``get_database_config()``
+        
+    Returns:
+        AsyncEngine instance
+    """
+    config = {**get_database_config(), **(config or {})}
+    url = make_url(async_database_url(config["url"]))
+    kwargs: Dict[str, Any] = {"echo": config.get("echo", False), "future": True}
+    
+    if url.get_backend_name() == "sqlite":
+        in_memory = url.database in (None, "", ":memory:")
+        if not in_memory:
+            # aiosqlite defaults to opening a connection per checkout; pool them
+            # so pragmas are applied once per connection
+            kwargs.update(
+                poolclass=AsyncAdaptedQueuePool,
+                pool_size=config["pool_size"],
+                max_overflow=config["max_overflow"],
+                pool_timeout=config["pool_timeout"],
+            )
+        kwargs["connect_args"] = {"timeout": config["sqlite_busy_timeout"] / 1000}
+        engine = create_async_engine(url, **kwargs)
+        
+        @event.listens_for(engine.sync_engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            _set_sqlite_pragmas(dbapi_connection, config, in_memory)
+        
+        return engine
+    
+    kwargs.update(
+        pool_size=config["pool_size"],
+        max_overflow=config["max_overflow"],
+        pool_timeout=config["pool_timeout"],
+        pool_recycle=config["pool_recycle"],
+        pool_pre_ping=config["pool_pre_ping"],
+    )
+    if url.get_backend_name() == "postgresql":
+        kwargs["connect_args"] = {"server_settings": {"application_name": "docparser"}}
+    return create_async_engine(url, **kwargs)
+
+
+def pool_status(db_engine: Optional[AsyncEngine] = None) -> Dict[str, Any]:
+    """
+    Get connection pool utilisation.
+    
+    Args:
+        db_engine: Engine to inspect; defaults to the application engine
+        
+    Returns:
+        Dictionary with the pool class and, for sized pools, connection counts
+    """
+    pool = (db_engine or engine).pool
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    if all(hasattr(pool, name) for name in ("size", "checkedin", "checkedout", "overflow")):
+        size = pool.size()
+        checked_out = pool.checkedout()
+        capacity = size + max(getattr(pool, "_max_overflow", 0), 0)
+        status.update(
+            size=size,
+            checked_in=pool.checkedin(),
+            checked_out=checked_out,
+            overflow=max(pool.overflow(), 0),
+            utilisation=round(checked_out / capacity, 3) if capacity else 0.0,
+        )
+    return status
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.database_url.replace("sqlite:///", "sqlite+aiosqlite:///"),
-    echo=settings.debug,
-    future=True
-)
+engine = build_engine()
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -3,6 +3,7 @@ Main FastAPI application for Document Parser Backend.
 Provides comprehensive document processing and AI-powered analysis.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -16,6 +17,13 @@ from app.core.config import get_settings, get_cors_config
 from app.core.logging import setup_logging
 from app.services.ai_service import shutdown_ai_service
 from app.db.database import init_db, close_db
+from app.parsers.process_pool import shutdown_process_pool
+from app.services.ocr_pool import shutdown_ocr_pool
+from app.services.progress_broker import shutdown_progress_broker
+from app.services.progress_emitter import shutdown_progress_emitter
+from app.services.progress_store import shutdown_progress_store
+from app.socketio import mount_socketio
+from app.worker import Worker
 
 
 # Initialize settings
@@ -36,11 +44,27 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("Database initialized")
     
+    # Process queued jobs in this process unless dedicated workers are used
+    worker = None
+    worker_task = None
+    if settings.embedded_worker_enabled:
+        worker = Worker()
+        worker_task = asyncio.create_task(worker.run())
+        logger.info("Embedded processing worker started")
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Document Parser Backend...")
+    if worker is not None:
+        worker.stop()
+        await worker_task
+    await shutdown_progress_emitter()
+    await shutdown_progress_broker()
+    await shutdown_progress_store()
     await shutdown_ai_service()
+    shutdown_process_pool()
+    shutdown_ocr_pool()
     await close_db()
     logger.info("Backend shutdown complete")
 
@@ -111,6 +135,9 @@ async def health_check():
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
+# Socket.IO for pushed progress events
+mount_socketio(app)
+
 
 if __name__ == "__main__":
     import uvicorn
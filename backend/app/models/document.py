@@ -2,22 +2,32 @@
 Document model for storing document metadata and processing results.
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from uuid import uuid4
 
-from sqlalchemy import String, Text, DateTime, JSON, Integer, Boolean
+from sqlalchemy import String, Text, DateTime, JSON, Integer, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from app.db.database import Base
 
 
+# Deferred group of the large text and JSON columns
+CONTENT_GROUP = "content"
+
+
 class Document(Base):
     """
     Document model for storing uploaded documents and their processing results.
     """
     __tablename__ = "documents"
+    __table_args__ = (
+        # Keyset pagination of the document list, optionally per user
+        Index("ix_documents_listing", "is_deleted", "created_at", "id"),
+        Index("ix_documents_user_listing", "user_id", "is_deleted", "created_at", "id"),
+        Index("ix_documents_processing_status", "processing_status"),
+    )
     
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -25,6 +35,7 @@ class Document(Base):
     file_size: Mapped[int] = mapped_column(Integer, nullable=False)
     file_type: Mapped[str] = mapped_column(String(50), nullable=False)
     mime_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), index=True)
     
     # File storage information
     file_path: Mapped[str] = mapped_column(String(500), nullable=False)
@@ -37,17 +48,34 @@ class Document(Base):
     processing_completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     processing_error: Mapped[Optional[str]] = mapped_column(Text)
     
-    # Extracted content
-    extracted_text: Mapped[Optional[str]] = mapped_column(Text)
-    ai_description: Mapped[Optional[str]] = mapped_column(Text)
-    ai_summary: Mapped[Optional[str]] = mapped_column(Text)
+    # Extracted content; the markdown itself lives in the file at markdown_path.
+    # Large columns are deferred and raise if read without being loaded, so
+    # status and listing queries never pull them in by accident; use
+    # ``undefer_group(CONTENT_GROUP)`` to load them.
+    markdown_size: Mapped[Optional[int]] = mapped_column(Integer)
+    markdown_sha256: Mapped[Optional[str]] = mapped_column(String(64))
+    extracted_text: Mapped[Optional[str]] = mapped_column(
+        Text, deferred=True, deferred_group=CONTENT_GROUP, deferred_raiseload=True
+    )
+    ai_description: Mapped[Optional[str]] = mapped_column(
+        Text, deferred=True, deferred_group=CONTENT_GROUP, deferred_raiseload=True
+    )
+    ai_summary: Mapped[Optional[str]] = mapped_column(
+        Text, deferred=True, deferred_group=CONTENT_GROUP, deferred_raiseload=True
+    )
     
     # Metadata and analysis results
-    document_metadata: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, default=dict)
-    analysis_results: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, default=dict)
+    document_metadata: Mapped[Optional[Dict[str, Any]]] = mapped_column(
+        JSON, default=dict, deferred=True, deferred_group=CONTENT_GROUP, deferred_raiseload=True
+    )
+    analysis_results: Mapped[Optional[Dict[str, Any]]] = mapped_column(
+        JSON, default=dict, deferred=True, deferred_group=CONTENT_GROUP, deferred_raiseload=True
+    )
     
     # Processing configuration
-    processing_options: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, default=dict)
+    processing_options: Mapped[Optional[Dict[str, Any]]] = mapped_column(
+        JSON, default=dict, deferred=True, deferred_group=CONTENT_GROUP, deferred_raiseload=True
+    )
     
     # Quality metrics
     confidence_score: Mapped[Optional[float]] = mapped_column()
@@ -57,7 +85,13 @@ class Document(Base):
     user_id: Mapped[Optional[str]] = mapped_column(String(36))
     
     # Timestamps
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Set in Python so timestamps keep sub-second precision and a uniform format,
+    # which keyset pagination on (created_at, id) relies on
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now()
+    )
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Soft delete
@@ -68,7 +102,7 @@ class Document(Base):
         return f"<Document(id={self.id}, filename={self.filename}, status={self.processing_status})>"
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert document to dictionary representation."""
+        """Convert document to dictionary representation; requires the content group to be loaded."""
         return {
             "id": self.id,
             "filename": self.filename,
@@ -76,6 +110,7 @@ class Document(Base):
             "file_size": self.file_size,
             "file_type": self.file_type,
             "mime_type": self.mime_type,
+            "content_hash": self.content_hash,
             "processing_status": self.processing_status,
             "processing_started_at": self.processing_started_at.isoformat() if self.processing_started_at else None,
             "processing_completed_at": self.processing_completed_at.isoformat() if self.processing_completed_at else None,
@@ -84,6 +119,8 @@ class Document(Base):
             "ai_description": self.ai_description,
             "ai_summary": self.ai_summary,
             "markdown_path": self.markdown_path,
+            "markdown_size": self.markdown_size,
+            "markdown_sha256": self.markdown_sha256,
             "document_metadata": self.document_metadata or {},
             "analysis_results": self.analysis_results or {},
             "confidence_score": self.confidence_score,
@@ -6,33 +6,62 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 from uuid import uuid4
 
-from sqlalchemy import String, DateTime, JSON, Integer
+from sqlalchemy import String, DateTime, JSON, Integer, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from app.db.database import Base
 
 
+# Jobs a worker holds or will claim
+ACTIVE_JOB = "status IN ('pending', 'running')"
+
+
 class ProcessingJob(Base):
     """
     Processing job model for tracking document processing tasks.
+    
+    Rows double as a durable job queue: workers claim pending jobs in priority
+    order under a lease that they keep alive with heartbeats. A document has
+    at most one pending or running job.
     """
     __tablename__ = "processing_jobs"
+    __table_args__ = (
+        Index("ix_processing_jobs_claim", "status", "priority", "run_after"),
+        Index("ix_processing_jobs_document_id", "document_id"),
+        Index("ix_processing_jobs_batch_id", "batch_id"),
+        Index(
+            "uq_processing_jobs_active_document",
+            "document_id",
+            unique=True,
+            sqlite_where=text(ACTIVE_JOB),
+            postgresql_where=text(ACTIVE_JOB)
+        ),
+    )
     
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     document_id: Mapped[str] = mapped_column(String(36), nullable=False)
     job_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    batch_id: Mapped[Optional[str]] = mapped_column(String(36))
     status: Mapped[str] = mapped_column(String(50), default="pending")
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     error_message: Mapped[Optional[str]] = mapped_column(String(500))
     
-    # Results and outputs
+    # Job input and results
+    payload: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, default=dict)
     result_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, default=dict)
     
     # Metadata
     priority: Mapped[Optional[int]] = mapped_column(Integer, default=0)
     attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3)
+    
+    # Queue state
+    run_after: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    worker_id: Mapped[Optional[str]] = mapped_column(String(100))
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -47,6 +76,7 @@ class ProcessingJob(Base):
             "id": self.id,
             "document_id": self.document_id,
             "job_type": self.job_type,
+            "batch_id": self.batch_id,
             "status": self.status,
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
@@ -54,6 +84,10 @@ class ProcessingJob(Base):
             "result_data": self.result_data or {},
             "priority": self.priority,
             "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "run_after": self.run_after.isoformat() if self.run_after else None,
+            "worker_id": self.worker_id,
+            "heartbeat_at": self.heartbeat_at.isoformat() if self.heartbeat_at else None,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
         }
@@ -4,10 +4,11 @@ Handles images and math blocks using AI services.
 """
 
 import asyncio
-from typing import List, Optional, AsyncGenerator
+from typing import Dict, List, Optional, AsyncGenerator
 
 from ..services.ai_service import get_ai_service
-from .ast_models import DocumentAST, ImageBlock, MathBlock, ParseProgress
+from ..utils.blob_store import BlobStore
+from .ast_models import DocumentAST, ImageBlock, MathBlock, ParseProgress, bbox_position
 
 
 class AIProcessor:
@@ -16,7 +17,9 @@ class AIProcessor:
     async def process_ast(
         self, 
         ast: DocumentAST, 
-        progress_callback: Optional[AsyncGenerator[ParseProgress, None]] = None
+        progress_callback: Optional[AsyncGenerator[ParseProgress, None]] = None,
+        force_reanalysis: bool = False,
+        analyses: Optional[Dict[str, dict]] = None
     ) -> DocumentAST:
         """
         Process document AST and enhance with AI-generated content.
@@ -24,6 +27,10 @@ class AIProcessor:
         Args:
             ast: Document AST to process
             progress_callback: Optional progress callback
+            force_reanalysis: Bypass cached image analyses
+            analyses: Image analyses already made for the document, by content
+                digest; pass the same dictionary for every fragment of a
+                document so repeated images are analysed once per document
             
         Returns:
             Enhanced DocumentAST with AI-generated descriptions
@@ -36,7 +43,7 @@ class AIProcessor:
             ))
 
         # Process images
-        await self._process_images(ast.images, progress_callback)
+        await self._process_images(ast.images, progress_callback, force_reanalysis, analyses)
         
         # Process math blocks
         await self._process_math(ast.math, progress_callback)
@@ -53,71 +60,121 @@ class AIProcessor:
     async def _process_images(
         self, 
         images: List[ImageBlock], 
-        progress_callback: Optional[AsyncGenerator[ParseProgress, None]] = None
+        progress_callback: Optional[AsyncGenerator[ParseProgress, None]] = None,
+        force_reanalysis: bool = False,
+        analyses: Optional[Dict[str, dict]] = None
     ) -> None:
-        """Process image blocks with AI descriptions."""
+        """
+        Process image blocks with AI descriptions.
+        
+        Images are grouped by content digest so repeated images (logos, headers)
+        are analysed once and the result is fanned out to every occurrence.
+        Analyses are recorded in ``analyses`` and reused for later fragments.
+        """
         if not images:
             return
 
         ai_service = await get_ai_service()
         
-        # Process images in batches to avoid overwhelming the API
-        batch_size = 5
-        for i in range(0, len(images), batch_size):
-            batch = images[i:i + batch_size]
-            
-            # Process batch concurrently
-            tasks = []
-            for image in batch:
-                if not image.alt_text or image.alt_text.startswith("Image from"):
-                    # Only process if no meaningful alt text exists
-                    tasks.append(self._describe_image(ai_service, image))
-            
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
+        # Only process images without meaningful alt text, grouped by content
+        groups: Dict[str, List[ImageBlock]] = {}
+        for image in images:
+            if not image.alt_text or image.alt_text.startswith("Image from"):
+                groups.setdefault(self._content_key(image), []).append(image)
+        if not groups:
+            return
+        
+        # Images seen in earlier fragments of the document reuse their analysis
+        if analyses is None:
+            analyses = {}
+        for digest in [digest for digest in groups if digest in analyses]:
+            for image in groups.pop(digest):
+                self._apply_metadata(image, ai_service.apply_image_context(analyses[digest], self._image_context(image)))
+        if not groups:
+            return
+        
+        # Submit every unique image at once; the AI service scheduler bounds
+        # concurrency and rate across all documents in the process
+        tasks = [
+            asyncio.ensure_future(self._describe_images(ai_service, digest, occurrences, force_reanalysis, analyses))
+            for digest, occurrences in groups.items()
+        ]
+        
+        for completed, task in enumerate(asyncio.as_completed(tasks), start=1):
+            await task
             
             # Update progress
             if progress_callback:
-                progress = min((i + batch_size) / len(images), 1.0)
                 await progress_callback.asend(ParseProgress(
                     stage="ai_image_processing",
-                    progress=progress,
-                    message=f"Processing images: {min(i + batch_size, len(images))}/{len(images)}"
+                    progress=completed / len(tasks),
+                    message=f"Processing images: {completed}/{len(tasks)}"
                 ))
 
-    async def _describe_image(self, ai_service, image: ImageBlock) -> None:
-        """Generate AI description for a single image."""
+    def _content_key(self, image: ImageBlock) -> str:
+        """Get the content digest identifying an image."""
+        return image.ref or BlobStore.digest(image.get_bytes())
+
+    def _image_context(self, image: ImageBlock) -> dict:
+        """Build the analysis context for one image occurrence."""
+        context = {
+            "filename": image.source if hasattr(image, 'source') else "unknown",
+            "page": image.page if hasattr(image, 'page') else 0,
+            "section": image.section if hasattr(image, 'section') else "",
+            "index": image.index if hasattr(image, 'index') else 0
+        }
+        _, box = bbox_position(image.bbox)
+        if box is not None:
+            context["location"] = {"x": box[0], "y": box[1], "width": box[2] - box[0], "height": box[3] - box[1]}
+        return context
+
+    async def _describe_images(
+        self,
+        ai_service,
+        digest: str,
+        images: List[ImageBlock],
+        force_reanalysis: bool = False,
+        analyses: Optional[Dict[str, dict]] = None
+    ) -> None:
+        """Generate an AI description once and apply it to all occurrences of an image."""
         try:
-            # Use the new analyze_image_structured method
-            context = {
-                "filename": image.source if hasattr(image, 'source') else "unknown",
-                "page": image.page if hasattr(image, 'page') else 0,
-                "section": image.section if hasattr(image, 'section') else "",
-                "index": image.index if hasattr(image, 'index') else 0
-            }
-            
-            # Get structured metadata
-            metadata = await ai_service.analyze_image_structured(image.data, context)
-            
-            # Store structured metadata in image object
-            if hasattr(image, 'metadata'):
-                image.metadata = metadata
-            
-            # Set alt text from the description
-            image.alt_text = metadata.get('description', '') or metadata.get('aiAnnotations', {}).get('explanationGenerated', '')
-            
-            # If no description, try to use OCR text
-            if not image.alt_text:
-                ocr_text = metadata.get('aiAnnotations', {}).get('ocrText', '')
-                if ocr_text:
-                    image.alt_text = f"Text in image: {ocr_text}"
-                else:
-                    image.alt_text = "Image (no description available)"
-                    
+            # Get structured metadata for the first occurrence
+            metadata = await ai_service.analyze_image_structured(
+                images[0].get_bytes(),
+                self._image_context(images[0]),
+                digest=digest,
+                force_reanalysis=force_reanalysis
+            )
         except Exception as e:
-            # Keep original alt text if AI fails
-            if not image.alt_text:
-                image.alt_text = f"Image (AI description failed: {str(e)})"
+            for image in images:
+                # Keep original alt text if AI fails
+                if not image.alt_text:
+                    image.alt_text = f"Image (AI description failed: {str(e)})"
+            return
+        
+        if analyses is not None:
+            analyses[digest] = metadata
+        for position, image in enumerate(images):
+            if position > 0:
+                metadata = ai_service.apply_image_context(metadata, self._image_context(image))
+            self._apply_metadata(image, metadata)
+
+    def _apply_metadata(self, image: ImageBlock, metadata: dict) -> None:
+        """Store structured metadata on an image and derive its alt text."""
+        # Store structured metadata in image object
+        if hasattr(image, 'metadata'):
+            image.metadata = metadata
+        
+        # Set alt text from the description
+        image.alt_text = metadata.get('description', '') or metadata.get('aiAnnotations', {}).get('explanationGenerated', '')
+        
+        # If no description, try to use OCR text
+        if not image.alt_text:
+            ocr_text = metadata.get('aiAnnotations', {}).get('ocrText', '')
+            if ocr_text:
+                image.alt_text = f"Text in image: {ocr_text}"
+            else:
+                image.alt_text = "Image (no description available)"
 
     async def _process_math(
         self, 
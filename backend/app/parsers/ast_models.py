@@ -3,10 +3,33 @@ AST (Abstract Syntax Tree) models for document parsing.
 Defines the standard structure that all parsers should return.
 """
 
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+import base64
+from typing import TYPE_CHECKING, Iterator, List, Dict, Any, Optional, Tuple
+from pydantic import BaseModel, Field, PrivateAttr
 from enum import Enum
 
+from ..utils.blob_store import BlobData, get_blob_store
+
+if TYPE_CHECKING:
+    from .compact_ast import TextColumns
+
+
+def bbox_position(bbox: Optional[Dict[str, float]]) -> Tuple[Optional[int], Optional[Tuple[float, ...]]]:
+    """
+    Split a bbox dictionary into its page and its coordinates.
+
+    Args:
+        bbox: Bounding box with x0, y0, x1, y1 and page keys, any of which may be missing
+
+    Returns:
+        Tuple of (page or None, (x0, y0, x1, y1) or None)
+    """
+    if not bbox:
+        return None, None
+    page = bbox.get("page")
+    box = (bbox["x0"], bbox["y0"], bbox["x1"], bbox["y1"]) if "x0" in bbox else None
+    return (int(page) if page is not None else None), box
+
 
 class BlockType(str, Enum):
     """Types of text blocks."""
@@ -28,7 +51,8 @@ class TextBlock(BaseModel):
 
 class ImageBlock(BaseModel):
     """Represents an image within the document."""
-    data: str  # Base64 encoded image data
+    ref: Optional[str] = None  # Digest of the raw image bytes in the blob store
+    data: Optional[str] = None  # Inline base64 image data, for images not held in the blob store
     format: str  # PNG, JPEG, etc.
     bbox: Optional[Dict[str, float]] = None
     caption: Optional[str] = None
@@ -39,6 +63,25 @@ class ImageBlock(BaseModel):
     section: Optional[str] = None  # Document section
     index: Optional[int] = None  # Image index in document
 
+    def get_bytes(self) -> BlobData:
+        """Get the raw image bytes, reading from the blob store when referenced."""
+        if self.ref is not None:
+            return get_blob_store().get(self.ref)
+        return base64.b64decode(self.data or "")
+
+    def base64_preview(self, length: int = 50) -> str:
+        """Get the first ``length`` characters of the base64-encoded image."""
+        if self.ref is None:
+            return (self.data or "")[:length]
+        # Every 3 raw bytes encode to 4 base64 characters
+        prefix = get_blob_store().get(self.ref, size=(length * 3) // 4 + 3)
+        return base64.b64encode(prefix).decode()[:length]
+
+    def release(self) -> None:
+        """Release the blob store reference held by this image."""
+        if self.ref is not None:
+            get_blob_store().release(self.ref)
+
 
 class TableBlock(BaseModel):
     """Represents a table structure."""
@@ -68,6 +111,83 @@ class DocumentAST(BaseModel):
     math: List[MathBlock] = Field(default_factory=list)
     metadata: Dict[str, Any] = Field(default_factory=dict)  # Title, author, created_date, etc.
 
+    # Text blocks held in columnar form while the document is being parsed;
+    # they precede the blocks in ``textBlocks``
+    _columns: Optional["TextColumns"] = PrivateAttr(default=None)
+
+    # Pages, slides or sheets covered by a fragment that holds several of them
+    _units: Optional[int] = PrivateAttr(default=None)
+
+    @property
+    def columns(self) -> "TextColumns":
+        """Columnar text blocks, created on first use."""
+        if self._columns is None:
+            from .compact_ast import TextColumns
+            self._columns = TextColumns()
+        return self._columns
+
+    @property
+    def units(self) -> Optional[int]:
+        """Number of parser units (pages, slides, sheets) in this fragment, if set by the parser."""
+        return self._units
+
+    @units.setter
+    def units(self, value: Optional[int]) -> None:
+        self._units = value
+
+    @property
+    def text_block_count(self) -> int:
+        """Number of text blocks in either representation."""
+        return len(self.textBlocks) + (len(self._columns) if self._columns is not None else 0)
+
+    def iter_text(self) -> Iterator[Tuple[BlockType, str, Optional[int], Optional[int], Optional[Tuple[float, ...]]]]:
+        """
+        Iterate over text blocks in order without building models.
+
+        Yields:
+            Tuples of (block type, content, level, page, (x0, y0, x1, y1)),
+            where page and the coordinates may be None
+        """
+        if self._columns is not None:
+            for (block_type, content, level), (page, box) in zip(self._columns.rows(), self._columns.positions()):
+                yield block_type, content, level, page, box
+        for block in self.textBlocks:
+            yield (block.type, block.content, block.level, *bbox_position(block.bbox))
+
+    def materialize(self) -> "DocumentAST":
+        """
+        Convert columnar text blocks into ``textBlocks`` models.
+
+        Returns:
+            This AST, for chaining
+        """
+        if self._columns is not None:
+            self.textBlocks[:0] = self._columns.to_blocks()
+            self._columns = None
+        return self
+
+    def extend(self, other: "DocumentAST") -> None:
+        """
+        Append the content blocks of another AST fragment, preserving order.
+        Metadata keys set on the fragment are merged into this AST.
+
+        Args:
+            other: Fragment to append
+        """
+        if self.textBlocks or other._columns is None:
+            if other._columns is not None:
+                self.textBlocks.extend(other._columns.to_blocks())
+            self.textBlocks.extend(other.textBlocks)
+        else:
+            columns = self.columns
+            columns.extend(other._columns)
+            for block in other.textBlocks:
+                columns.append_block(block)
+        self.images.extend(other.images)
+        self.tables.extend(other.tables)
+        self.math.extend(other.math)
+        self.metadata.update(other.metadata)
+
 
 class ParseProgress(BaseModel):
     """Progress information for parsing operations."""
@@ -75,4 +195,3 @@ class ParseProgress(BaseModel):
     progress: float  # 0.0 to 1.0
     message: str
     details: Optional[Dict[str, Any]] = None
-    result: Optional[str] = None  # Final result content (e.g., markdown)
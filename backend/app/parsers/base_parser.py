@@ -5,10 +5,11 @@ All parsers should inherit from this base class.
 
 import asyncio
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator, Optional, Dict, Any
+from typing import AsyncGenerator, AsyncIterator, Optional, Dict, Any
 from pathlib import Path
 
 from .ast_models import DocumentAST, ParseProgress
+from ..utils.blob_store import BlobStore, get_blob_store
 
 
 class BaseParser(ABC):
@@ -23,6 +24,15 @@ class BaseParser(ABC):
         """
         self.config = config or {}
 
+    @property
+    def blob_store(self) -> BlobStore:
+        """
+        Store that receives raw bytes of extracted images.
+        
+        Always the global store, which ImageBlock reads and releases from.
+        """
+        return get_blob_store()
+
     @abstractmethod
     async def parse(
         self, 
@@ -44,6 +54,30 @@ class BaseParser(ABC):
         """
         pass
 
+    async def parse_stream(
+        self,
+        file_path: Path,
+        progress_callback: Optional[AsyncGenerator[ParseProgress, None]] = None
+    ) -> AsyncIterator[DocumentAST]:
+        """
+        Parse a document incrementally, yielding AST fragments in document order.
+        
+        The first fragment carries the document metadata. Parsers that can split
+        their input (pages, slides, sheets) override this to yield one fragment
+        per unit; the default yields the whole document as a single fragment.
+        
+        Args:
+            file_path: Path to the document file
+            progress_callback: Optional callback for progress updates
+            
+        Yields:
+            DocumentAST fragments
+            
+        Raises:
+            ParseError: If parsing fails
+        """
+        yield await self.parse(file_path, progress_callback)
+
     @abstractmethod
     def supports_file(self, file_path: Path) -> bool:
         """
@@ -74,6 +108,29 @@ class BaseParser(ABC):
         ast = await self.parse(file_path)
         return ast.model_dump()
 
+    async def _collect_stream(
+        self,
+        file_path: Path,
+        progress_callback: Optional[AsyncGenerator[ParseProgress, None]] = None
+    ) -> DocumentAST:
+        """
+        Build a complete AST by merging all fragments from parse_stream().
+        
+        Args:
+            file_path: Path to the document file
+            progress_callback: Optional callback for progress updates
+            
+        Returns:
+            DocumentAST containing the whole document, with text blocks as models
+        """
+        ast: Optional[DocumentAST] = None
+        async for fragment in self.parse_stream(file_path, progress_callback):
+            if ast is None:
+                ast = fragment
+            else:
+                ast.extend(fragment)
+        return (ast or DocumentAST()).materialize()
+
     async def _emit_progress(
         self, 
         progress_callback: Optional[AsyncGenerator[ParseProgress, None]], 
@@ -0,0 +1,228 @@
+"""
+Compact columnar storage for parsed text blocks.
+Large PDFs produce one text block per line; holding each as a Pydantic model
+with its own style and bbox dictionaries dominates parsing memory. Parsers
+append lines to ``TextColumns`` instead, and ``TextBlock`` models are only
+built when an AST leaves the parsing pipeline.
+"""
+
+import math
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .ast_models import BlockType, TextBlock
+
+
+# Block types by their stored code
+BLOCK_TYPES: Tuple[BlockType, ...] = tuple(BlockType)
+_TYPE_CODES: Dict[BlockType, int] = {block_type: code for code, block_type in enumerate(BLOCK_TYPES)}
+
+# Stored in place of a missing page number or heading level
+NO_PAGE = -1
+NO_LEVEL = 0
+
+
+class StyleTable:
+    """
+    Interned style dictionaries.
+
+    Equal styles are stored once and referred to by index, so the handful of
+    fonts used across a document cost a handful of dictionaries.
+    """
+
+    __slots__ = ("styles", "_index")
+
+    def __init__(self):
+        """Initialize an empty table."""
+        self.styles: List[Dict[str, Any]] = []
+        self._index: Dict[Any, int] = {}
+
+    def intern(self, style: Optional[Dict[str, Any]]) -> int:
+        """
+        Get the index of a style, adding it if it is new.
+
+        Args:
+            style: Style dictionary; None is treated as an empty style
+
+        Returns:
+            Index of the style in ``styles``
+        """
+        style = style or {}
+        try:
+            key = tuple(sorted(style.items()))
+            index = self._index.get(key)
+        except TypeError:
+            # Unhashable values cannot be interned
+            key, index = None, None
+        if index is None:
+            index = len(self.styles)
+            self.styles.append(dict(style))
+            if key is not None:
+                self._index[key] = index
+        return index
+
+    def __len__(self) -> int:
+        return len(self.styles)
+
+
+class TextColumns:
+    """
+    Text blocks stored column by column.
+
+    Block types, heading levels, style indexes and page numbers are held in
+    typed arrays, bounding boxes as four float32 values per block (NaN when a
+    block has none) and all content in one shared string addressed by offsets.
+    """
+
+    __slots__ = ("types", "levels", "style_ids", "pages", "bboxes", "offsets", "style_table", "_text", "_parts")
+
+    def __init__(self):
+        """Initialize empty columns."""
+        self.types = array("B")
+        self.levels = array("B")
+        self.style_ids = array("I")
+        self.pages = array("i")
+        self.bboxes = array("f")
+        self.offsets = array("Q", [0])
+        self.style_table = StyleTable()
+        self._text = ""
+        self._parts: List[str] = []
+
+    def append(
+        self,
+        block_type: BlockType,
+        content: str,
+        level: Optional[int] = None,
+        style: Optional[Dict[str, Any]] = None,
+        bbox: Optional[Sequence[float]] = None,
+        page: Optional[int] = None
+    ) -> None:
+        """
+        Append a block.
+
+        Args:
+            block_type: Block type
+            content: Block text
+            level: Heading or list nesting level
+            style: Style dictionary, interned in the style table
+            bbox: Bounding box as (x0, y0, x1, y1)
+            page: Page number of the bounding box
+        """
+        self.types.append(_TYPE_CODES[block_type])
+        self.levels.append(level if level is not None else NO_LEVEL)
+        self.style_ids.append(self.style_table.intern(style))
+        self.pages.append(page if page is not None else NO_PAGE)
+        self.bboxes.extend(bbox[:4] if bbox is not None else (math.nan,) * 4)
+        self._parts.append(content)
+        self.offsets.append(self.offsets[-1] + len(content))
+
+    def append_block(self, block: TextBlock) -> None:
+        """
+        Append a block given as a model.
+
+        Args:
+            block: Text block
+        """
+        bbox = block.bbox
+        self.append(
+            block.type,
+            block.content,
+            level=block.level,
+            style=block.style,
+            bbox=(bbox["x0"], bbox["y0"], bbox["x1"], bbox["y1"]) if bbox else None,
+            page=int(bbox["page"]) if bbox and bbox.get("page") is not None else None
+        )
+
+    def extend(self, other: "TextColumns") -> None:
+        """
+        Append all blocks of other columns, preserving their order.
+
+        Args:
+            other: Columns to append
+        """
+        if not len(other):
+            return
+        remap = [self.style_table.intern(style) for style in other.style_table.styles]
+        base = self.offsets[-1]
+        self.types.extend(other.types)
+        self.levels.extend(other.levels)
+        self.style_ids.extend(remap[style_id] for style_id in other.style_ids)
+        self.pages.extend(other.pages)
+        self.bboxes.extend(other.bboxes)
+        self.offsets.extend(base + offset for offset in other.offsets[1:])
+        self._parts.append(other.text)
+
+    @property
+    def text(self) -> str:
+        """Content of all blocks, concatenated."""
+        if self._parts:
+            self._text += "".join(self._parts)
+            self._parts = []
+        return self._text
+
+    def content(self, index: int) -> str:
+        """Get the content of a block."""
+        return self.text[self.offsets[index]:self.offsets[index + 1]]
+
+    def rows(self) -> Iterator[Tuple[BlockType, str, Optional[int]]]:
+        """
+        Iterate over blocks without building models.
+
+        Yields:
+            Tuples of (block type, content, level)
+        """
+        text = self.text
+        offsets = self.offsets
+        for index, (code, level) in enumerate(zip(self.types, self.levels)):
+            yield (
+                BLOCK_TYPES[code],
+                text[offsets[index]:offsets[index + 1]],
+                level if level != NO_LEVEL else None
+            )
+
+    def positions(self) -> Iterator[Tuple[Optional[int], Optional[Tuple[float, float, float, float]]]]:
+        """
+        Iterate over block positions.
+
+        Yields:
+            Tuples of (page or None, (x0, y0, x1, y1) or None)
+        """
+        bboxes = self.bboxes
+        for index, page in enumerate(self.pages):
+            box = tuple(bboxes[index * 4:index * 4 + 4])
+            yield (
+                page if page != NO_PAGE else None,
+                box if not math.isnan(box[0]) else None
+            )
+
+    def block(self, index: int) -> TextBlock:
+        """
+        Build the model of a block.
+
+        Args:
+            index: Block index
+
+        Returns:
+            TextBlock equal to the one that was appended
+        """
+        level = self.levels[index]
+        x0, y0, x1, y1 = self.bboxes[index * 4:index * 4 + 4]
+        bbox = None
+        if not math.isnan(x0):
+            bbox = {"x0": x0, "y0": y0, "x1": x1, "y1": y1}
+            if self.pages[index] != NO_PAGE:
+                bbox["page"] = self.pages[index]
+        return TextBlock(
+            type=BLOCK_TYPES[self.types[index]],
+            content=self.content(index),
+            level=level if level != NO_LEVEL else None,
+            style=self.style_table.styles[self.style_ids[index]],
+            bbox=bbox
+        )
+
+    def to_blocks(self) -> List[TextBlock]:
+        """Build the models of all blocks."""
+        return [self.block(index) for index in range(len(self))]
+
+    def __len__(self) -> int:
+        return len(self.types)
@@ -3,7 +3,6 @@ DOCX Parser using python-docx.
 Extracts text, images, and other content from DOCX files.
 """
 
-import base64
 from typing import Optional, AsyncGenerator
 from pathlib import Path
 from docx import Document
@@ -64,9 +63,8 @@ class DOCXParser(BaseParser):
                 if "image" in rel.reltype:
                     img_part = rel.target_part
                     img_data = img_part.blob
-                    image_base64 = base64.b64encode(img_data).decode()
                     image_block = ImageBlock(
-                        data=image_base64,
+                        ref=self.blob_store.put(img_data),
                         format=img_part.content_type.split('/')[-1].upper()
                     )
                     ast.images.append(image_block)
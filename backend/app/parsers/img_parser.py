@@ -3,7 +3,6 @@ IMG Parser for image files.
 Extracts images and uses AI service to generate descriptions.
 """
 
-import base64
 from typing import Optional, AsyncGenerator
 from pathlib import Path
 from PIL import Image
@@ -26,10 +25,9 @@ class IMGParser(BaseParser):
         try:
             await self._emit_progress(progress_callback, "initialization", 0.0, "Opening image document")
 
-            # Read and encode image
+            # Read image bytes into the blob store
             with open(file_path, 'rb') as image_file:
-                image_data = image_file.read()
-                image_base64 = base64.b64encode(image_data).decode()
+                image_ref = self.blob_store.put(image_file.read())
 
             # Get image format
             image_format = file_path.suffix.lstrip('.').upper()
@@ -49,7 +47,7 @@ class IMGParser(BaseParser):
 
             # Create image block
             image_block = ImageBlock(
-                data=image_base64,
+                ref=image_ref,
                 format=image_format,
                 alt_text=f"Image from {file_path.name}"
             )
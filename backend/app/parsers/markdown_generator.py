@@ -2,12 +2,25 @@
 Markdown Generator for converting DocumentAST to Markdown format.
 """
 
-from typing import List, Optional
-from .ast_models import DocumentAST, TextBlock, ImageBlock, TableBlock, MathBlock, BlockType
+import heapq
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .ast_models import DocumentAST, ImageBlock, TableBlock, MathBlock, BlockType, bbox_position
+from .reading_order import END_OF_PAGE, Box, reading_order_keys
+from ..utils.file_utils import AtomicFileWriter
+
+
+# Block kinds, in the order they are rendered when blocks have no position
+TEXT, IMAGE, TABLE, MATH = range(4)
 
 
 class MarkdownGenerator:
-    """Generator for converting DocumentAST to Markdown."""
+    """
+    Generator for converting DocumentAST to Markdown.
+
+    Blocks with bounding boxes are rendered page by page in reading order,
+    interleaving text, images, tables and math as they appear on the page.
+    Blocks without a page follow, text first, then images, tables and math.
+    """
 
     def generate(self, ast: DocumentAST) -> str:
         """
@@ -19,32 +32,99 @@ class MarkdownGenerator:
         Returns:
             Markdown string representation
         """
-        markdown_parts = []
+        # Join all parts with double newlines
+        return '\n\n'.join(self.render_pages(ast))
+
+    async def write_to(self, ast: DocumentAST, writer: AtomicFileWriter) -> None:
+        """
+        Render a DocumentAST into an asynchronous file writer, page by page.
+        
+        Output is separated from anything the writer already holds, so
+        consecutive fragments of one document can share a writer.
+        
+        Args:
+            ast: Document AST to convert
+            writer: Open writer
+        """
+        for chunk in self.render_pages(ast):
+            if writer.size:
+                await writer.write('\n\n')
+            await writer.write(chunk)
+
+    def render_pages(self, ast: DocumentAST) -> Iterator[str]:
+        """
+        Render a DocumentAST in chunks.
         
+        Args:
+            ast: Document AST to convert
+            
+        Yields:
+            Non-empty Markdown chunks: the frontmatter, each page in page order,
+            then the blocks that have no page
+        """
         # Add metadata as frontmatter (if available)
         if ast.metadata:
             frontmatter = self._generate_frontmatter(ast.metadata)
             if frontmatter:
-                markdown_parts.append(frontmatter)
-        
-        # Process text blocks
-        for text_block in ast.textBlocks:
-            markdown_parts.append(self._generate_text_block(text_block))
-        
-        # Process images
-        for image_block in ast.images:
-            markdown_parts.append(self._generate_image_block(image_block))
-        
-        # Process tables
-        for table_block in ast.tables:
-            markdown_parts.append(self._generate_table_block(table_block))
-        
-        # Process math blocks
-        for math_block in ast.math:
-            markdown_parts.append(self._generate_math_block(math_block))
+                yield frontmatter
+        
+        pages = self._group_pages(ast)
+        for page in sorted(pages, key=lambda page: (page is None, page or 0)):
+            parts = (
+                self._render_block(kind, payload)
+                for kind, payload in self._reading_order(pages[page], positioned=page is not None)
+            )
+            chunk = '\n\n'.join(filter(None, parts))
+            if chunk:
+                yield chunk
+
+    def _group_pages(self, ast: DocumentAST) -> Dict[Optional[int], Tuple[List[Tuple[Optional[Box], Any]], ...]]:
+        """Group blocks by page, then by kind, keeping their positions."""
+        pages: Dict[Optional[int], Tuple[List[Tuple[Optional[Box], Any]], ...]] = {}
+        
+        def add(kind: int, page: Optional[int], box: Optional[Box], payload: Any) -> None:
+            if page not in pages:
+                pages[page] = ([], [], [], [])
+            pages[page][kind].append((box, payload))
+        
+        for block_type, content, level, page, box in ast.iter_text():
+            add(TEXT, page, box, (block_type, content, level))
+        for kind, blocks in ((IMAGE, ast.images), (TABLE, ast.tables), (MATH, ast.math)):
+            for block in blocks:
+                add(kind, *bbox_position(block.bbox), block)
+        return pages
+
+    def _reading_order(
+        self, kinds: Tuple[List[Tuple[Optional[Box], Any]], ...], positioned: bool
+    ) -> Iterator[Tuple[int, Any]]:
+        """
+        Merge the blocks of one page into reading order.
         
-        # Join all parts with double newlines
-        return '\n\n'.join(filter(None, markdown_parts))
+        Each kind is sorted on its own, then the sorted kinds are merged, so
+        blocks that compare equal keep their kind's and document order.
+        """
+        boxes = [box for entries in kinds for box, _ in entries if box is not None] if positioned else []
+        keys = iter(reading_order_keys(boxes))
+        streams = []
+        for kind, entries in enumerate(kinds):
+            stream = [
+                (next(keys) if positioned and box is not None else END_OF_PAGE, kind, index, payload)
+                for index, (box, payload) in enumerate(entries)
+            ]
+            stream.sort(key=lambda item: item[:3])
+            streams.append(stream)
+        for _, kind, _, payload in heapq.merge(*streams, key=lambda item: item[:3]):
+            yield kind, payload
+
+    def _render_block(self, kind: int, payload: Any) -> str:
+        """Generate Markdown for a block of any kind."""
+        if kind == TEXT:
+            return self._render_text(*payload)
+        if kind == IMAGE:
+            return self._generate_image_block(payload)
+        if kind == TABLE:
+            return self._generate_table_block(payload)
+        return self._generate_math_block(payload)
 
     def _generate_frontmatter(self, metadata: dict) -> Optional[str]:
         """Generate YAML frontmatter from metadata."""
@@ -65,17 +145,17 @@ class MarkdownGenerator:
         
         return '\n'.join(lines)
 
-    def _generate_text_block(self, text_block: TextBlock) -> str:
-        """Generate Markdown for a text block."""
-        content = text_block.content.strip()
+    def _render_text(self, block_type: BlockType, content: str, level: Optional[int]) -> str:
+        """Generate Markdown for text block fields, as stored in either AST representation."""
+        content = content.strip()
         if not content:
             return ""
         
-        if text_block.type == BlockType.HEADING:
-            level = text_block.level or 1
+        if block_type == BlockType.HEADING:
+            level = level or 1
             return f"{'#' * level} {content}"
         
-        elif text_block.type == BlockType.LIST_ITEM:
+        elif block_type == BlockType.LIST_ITEM:
             # Simple list item formatting
             if content.startswith(('1.', '2.', '3.', '4.', '5.', '6.', '7.', '8.', '9.')):
                 return content  # Already formatted as numbered list
@@ -84,11 +164,11 @@ class MarkdownGenerator:
             else:
                 return content  # Already formatted as bulleted list
         
-        elif text_block.type == BlockType.CODE:
+        elif block_type == BlockType.CODE:
             # Code block
             return f"```\n{content}\n```"
         
-        elif text_block.type == BlockType.QUOTE:
+        elif block_type == BlockType.QUOTE:
             # Quote block
             if not content.startswith('>'):
                 return f"> {content}"
@@ -106,7 +186,7 @@ class MarkdownGenerator:
         caption = image_block.caption or ""
         
         # Create a markdown image reference (placeholder)
-        markdown = f"![{alt_text}](data:image/{image_block.format.lower()};base64,{image_block.data[:50]}...)"
+        markdown = f"![{alt_text}](data:image/{image_block.format.lower()};base64,{image_block.base64_preview(50)}...)"
         
         if caption:
             markdown += f"\n\n*{caption}*"
@@ -159,3 +239,4 @@ class MarkdownGenerator:
                 return f"$$\n{content}\n$$"
             else:
                 return f"```math\n{content}\n```"
+
@@ -12,6 +12,7 @@ from .xlsx_parser import XLSXParser
 from .pptx_parser import PPTXParser
 from .txt_parser import TXTParser
 from .img_parser import IMGParser
+from ..core.config import get_pdf_parser_config
 
 
 class ParserFactory:
@@ -20,7 +21,7 @@ class ParserFactory:
     def __init__(self):
         """Initialize factory with all available parsers."""
         self._parsers = [
-            PDFParser(),
+            PDFParser(get_pdf_parser_config()),
             DOCXParser(),
             XLSXParser(),
             PPTXParser(),
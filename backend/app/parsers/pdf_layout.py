@@ -0,0 +1,136 @@
+"""
+Single-pass page layout extraction for PDF parsing.
+A page is decoded once and the resulting layout is shared by the text,
+table and math extractors.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+
+# Text extraction flags: the default "dict" flags without image payloads.
+# Images are extracted separately via their xrefs, so decoding them into the
+# layout dictionary would only waste CPU and memory.
+LAYOUT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+class LayoutCache:
+    """
+    Bounded LRU cache of raw page layout dictionaries.
+
+    Entries are keyed by document identity (path, size and modification time)
+    and page number, so re-parsing an unchanged file skips decoding entirely.
+    The cache is local to the process that owns it and safe to use from the
+    threads pages are parsed in.
+    """
+
+    def __init__(self, max_entries: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of page layouts to keep
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Any, ...], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[Dict[str, Any]]:
+        """Return the cached layout for ``key`` or None."""
+        with self._lock:
+            raw = self._entries.get(key)
+            if raw is not None:
+                self._entries.move_to_end(key)
+            return raw
+
+    def put(self, key: Tuple[Any, ...], raw: Dict[str, Any]) -> None:
+        """Store a layout, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = raw
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PageLayout:
+    """Decoded text layout of a single PDF page."""
+
+    __slots__ = ("page_num", "width", "height", "blocks", "_text")
+
+    def __init__(self, page_num: int, raw: Dict[str, Any]):
+        """
+        Initialize the layout from a raw ``page.get_text("dict")`` result.
+
+        Args:
+            page_num: Zero-based page number
+            raw: Raw layout dictionary
+        """
+        self.page_num = page_num
+        self.width = raw.get("width", 0)
+        self.height = raw.get("height", 0)
+        self.blocks: List[Dict[str, Any]] = [
+            block for block in raw.get("blocks", []) if "lines" in block
+        ]
+        self._text: Optional[str] = None
+
+    @classmethod
+    def from_page(
+        cls,
+        page,
+        page_num: int,
+        cache: Optional[LayoutCache] = None,
+        document_key: Optional[Tuple[Any, ...]] = None
+    ) -> "PageLayout":
+        """
+        Decode a page, consulting the layout cache when one is given.
+
+        Args:
+            page: PyMuPDF page
+            page_num: Zero-based page number
+            cache: Optional layout cache
+            document_key: Identity of the document, required for caching
+
+        Returns:
+            PageLayout for the page
+        """
+        if cache is None or document_key is None:
+            return cls(page_num, page.get_text("dict", flags=LAYOUT_FLAGS))
+
+        key = (*document_key, page_num)
+        raw = cache.get(key)
+        if raw is None:
+            raw = page.get_text("dict", flags=LAYOUT_FLAGS)
+            cache.put(key, raw)
+        return cls(page_num, raw)
+
+    @property
+    def text(self) -> str:
+        """Plain page text, equivalent to ``page.get_text()``."""
+        if self._text is None:
+            self._text = "".join(
+                "".join(span.get("text", "") for span in line.get("spans", [])) + "\n"
+                for block in self.blocks
+                for line in block["lines"]
+            )
+        return self._text
+
+
+def document_key(file_path: str) -> Tuple[Any, ...]:
+    """
+    Build a cache identity for a document on disk.
+
+    Args:
+        file_path: Path to the document
+
+    Returns:
+        Tuple of (absolute path, size, modification time in nanoseconds)
+    """
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
@@ -0,0 +1,144 @@
+"""
+Local OCR for PDF pages without a text layer.
+Pages are rasterised with PyMuPDF and recognised with Tesseract; recognised
+lines become TextBlocks with bounding boxes in PDF coordinates.
+"""
+
+from typing import Dict, List, Tuple
+
+import fitz  # PyMuPDF
+from PIL import Image
+import pytesseract
+
+from .ast_models import BlockType, DocumentAST, TextBlock
+
+
+# Fraction of the page an image must cover to be treated as the page scan
+PAGE_SCAN_COVERAGE = 0.9
+
+# Words recognised with lower confidence are dropped
+MIN_WORD_CONFIDENCE = 30.0
+
+
+def needs_ocr(fragment: DocumentAST) -> bool:
+    """
+    Check whether a parsed page looks like a scan.
+
+    A page needs OCR when it has no text layer but does draw images.
+
+    Args:
+        fragment: AST fragment of a single page
+
+    Returns:
+        True if the page should be OCR'd
+    """
+    return not fragment.text_block_count and bool(fragment.images)
+
+
+def rasterize_page(page, dpi: int) -> Image.Image:
+    """
+    Render a page to a grayscale image.
+
+    Args:
+        page: PyMuPDF page
+        dpi: Rendering resolution
+
+    Returns:
+        PIL image of the page
+    """
+    pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    return Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+
+
+def recognise_page(image: Image.Image, page_num: int, dpi: int, language: str, timeout: float) -> List[TextBlock]:
+    """
+    OCR a rasterised page into line-level text blocks.
+
+    Args:
+        image: Rasterised page
+        page_num: Zero-based page number
+        dpi: Resolution the page was rendered at
+        language: Tesseract language code
+        timeout: OCR timeout in seconds (0 disables)
+
+    Returns:
+        TextBlocks in reading order, with bounding boxes in PDF points
+    """
+    data = pytesseract.image_to_data(
+        image, lang=language, timeout=timeout, output_type=pytesseract.Output.DICT
+    )
+    return ocr_data_to_blocks(data, page_num, 72.0 / dpi)
+
+
+def ocr_data_to_blocks(data: Dict[str, list], page_num: int, scale: float) -> List[TextBlock]:
+    """
+    Group Tesseract word results into line TextBlocks.
+
+    Args:
+        data: ``image_to_data`` output as a dictionary of columns
+        page_num: Zero-based page number
+        scale: Factor converting pixel coordinates to PDF points
+
+    Returns:
+        One TextBlock per recognised line
+    """
+    lines: Dict[Tuple[int, int, int], dict] = {}
+    for i, word in enumerate(data.get("text", [])):
+        word = (word or "").strip()
+        confidence = float(data["conf"][i])
+        if not word or confidence < MIN_WORD_CONFIDENCE:
+            continue
+
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        left, top = data["left"][i], data["top"][i]
+        right, bottom = left + data["width"][i], top + data["height"][i]
+        line = lines.get(key)
+        if line is None:
+            lines[key] = {"words": [word], "conf": [confidence], "bbox": [left, top, right, bottom]}
+        else:
+            line["words"].append(word)
+            line["conf"].append(confidence)
+            bbox = line["bbox"]
+            bbox[0], bbox[1] = min(bbox[0], left), min(bbox[1], top)
+            bbox[2], bbox[3] = max(bbox[2], right), max(bbox[3], bottom)
+
+    blocks = []
+    for line in lines.values():
+        x0, y0, x1, y1 = line["bbox"]
+        blocks.append(TextBlock(
+            type=BlockType.PARAGRAPH,
+            content=" ".join(line["words"]),
+            style={"ocr": True, "confidence": round(sum(line["conf"]) / len(line["conf"]), 1)},
+            bbox={
+                "x0": x0 * scale,
+                "y0": y0 * scale,
+                "x1": x1 * scale,
+                "y1": y1 * scale,
+                "page": page_num
+            }
+        ))
+    return blocks
+
+
+def page_scan_images(fragment: DocumentAST, page_width: float, page_height: float) -> List[int]:
+    """
+    Find images that cover (almost) the whole page, i.e. the scan itself.
+
+    Args:
+        fragment: AST fragment of a single page
+        page_width: Page width in points
+        page_height: Page height in points
+
+    Returns:
+        Indexes of the page scan images in ``fragment.images``
+    """
+    page_area = page_width * page_height
+    indexes = []
+    for index, image in enumerate(fragment.images):
+        bbox = image.bbox
+        if not bbox or not page_area:
+            continue
+        area = (bbox["x1"] - bbox["x0"]) * (bbox["y1"] - bbox["y0"])
+        if area >= PAGE_SCAN_COVERAGE * page_area:
+            indexes.append(index)
+    return indexes
@@ -0,0 +1,144 @@
+"""
+Coalescing of PDF text lines into paragraphs.
+PyMuPDF reports text line by line, so a wrapped paragraph arrives as many
+lines. Consecutive lines are merged when their spacing, indentation and font
+continue the previous line; the decision is made for a whole page at once
+with array operations.
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+
+from .ast_models import BlockType
+
+
+# Extra vertical space, in line heights above the page's usual line gap, that separates paragraphs
+PARAGRAPH_GAP = 0.5
+
+# Indentation, in font sizes, at which a line starts a new paragraph
+INDENT = 1.0
+
+# Largest font size difference, in points, within one paragraph
+SIZE_TOLERANCE = 0.5
+
+# Shortfall, in font sizes, of a line ending a sentence that marks the end of a paragraph
+SHORT_LINE = 2.0
+
+# Block type codes used by ``paragraph_starts``
+KIND_CODES = {block_type: code for code, block_type in enumerate(BlockType)}
+
+_PARAGRAPH = KIND_CODES[BlockType.PARAGRAPH]
+_HEADING = KIND_CODES[BlockType.HEADING]
+_LIST_ITEM = KIND_CODES[BlockType.LIST_ITEM]
+
+_SENTENCE_END = (".", "!", "?", ":")
+_SOFT_HYPHEN = "\u00ad"
+
+
+def paragraph_starts(
+    texts: Sequence[str],
+    boxes: np.ndarray,
+    sizes: np.ndarray,
+    fonts: np.ndarray,
+    kinds: np.ndarray
+) -> np.ndarray:
+    """
+    Find the lines of a page that start a new paragraph.
+
+    A line continues the previous one when both are paragraph text (or a
+    paragraph line follows a list item, or a heading wraps), they use the same
+    font and size, they overlap horizontally, the line is not indented past
+    the previous one, the gap between them is no larger than the page's usual
+    line gap, and the previous line does not end a sentence well short of the
+    right margin.
+
+    Args:
+        texts: Line texts in reading order
+        boxes: Line bounding boxes, shape (n, 4) as x0, y0, x1, y1
+        sizes: Font size of each line
+        fonts: Font identifier of each line
+        kinds: Block type code of each line, see ``KIND_CODES``
+
+    Returns:
+        Sorted indexes of the first line of each paragraph; always starts with 0
+    """
+    count = len(texts)
+    if count < 2:
+        return np.zeros(min(count, 1), dtype=np.intp)
+
+    x0, y0, x1, y1 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    prev = slice(None, -1)
+    cur = slice(1, None)
+
+    height = np.maximum(y1[prev] - y0[prev], 1.0)
+    gap = y0[cur] - y1[prev]
+
+    # The page's usual gap between wrapped lines
+    wraps = gap[(gap >= -0.5 * height) & (gap <= 1.5 * height)]
+    usual_gap = max(float(np.median(wraps)), 0.0) if wraps.size else 0.0
+
+    kind_prev, kind_cur = kinds[prev], kinds[cur]
+    continues_kind = (
+        ((kind_cur == _PARAGRAPH) & ((kind_prev == _PARAGRAPH) | (kind_prev == _LIST_ITEM)))
+        | ((kind_cur == _HEADING) & (kind_prev == _HEADING))
+    )
+    same_font = (fonts[cur] == fonts[prev]) & (np.abs(sizes[cur] - sizes[prev]) <= SIZE_TOLERANCE)
+    below = (gap >= -0.5 * height) & (gap <= usual_gap + PARAGRAPH_GAP * height)
+    overlapping = (x0[cur] < x1[prev]) & (x0[prev] < x1[cur])
+    not_indented = x0[cur] - x0[prev] <= INDENT * sizes[cur]
+
+    ends_sentence = np.fromiter(
+        (text.rstrip().endswith(_SENTENCE_END) for text in texts[:-1]), dtype=bool, count=count - 1
+    )
+    short = x1[prev] < x1[cur] - SHORT_LINE * sizes[cur]
+
+    continues = continues_kind & same_font & below & overlapping & not_indented & ~(ends_sentence & short)
+    return np.concatenate(([0], np.flatnonzero(~continues) + 1))
+
+
+def merge_boxes(boxes: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Compute the bounding box of each paragraph.
+
+    Args:
+        boxes: Line bounding boxes, shape (n, 4)
+        starts: First line of each paragraph, as returned by ``paragraph_starts``
+
+    Returns:
+        Paragraph bounding boxes, shape (len(starts), 4)
+    """
+    return np.column_stack((
+        np.minimum.reduceat(boxes[:, 0], starts),
+        np.minimum.reduceat(boxes[:, 1], starts),
+        np.maximum.reduceat(boxes[:, 2], starts),
+        np.maximum.reduceat(boxes[:, 3], starts),
+    ))
+
+
+def join_lines(lines: Sequence[str]) -> str:
+    """
+    Join the lines of a paragraph, undoing hyphenation at line breaks.
+
+    Soft hyphens at line ends are dropped. A hyphen after a letter is dropped
+    when the next line starts in lower case ("docu-" + "ment"); other
+    hyphens are kept but not followed by a space ("Anti-" + "Virus").
+
+    Args:
+        lines: Stripped line texts
+
+    Returns:
+        Paragraph text
+    """
+    parts: List[str] = [lines[0]]
+    for line in lines[1:]:
+        previous = parts[-1]
+        if previous.endswith(_SOFT_HYPHEN):
+            parts[-1] = previous[:-1]
+        elif previous.endswith("-") and len(previous) > 1 and not previous[-2].isspace():
+            if previous[-2].isalpha() and line[:1].islower():
+                parts[-1] = previous[:-1]
+        else:
+            parts.append(" ")
+        parts.append(line)
+    return "".join(parts)
@@ -3,19 +3,54 @@ PDF Parser implementation using PyMuPDF.
 Extracts text, images, tables, and mathematical content from PDF files.
 """
 
-import base64
+import asyncio
+import logging
+import math
 import re
-from typing import AsyncGenerator, Optional, List
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncGenerator, AsyncIterator, Dict, Optional, List, Set, Tuple
 from pathlib import Path
 import fitz  # PyMuPDF
-from io import BytesIO
+import numpy as np
 
 from .base_parser import BaseParser, ParseError
-from .ast_models import DocumentAST, TextBlock, ImageBlock, TableBlock, MathBlock, BlockType, ParseProgress
+from .ast_models import DocumentAST, TextBlock, ImageBlock, MathBlock, BlockType, ParseProgress
+from .compact_ast import TextColumns
+from .pdf_layout import LayoutCache, PageLayout, document_key
+from .pdf_ocr import needs_ocr, page_scan_images, rasterize_page, recognise_page
+from .pdf_paragraphs import KIND_CODES, join_lines, merge_boxes, paragraph_starts
+from .pdf_tables import SpanKey, detect_tables, page_spans, ruling_segments
+from .process_pool import get_process_pool, shutdown_process_pool
+from ..services.ocr_pool import get_ocr_pool
+from ..utils.blob_store import reset_blob_store
+
+
+logger = logging.getLogger(__name__)
 
 
 class PDFParser(BaseParser):
-    """Parser for PDF documents using PyMuPDF."""
+    """
+    Parser for PDF documents using PyMuPDF.
+
+    Supported configuration keys:
+        parallel_workers: Worker processes used to parse page shards (0 parses serially)
+        pages_per_shard: Maximum number of pages handed to one worker task
+        parallel_min_pages: Minimum page count before sharding kicks in
+        layout_cache_size: Number of decoded page layouts to cache (0 disables)
+        paragraph_coalescing: Merge wrapped lines into paragraphs (default on)
+        table_detection: Detect tables from ruling lines and column gaps (default on)
+        ocr_enabled: OCR pages without a text layer locally
+        ocr_dpi: Resolution pages are rasterised at for OCR
+        ocr_language: Tesseract language code
+        ocr_timeout: Per-page OCR timeout in seconds
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        """Initialize parser and its optional page layout cache."""
+        super().__init__(config)
+        cache_size = self.config.get("layout_cache_size", 0)
+        self._layout_cache = LayoutCache(cache_size) if cache_size > 0 else None
 
     def supports_file(self, file_path: Path) -> bool:
         """Check if file is a PDF."""
@@ -27,13 +62,24 @@ class PDFParser(BaseParser):
         progress_callback: Optional[AsyncGenerator[ParseProgress, None]] = None
     ) -> DocumentAST:
         """Parse PDF document and extract content."""
+        return await self._collect_stream(file_path, progress_callback)
+
+    async def parse_stream(
+        self,
+        file_path: Path,
+        progress_callback: Optional[AsyncGenerator[ParseProgress, None]] = None
+    ) -> AsyncIterator[DocumentAST]:
+        """
+        Parse PDF document incrementally.
+        Yields a metadata-only fragment followed by page (or page shard) fragments.
+        """
         try:
             await self._emit_progress(progress_callback, "initialization", 0.0, "Opening PDF document")
             
             doc = fitz.open(str(file_path))
             total_pages = doc.page_count
             
-            ast = DocumentAST(
+            metadata_fragment = DocumentAST(
                 metadata={
                     "title": doc.metadata.get("title", ""),
                     "author": doc.metadata.get("author", ""),
@@ -44,90 +90,299 @@ class PDFParser(BaseParser):
                 }
             )
 
-            for page_num in range(total_pages):
-                await self._emit_progress(
-                    progress_callback, 
-                    "parsing_pages", 
-                    page_num / total_pages, 
-                    f"Processing page {page_num + 1} of {total_pages}"
-                )
-                
-                page = doc[page_num]
-                
-                # Extract text blocks
-                await self._extract_text_blocks(page, ast, page_num)
-                
-                # Extract images
-                await self._extract_images(page, ast, page_num)
-                
-                # Extract tables (basic implementation)
-                await self._extract_tables(page, ast, page_num)
-                
-                # Extract math expressions
-                await self._extract_math(page, ast, page_num)
-
-            doc.close()
+            if self._use_parallel(total_pages):
+                # Workers open their own document handles
+                doc.close()
+                yield metadata_fragment
+                async for fragment in self._stream_parallel(file_path, total_pages, progress_callback):
+                    yield fragment
+            else:
+                try:
+                    yield metadata_fragment
+                    doc_key = document_key(str(file_path)) if self._layout_cache is not None else None
+                    xref_refs = {}
+                    # Pages waiting for OCR, kept in page order: (fragment, OCR job, page)
+                    pending = deque()
+                    ocr_window = get_ocr_pool().max_workers * 2 if self.config.get("ocr_enabled") else 0
+                    for page_num in range(total_pages):
+                        await self._emit_progress(
+                            progress_callback, 
+                            "parsing_pages", 
+                            page_num / total_pages, 
+                            f"Processing page {page_num + 1} of {total_pages}"
+                        )
+                        
+                        page = doc[page_num]
+                        # Decoding runs in a thread so the event loop stays responsive;
+                        # pages are awaited one at a time since PyMuPDF must not use one
+                        # document from two threads at once
+                        fragment = await asyncio.to_thread(self._parse_page, page, page_num, doc_key, xref_refs)
+                        ocr_job = None
+                        if ocr_window and needs_ocr(fragment):
+                            ocr_job = await self._submit_ocr(page, page_num)
+                        pending.append((fragment, ocr_job, page))
+                        
+                        # Rasterising continues while earlier pages are being OCR'd
+                        while pending and (pending[0][1] is None or len(pending) > ocr_window):
+                            yield await self._finish_page(*pending.popleft())
+                    
+                    while pending:
+                        yield await self._finish_page(*pending.popleft())
+                finally:
+                    for _, ocr_job, _ in pending:
+                        if ocr_job is not None:
+                            ocr_job.cancel()
+                    doc.close()
             
             await self._emit_progress(progress_callback, "completion", 1.0, "PDF parsing completed")
-            return ast
             
         except Exception as e:
             raise ParseError(f"Failed to parse PDF: {str(e)}", file_path, e)
 
-    async def _extract_text_blocks(self, page, ast: DocumentAST, page_num: int) -> None:
-        """Extract text blocks from a PDF page."""
-        blocks = page.get_text("dict")
+    def _use_parallel(self, total_pages: int) -> bool:
+        """Check whether a document is large enough to be parsed in shards."""
+        workers = self.config.get("parallel_workers", 0)
+        return workers > 0 and total_pages >= self.config.get("parallel_min_pages", 32)
+
+    def _shard_pages(self, total_pages: int) -> List[Tuple[int, int]]:
+        """
+        Split the page range into contiguous shards.
+
+        Shards are capped at ``pages_per_shard`` pages but are made small enough
+        that every worker receives at least one shard.
+        """
+        workers = max(1, self.config.get("parallel_workers", 1))
+        shard_size = min(
+            max(1, self.config.get("pages_per_shard", 16)),
+            max(1, math.ceil(total_pages / workers))
+        )
+        return [
+            (start, min(start + shard_size, total_pages))
+            for start in range(0, total_pages, shard_size)
+        ]
+
+    async def _stream_parallel(
+        self,
+        file_path: Path,
+        total_pages: int,
+        progress_callback: Optional[AsyncGenerator[ParseProgress, None]] = None
+    ) -> AsyncIterator[DocumentAST]:
+        """
+        Parse page shards in the process pool and yield them in page order.
+        At most two shards per worker are in flight, so finished fragments never
+        pile up faster than the consumer takes them.
+        """
+        loop = asyncio.get_running_loop()
+        workers = self.config["parallel_workers"]
+        pool = get_process_pool(workers)
+        shards = iter(self._shard_pages(total_pages))
+        pending = deque()
         
-        for block in blocks.get("blocks", []):
-            if "lines" not in block:
-                continue
-                
-            for line in block["lines"]:
-                line_text = ""
-                font_info = {}
+        def submit_next() -> None:
+            shard = next(shards, None)
+            if shard is not None:
+                start, stop = shard
+                pending.append(
+                    loop.run_in_executor(pool, _parse_page_range, str(file_path), start, stop, self.config)
+                )
+        
+        for _ in range(workers * 2):
+            submit_next()
+        
+        try:
+            pages_done = 0
+            while pending:
+                shard_pages, fragment, blobs = await pending.popleft()
+                submit_next()
+                # Move worker-extracted image bytes into this process's store
+                for image in fragment.images:
+                    self.blob_store.put(blobs[image.ref], digest=image.ref)
+                pages_done += shard_pages
+                await self._emit_progress(
+                    progress_callback,
+                    "parsing_pages",
+                    pages_done / total_pages,
+                    f"Processed {pages_done} of {total_pages} pages"
+                )
+                yield fragment
+        except BrokenProcessPool:
+            # A crashed worker poisons the pool; recreate it on next use
+            shutdown_process_pool(wait=False)
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def _submit_ocr(self, page, page_num: int) -> asyncio.Future:
+        """
+        Rasterise a page and queue it for OCR in the OCR pool.
+
+        Rendering runs in a thread so the event loop stays responsive; it is
+        awaited before the next page is parsed, since PyMuPDF must not use
+        one document from two threads at once.
+        """
+        dpi = self.config.get("ocr_dpi", 300)
+        image = await asyncio.to_thread(rasterize_page, page, dpi)
+        return asyncio.ensure_future(get_ocr_pool().submit(
+            recognise_page,
+            image,
+            page_num,
+            dpi,
+            self.config.get("ocr_language", "eng"),
+            self.config.get("ocr_timeout", 0)
+        ))
+
+    async def _finish_page(self, fragment: DocumentAST, ocr_job: Optional[asyncio.Future], page) -> DocumentAST:
+        """Wait for a page's OCR job, if any, and merge the recognised text."""
+        if ocr_job is not None:
+            try:
+                blocks = await ocr_job
+            except Exception as e:
+                # Keep the page scan so it can still be described by the AI service
+                logger.warning(f"OCR failed for page {page.number + 1}: {e}")
+            else:
+                self._apply_ocr(fragment, blocks, page.rect.width, page.rect.height)
+        return fragment
+
+    def _apply_ocr(self, fragment: DocumentAST, blocks: List[TextBlock], page_width: float, page_height: float) -> None:
+        """
+        Add OCR text to a page fragment.
+        When text was recognised, the full-page scan image is dropped, since its
+        content is now represented as text.
+        """
+        if not blocks:
+            return
+        columns = fragment.columns
+        for block in blocks:
+            columns.append_block(block)
+        for index in reversed(page_scan_images(fragment, page_width, page_height)):
+            self.blob_store.release(fragment.images.pop(index).ref)
+
+    def _parse_page(
+        self,
+        page,
+        page_num: int,
+        doc_key: Optional[tuple] = None,
+        xref_refs: Optional[Dict[int, Tuple[str, str]]] = None
+    ) -> DocumentAST:
+        """
+        Extract all content from a single page into an AST fragment.
+        Runs synchronously so it can be executed inside a worker process.
+        
+        ``xref_refs`` maps image xrefs already extracted from this document to
+        their (blob ref, format), so images repeated across pages are decoded once.
+        """
+        fragment = DocumentAST()
+        
+        # Decode the page layout once for all text-based extractors
+        layout = PageLayout.from_page(page, page_num, self._layout_cache, doc_key)
+        
+        # Extract tables first, so their text is not repeated as text blocks
+        table_spans = self._extract_tables(page, layout, fragment, page_num)
+        
+        # Extract text blocks
+        self._extract_text_blocks(layout, fragment, page_num, table_spans)
+        
+        # Extract images
+        self._extract_images(page, fragment, page_num, xref_refs if xref_refs is not None else {})
+        
+        # Extract math expressions
+        self._extract_math(layout, fragment, page_num)
+        
+        return fragment
+
+    def _extract_text_blocks(
+        self, layout: PageLayout, ast: DocumentAST, page_num: int, skip: Optional[Set[SpanKey]] = None
+    ) -> None:
+        """
+        Extract text blocks from a PDF page into the fragment's text columns.
+        Spans listed in ``skip`` (e.g. table cells) are left out.
+        """
+        # (text, font info, block type, heading level, bbox) per line
+        lines = []
+        for block_index, block in enumerate(layout.blocks):
+            for line_index, line in enumerate(block["lines"]):
+                spans = line.get("spans", [])
+                bbox = line["bbox"]
+                if skip:
+                    kept = [
+                        span for span_index, span in enumerate(spans)
+                        if (block_index, line_index, span_index) not in skip
+                    ]
+                    if len(kept) < len(spans) and kept:
+                        bbox = (
+                            min(span["bbox"][0] for span in kept),
+                            min(span["bbox"][1] for span in kept),
+                            max(span["bbox"][2] for span in kept),
+                            max(span["bbox"][3] for span in kept)
+                        )
+                    spans = kept
+                line_text = "".join(span.get("text", "") for span in spans).strip()
+                if not line_text:
+                    continue
                 
-                for span in line.get("spans", []):
-                    line_text += span.get("text", "")
-                    if not font_info:  # Use first span's font info
-                        font_info = {
-                            "font": span.get("font", ""),
-                            "size": span.get("size", 0),
-                            "flags": span.get("flags", 0)
-                        }
+                # Use first span's font info
+                first = spans[0]
+                font_info = {
+                    "font": first.get("font", ""),
+                    "size": first.get("size", 0),
+                    "flags": first.get("flags", 0)
+                }
                 
-                if line_text.strip():
-                    # Determine block type based on formatting
-                    block_type = self._determine_block_type(line_text, font_info)
-                    level = self._get_heading_level(font_info) if block_type == BlockType.HEADING else None
-                    
-                    text_block = TextBlock(
-                        type=block_type,
-                        content=line_text.strip(),
-                        level=level,
-                        style=font_info,
-                        bbox={
-                            "x0": line["bbox"][0],
-                            "y0": line["bbox"][1],
-                            "x1": line["bbox"][2],
-                            "y1": line["bbox"][3],
-                            "page": page_num
-                        }
-                    )
-                    ast.textBlocks.append(text_block)
+                # Determine block type based on formatting
+                block_type = self._determine_block_type(line_text, font_info)
+                level = self._get_heading_level(font_info) if block_type == BlockType.HEADING else None
+                lines.append((line_text, font_info, block_type, level, bbox))
+        
+        columns = ast.columns
+        if len(lines) > 1 and self.config.get("paragraph_coalescing", True):
+            self._append_paragraphs(columns, lines, page_num)
+        else:
+            for line_text, font_info, block_type, level, bbox in lines:
+                columns.append(block_type, line_text, level, font_info, bbox, page_num)
 
-    async def _extract_images(self, page, ast: DocumentAST, page_num: int) -> None:
+    def _append_paragraphs(self, columns: TextColumns, lines: List[tuple], page_num: int) -> None:
+        """
+        Merge the lines of a page into paragraphs and append them.
+        Each paragraph keeps the type, level and style of its first line.
+        """
+        texts = [line[0] for line in lines]
+        line_boxes = np.array([line[4][:4] for line in lines], dtype=np.float64)
+        font_ids: Dict[tuple, int] = {}
+        starts = paragraph_starts(
+            texts,
+            line_boxes,
+            np.array([line[1]["size"] for line in lines], dtype=np.float64),
+            np.array([font_ids.setdefault((line[1]["font"], line[1]["flags"]), len(font_ids)) for line in lines]),
+            np.array([KIND_CODES[line[2]] for line in lines])
+        )
+        boxes = merge_boxes(line_boxes, starts)
+        stops = [*starts[1:].tolist(), len(lines)]
+        for start, stop, box in zip(starts.tolist(), stops, boxes.tolist()):
+            _, font_info, block_type, level, _ = lines[start]
+            text = join_lines(texts[start:stop]) if stop - start > 1 else texts[start]
+            columns.append(block_type, text, level, font_info, box, page_num)
+
+    def _extract_images(
+        self, page, ast: DocumentAST, page_num: int, xref_refs: Dict[int, Tuple[str, str]]
+    ) -> None:
         """Extract images from a PDF page."""
         image_list = page.get_images()
         
         for img_index, img in enumerate(image_list):
             try:
                 xref = img[0]
-                base_image = page.parent.extract_image(xref)
-                image_bytes = base_image["image"]
-                image_ext = base_image["ext"]
-                
-                # Convert to base64
-                image_base64 = base64.b64encode(image_bytes).decode()
+                ref, image_format = xref_refs.get(xref, (None, None))
+                if ref is not None and ref in self.blob_store:
+                    # Same image object drawn on an earlier page
+                    self.blob_store.retain(ref)
+                else:
+                    base_image = page.parent.extract_image(xref)
+                    
+                    # Keep raw bytes in the blob store; blocks only hold the digest
+                    ref = self.blob_store.put(base_image["image"])
+                    image_format = base_image["ext"].upper()
+                    xref_refs[xref] = (ref, image_format)
                 
                 # Get image rectangle
                 img_rects = page.get_image_rects(xref)
@@ -143,8 +398,8 @@ class PDFParser(BaseParser):
                     }
                 
                 image_block = ImageBlock(
-                    data=image_base64,
-                    format=image_ext.upper(),
+                    ref=ref,
+                    format=image_format,
                     bbox=bbox
                 )
                 ast.images.append(image_block)
@@ -153,69 +408,28 @@ class PDFParser(BaseParser):
                 # Skip problematic images
                 continue
 
-    async def _extract_tables(self, page, ast: DocumentAST, page_num: int) -> None:
-        """Extract tables from a PDF page (basic implementation)."""
-        # This is a simplified table detection based on text positioning
-        # For better table extraction, consider using libraries like camelot-py or tabula-py
-        
-        blocks = page.get_text("dict")
-        potential_table_blocks = []
+    def _extract_tables(self, page, layout: PageLayout, ast: DocumentAST, page_num: int) -> Set[SpanKey]:
+        """
+        Detect tables from ruling lines and whitespace-aligned columns.
         
-        for block in blocks.get("blocks", []):
-            if "lines" not in block:
-                continue
-            
-            # Look for blocks with multiple aligned text spans
-            lines_data = []
-            for line in block["lines"]:
-                spans_data = []
-                for span in line.get("spans", []):
-                    text = span.get("text", "").strip()
-                    if text:
-                        spans_data.append({
-                            "text": text,
-                            "bbox": span.get("bbox", [0, 0, 0, 0])
-                        })
-                if len(spans_data) > 1:  # Multiple columns might indicate a table
-                    lines_data.append(spans_data)
-            
-            if len(lines_data) >= 2:  # At least 2 rows
-                potential_table_blocks.append({
-                    "lines": lines_data,
-                    "bbox": block.get("bbox", [0, 0, 0, 0])
-                })
+        Returns:
+            Keys of the layout spans placed in tables
+        """
+        if not self.config.get("table_detection", True):
+            return set()
+        spans = page_spans(layout.blocks)
+        if not spans:
+            return set()
         
-        # Convert potential table blocks to TableBlock objects
-        for table_data in potential_table_blocks:
-            if len(table_data["lines"]) >= 2:
-                # Use first row as headers
-                headers = [span["text"] for span in table_data["lines"][0]]
-                
-                # Use remaining rows as data
-                rows = []
-                for line in table_data["lines"][1:]:
-                    row = [span["text"] for span in line]
-                    # Pad row to match header length
-                    while len(row) < len(headers):
-                        row.append("")
-                    rows.append(row[:len(headers)])  # Truncate if too long
-                
-                table_block = TableBlock(
-                    headers=headers,
-                    rows=rows,
-                    bbox={
-                        "x0": table_data["bbox"][0],
-                        "y0": table_data["bbox"][1],
-                        "x1": table_data["bbox"][2],
-                        "y1": table_data["bbox"][3],
-                        "page": page_num
-                    }
-                )
-                ast.tables.append(table_block)
+        drawings = page.get_cdrawings() if hasattr(page, "get_cdrawings") else page.get_drawings()
+        horizontal, vertical = ruling_segments(drawings, (layout.width, layout.height))
+        tables, consumed = detect_tables(spans, horizontal, vertical, page_num)
+        ast.tables.extend(tables)
+        return consumed
 
-    async def _extract_math(self, page, ast: DocumentAST, page_num: int) -> None:
+    def _extract_math(self, layout: PageLayout, ast: DocumentAST, page_num: int) -> None:
         """Extract mathematical expressions from a PDF page."""
-        text = page.get_text()
+        text = layout.text
         
         # Simple regex patterns for common math expressions
         math_patterns = [
@@ -236,7 +450,9 @@ class PDFParser(BaseParser):
                 math_block = MathBlock(
                     content=math_content,
                     format="latex",
-                    is_inline=is_inline
+                    is_inline=is_inline,
+                    # Matched in the page text, so only the page is known
+                    bbox={"page": page_num}
                 )
                 ast.math.append(math_block)
 
@@ -278,3 +494,51 @@ class PDFParser(BaseParser):
             return 5
         else:
             return 6
+
+
+def _parse_page_range(
+    file_path: str, start: int, stop: int, config: dict
+) -> Tuple[int, DocumentAST, Dict[str, bytes]]:
+    """
+    Parse a contiguous range of pages in a worker process.
+
+    Images are collected in a fresh global blob store of the worker process
+    and shipped back with the fragment, since the parent's store is not
+    shared across processes.
+
+    Args:
+        file_path: Path to the PDF file
+        start: First page number (inclusive)
+        stop: Last page number (exclusive)
+        config: Parser configuration
+
+    Returns:
+        Tuple of (number of pages parsed, AST fragment for the range, image bytes by digest)
+    """
+    blob_store = reset_blob_store()
+    parser = PDFParser(config)
+    doc_key = document_key(file_path) if parser._layout_cache is not None else None
+    xref_refs = {}
+    fragment = DocumentAST()
+    with fitz.open(file_path) as doc:
+        for page_num in range(start, stop):
+            page = doc[page_num]
+            page_fragment = parser._parse_page(page, page_num, doc_key, xref_refs)
+            if config.get("ocr_enabled") and needs_ocr(page_fragment):
+                # Worker processes OCR their own pages directly
+                dpi = config.get("ocr_dpi", 300)
+                try:
+                    blocks = recognise_page(
+                        rasterize_page(page, dpi),
+                        page_num,
+                        dpi,
+                        config.get("ocr_language", "eng"),
+                        config.get("ocr_timeout", 0)
+                    )
+                except Exception as e:
+                    logger.warning(f"OCR failed for page {page_num + 1}: {e}")
+                else:
+                    parser._apply_ocr(page_fragment, blocks, page.rect.width, page.rect.height)
+            fragment.extend(page_fragment)
+    fragment.units = stop - start
+    return stop - start, fragment, {digest: bytes(data) for digest, data in blob_store.items()}
@@ -0,0 +1,333 @@
+"""
+Table detection for PDF pages.
+Tables are found in two ways: grids of ruling lines drawn on the page, and
+runs of text rows whose cells line up in columns separated by whitespace.
+Spans placed in a table are reported as consumed so they are not emitted as
+text blocks as well. Both passes sort their input once and sweep it, keeping
+the cost per page at O(n log n).
+"""
+
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .ast_models import TableBlock
+
+
+# Identity of a span in a page layout: (block index, line index, span index)
+SpanKey = Tuple[int, int, int]
+
+# Distance, in points, within which ruling lines and their ends are considered to touch
+RULE_TOLERANCE = 2.0
+
+# Thickness, in points, up to which a filled rectangle is read as a ruling line
+MAX_RULE_THICKNESS = 3.0
+
+# Share of the page width and height from which a rectangle is read as a page frame, not a cell
+PAGE_FRAME = 0.9
+
+# Horizontal gap, in font sizes, that separates two cells of a row
+MIN_GUTTER = 1.0
+
+# Rows (including the header) a whitespace table needs
+MIN_ROWS = 3
+
+# Vertical distance, in row heights, beyond which a run of table rows ends
+MAX_ROW_GAP = 2.5
+
+# Average cell length above which aligned text is read as multi-column prose
+MAX_CELL_CHARS = 40
+
+
+class Span(NamedTuple):
+    """A piece of text on the page."""
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    text: str
+    size: float
+    key: SpanKey
+
+
+class Segment(NamedTuple):
+    """A ruling line: ``pos`` is its y (horizontal) or x (vertical), ``start`` to ``end`` its extent."""
+    pos: float
+    start: float
+    end: float
+
+
+def page_spans(blocks: Sequence[Dict[str, Any]]) -> List[Span]:
+    """
+    Collect the non-blank spans of a page layout.
+
+    Args:
+        blocks: Text blocks of a ``PageLayout``
+
+    Returns:
+        Spans with their layout keys
+    """
+    spans = []
+    for block_index, block in enumerate(blocks):
+        for line_index, line in enumerate(block["lines"]):
+            for span_index, span in enumerate(line.get("spans", [])):
+                text = span.get("text", "").strip()
+                if text:
+                    x0, y0, x1, y1 = span["bbox"]
+                    spans.append(Span(x0, y0, x1, y1, text, span.get("size", 0), (block_index, line_index, span_index)))
+    return spans
+
+
+def ruling_segments(
+    drawings: Iterable[Dict[str, Any]],
+    page_size: Optional[Tuple[float, float]] = None
+) -> Tuple[List[Segment], List[Segment]]:
+    """
+    Extract horizontal and vertical ruling lines from page drawings.
+
+    Straight lines and thin filled rectangles count as rules; stroked
+    rectangles contribute their four edges, since cell borders are often
+    drawn that way. Frames around the whole page are ignored.
+
+    Args:
+        drawings: Result of ``page.get_drawings()`` or ``page.get_cdrawings()``
+        page_size: Page (width, height), used to recognise page frames
+
+    Returns:
+        Tuple of (horizontal segments, vertical segments)
+    """
+    horizontal: List[Segment] = []
+    vertical: List[Segment] = []
+
+    def add_line(ax: float, ay: float, bx: float, by: float) -> None:
+        if abs(ay - by) <= RULE_TOLERANCE and abs(ax - bx) > RULE_TOLERANCE:
+            horizontal.append(Segment((ay + by) / 2, min(ax, bx), max(ax, bx)))
+        elif abs(ax - bx) <= RULE_TOLERANCE and abs(ay - by) > RULE_TOLERANCE:
+            vertical.append(Segment((ax + bx) / 2, min(ay, by), max(ay, by)))
+
+    for path in drawings:
+        stroked = path.get("color") is not None
+        for item in path.get("items", ()):
+            if item[0] == "l":
+                if stroked:
+                    add_line(item[1][0], item[1][1], item[2][0], item[2][1])
+            elif item[0] == "re":
+                x0, y0, x1, y1 = item[1][0], item[1][1], item[1][2], item[1][3]
+                if y1 - y0 <= MAX_RULE_THICKNESS or x1 - x0 <= MAX_RULE_THICKNESS:
+                    add_line(x0, (y0 + y1) / 2, x1, (y0 + y1) / 2)
+                    add_line((x0 + x1) / 2, y0, (x0 + x1) / 2, y1)
+                elif stroked and not _is_page_frame(x1 - x0, y1 - y0, page_size):
+                    add_line(x0, y0, x1, y0)
+                    add_line(x0, y1, x1, y1)
+                    add_line(x0, y0, x0, y1)
+                    add_line(x1, y0, x1, y1)
+    return horizontal, vertical
+
+
+def detect_tables(
+    spans: Sequence[Span],
+    horizontal: Sequence[Segment],
+    vertical: Sequence[Segment],
+    page_num: int
+) -> Tuple[List[TableBlock], Set[SpanKey]]:
+    """
+    Detect the tables of a page.
+
+    Ruled grids are detected first; the remaining spans are searched for
+    whitespace-aligned tables.
+
+    Args:
+        spans: Spans of the page, see ``page_spans``
+        horizontal: Horizontal ruling lines
+        vertical: Vertical ruling lines
+        page_num: Zero-based page number
+
+    Returns:
+        Tuple of (tables, keys of the spans placed in them)
+    """
+    tables: List[TableBlock] = []
+    consumed: Set[SpanKey] = set()
+
+    for table, keys in _ruled_tables(spans, horizontal, vertical, page_num):
+        tables.append(table)
+        consumed.update(keys)
+
+    remaining = [span for span in spans if span.key not in consumed]
+    for table, keys in _whitespace_tables(remaining, page_num):
+        tables.append(table)
+        consumed.update(keys)
+
+    return tables, consumed
+
+
+def _ruled_tables(
+    spans: Sequence[Span],
+    horizontal: Sequence[Segment],
+    vertical: Sequence[Segment],
+    page_num: int
+) -> List[Tuple[TableBlock, List[SpanKey]]]:
+    """Find grids of ruling lines and read the text of their cells."""
+    if len(horizontal) < 2 or len(vertical) < 2:
+        return []
+
+    # Vertical bands of touching rules: sweep the rules' y extents in order
+    extents = sorted(
+        [(rule.pos - RULE_TOLERANCE, rule.pos + RULE_TOLERANCE, False, rule) for rule in horizontal]
+        + [(rule.start - RULE_TOLERANCE, rule.end + RULE_TOLERANCE, True, rule) for rule in vertical],
+        key=lambda extent: extent[0]
+    )
+    bands: List[Tuple[List[Segment], List[Segment]]] = []
+    band_end = None
+    for start, end, is_vertical, rule in extents:
+        if band_end is None or start > band_end:
+            bands.append(([], []))
+            band_end = end
+        else:
+            band_end = max(band_end, end)
+        bands[-1][1 if is_vertical else 0].append(rule)
+
+    spans_by_y = sorted(spans, key=lambda span: (span.y0 + span.y1) / 2)
+    centers_y = [(span.y0 + span.y1) / 2 for span in spans_by_y]
+
+    results = []
+    for rows_rules, column_rules in bands:
+        xs = _cluster(rule.pos for rule in column_rules)
+        ys = _cluster(rule.pos for rule in rows_rules)
+        if len(xs) < 3 or len(ys) < 3:
+            continue
+
+        # Place each span whose center lies inside the grid into its cell
+        cells: Dict[Tuple[int, int], List[Span]] = {}
+        keys = []
+        for index in range(bisect_right(centers_y, ys[0]), bisect_right(centers_y, ys[-1])):
+            span = spans_by_y[index]
+            column = bisect_right(xs, (span.x0 + span.x1) / 2) - 1
+            if 0 <= column < len(xs) - 1:
+                row = min(bisect_right(ys, centers_y[index]), len(ys) - 1) - 1
+                cells.setdefault((row, column), []).append(span)
+                keys.append(span.key)
+
+        grid = [
+            [_cell_text(cells.get((row, column), ())) for column in range(len(xs) - 1)]
+            for row in range(len(ys) - 1)
+        ]
+        grid = [row for row in grid if any(row)]
+        if len(grid) < 2:
+            continue
+        bbox = (xs[0], ys[0], xs[-1], ys[-1])
+        results.append((_table(grid, bbox, page_num), keys))
+    return results
+
+
+def _whitespace_tables(spans: Sequence[Span], page_num: int) -> List[Tuple[TableBlock, List[SpanKey]]]:
+    """Find runs of text rows whose cells line up in whitespace-separated columns."""
+    results = []
+    run: List[List[List[Span]]] = []
+    for row in _text_rows(spans):
+        cells = _row_cells(row)
+        if len(cells) >= 2 and run and _row_gap(run[-1], cells) <= MAX_ROW_GAP:
+            run.append(cells)
+            continue
+        results.extend(_run_table(run, page_num))
+        run = [cells] if len(cells) >= 2 else []
+    results.extend(_run_table(run, page_num))
+    return results
+
+
+def _run_table(run: List[List[List[Span]]], page_num: int) -> List[Tuple[TableBlock, List[SpanKey]]]:
+    """Turn a run of multi-cell rows into a table if its columns line up."""
+    if len(run) < MIN_ROWS:
+        return []
+
+    # Columns are the gaps left clear in every row: merge all cell extents in x order
+    extents = sorted((cell[0].x0, max(span.x1 for span in cell)) for cells in run for cell in cells)
+    columns: List[List[float]] = []
+    for x0, x1 in extents:
+        if columns and x0 <= columns[-1][1]:
+            columns[-1][1] = max(columns[-1][1], x1)
+        else:
+            columns.append([x0, x1])
+    if len(columns) < 2:
+        return []
+
+    texts = [_cell_text(cell) for cells in run for cell in cells]
+    if sum(len(text) for text in texts) / len(texts) > MAX_CELL_CHARS:
+        return []
+
+    starts = [column[0] for column in columns]
+    grid = []
+    for cells in run:
+        row = [[] for _ in columns]
+        for cell in cells:
+            row[bisect_right(starts, cell[0].x0) - 1].extend(cell)
+        grid.append([_cell_text(parts) for parts in row])
+
+    all_spans = [span for cells in run for cell in cells for span in cell]
+    bbox = (
+        columns[0][0],
+        min(span.y0 for span in all_spans),
+        columns[-1][1],
+        max(span.y1 for span in all_spans)
+    )
+    return [(_table(grid, bbox, page_num), [span.key for span in all_spans])]
+
+
+def _text_rows(spans: Sequence[Span]) -> List[List[Span]]:
+    """Group spans into visual rows by the vertical position of their centers."""
+    rows: List[List[Span]] = []
+    row_center = row_height = None
+    for span in sorted(spans, key=lambda span: (span.y0 + span.y1) / 2):
+        center = (span.y0 + span.y1) / 2
+        height = span.y1 - span.y0
+        if rows and abs(center - row_center) <= min(row_height, height) / 2:
+            rows[-1].append(span)
+        else:
+            rows.append([span])
+            row_center, row_height = center, height
+    return rows
+
+
+def _row_cells(row: List[Span]) -> List[List[Span]]:
+    """Split a row into cells wherever the gap between spans is a gutter."""
+    cells: List[List[Span]] = []
+    for span in sorted(row, key=lambda span: span.x0):
+        if cells and span.x0 - max(part.x1 for part in cells[-1]) < MIN_GUTTER * max(span.size, 1.0):
+            cells[-1].append(span)
+        else:
+            cells.append([span])
+    return cells
+
+
+def _row_gap(previous: List[List[Span]], cells: List[List[Span]]) -> float:
+    """Vertical distance between two rows, in heights of the previous row."""
+    bottom = max(span.y1 for cell in previous for span in cell)
+    top = min(span.y0 for cell in cells for span in cell)
+    height = max(max(span.y1 - span.y0 for cell in previous for span in cell), 1.0)
+    return (top - bottom) / height
+
+
+def _is_page_frame(width: float, height: float, page_size: Optional[Tuple[float, float]]) -> bool:
+    """Check whether a rectangle spans (almost) the whole page."""
+    return page_size is not None and width >= PAGE_FRAME * page_size[0] and height >= PAGE_FRAME * page_size[1]
+
+
+def _cluster(positions: Iterable[float]) -> List[float]:
+    """Merge positions closer than the rule tolerance, keeping the first of each group."""
+    clustered: List[float] = []
+    for position in sorted(positions):
+        if not clustered or position - clustered[-1] > RULE_TOLERANCE:
+            clustered.append(position)
+    return clustered
+
+
+def _cell_text(spans: Iterable[Span]) -> str:
+    """Join the spans of a cell in reading order."""
+    return " ".join(span.text for span in sorted(spans, key=lambda span: (round(span.y0), span.x0)))
+
+
+def _table(grid: List[List[str]], bbox: Tuple[float, float, float, float], page_num: int) -> TableBlock:
+    """Build a table whose first row is its header."""
+    return TableBlock(
+        headers=grid[0],
+        rows=grid[1:],
+        bbox={"x0": bbox[0], "y0": bbox[1], "x1": bbox[2], "y1": bbox[3], "page": page_num}
+    )
@@ -3,8 +3,7 @@ PPTX Parser using python-pptx.
 Extracts text, images, and other content from PowerPoint files.
 """
 
-import base64
-from typing import Optional, AsyncGenerator
+from typing import Optional, AsyncGenerator, AsyncIterator
 from pathlib import Path
 from pptx import Presentation
 
@@ -23,11 +22,17 @@ class PPTXParser(BaseParser):
         self, file_path: Path, progress_callback: Optional[AsyncGenerator[ParseProgress, None]] = None
     ) -> DocumentAST:
         """Parse PPTX document and extract content."""
+        return await self._collect_stream(file_path, progress_callback)
+
+    async def parse_stream(
+        self, file_path: Path, progress_callback: Optional[AsyncGenerator[ParseProgress, None]] = None
+    ) -> AsyncIterator[DocumentAST]:
+        """Parse PPTX document incrementally, yielding one fragment per slide."""
         try:
             await self._emit_progress(progress_callback, "initialization", 0.0, "Opening PPTX document")
 
             presentation = Presentation(file_path)
-            ast = DocumentAST(metadata={"format": "PPTX", "slides": len(presentation.slides)})
+            yield DocumentAST(metadata={"format": "PPTX", "slides": len(presentation.slides)})
 
             total_slides = len(presentation.slides)
             
@@ -38,6 +43,7 @@ class PPTXParser(BaseParser):
                     i / total_slides, 
                     f"Processing slide {i + 1} of {total_slides}"
                 )
+                ast = DocumentAST()
                 
                 # Extract text from all shapes in the slide
                 for shape in slide.shapes:
@@ -60,15 +66,15 @@ class PPTXParser(BaseParser):
                     if hasattr(shape, "image"):
                         image = shape.image
                         image_data = image.blob
-                        image_base64 = base64.b64encode(image_data).decode()
                         image_block = ImageBlock(
-                            data=image_base64,
+                            ref=self.blob_store.put(image_data),
                             format=image.ext.upper()
                         )
                         ast.images.append(image_block)
 
+                yield ast
+
             await self._emit_progress(progress_callback, "completion", 1.0, "PPTX parsing completed")
-            return ast
 
         except Exception as e:
             raise ParseError(f"Failed to parse PPTX: {str(e)}", file_path, e)
@@ -0,0 +1,49 @@
+"""
+Shared process pool for CPU-bound parsing work.
+Parsers submit picklable, module-level functions so heavy decoding runs
+outside the event loop and across all available cores.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+
+# Global pool instance
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Get or create the global parse process pool.
+
+    The pool is sized by the first caller and reused afterwards. Workers are
+    started with the "spawn" method so that native libraries such as PyMuPDF
+    never inherit state from the (multi-threaded) server process.
+
+    Args:
+        max_workers: Number of worker processes to start
+
+    Returns:
+        ProcessPoolExecutor instance
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+def shutdown_process_pool(wait: bool = True) -> None:
+    """
+    Shutdown the global parse process pool.
+
+    Args:
+        wait: Whether to wait for running tasks to finish
+    """
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=wait, cancel_futures=not wait)
+        _process_pool = None
@@ -0,0 +1,81 @@
+"""
+Reading order of positioned blocks on a page.
+Pages are split into horizontal bands by full-width blocks; within a band a
+two-column page is read left column first, then right column, each top to
+bottom.
+"""
+
+import math
+from bisect import bisect_right
+from typing import List, Sequence, Tuple
+
+# Bounding box as (x0, y0, x1, y1)
+Box = Tuple[float, float, float, float]
+
+# Reading-order key: (band, column, y0, x0)
+OrderKey = Tuple[float, int, float, float]
+
+# Key of blocks known to be on a page but without a position: after the rest of the page
+END_OF_PAGE: OrderKey = (math.inf, 0, 0.0, 0.0)
+
+# Slack, in points, allowed when deciding which side of the gutter a block is on
+GUTTER_TOLERANCE = 6.0
+
+# Blocks needed on each side of the gutter before a page is read as two columns
+MIN_COLUMN_BLOCKS = 3
+
+FULL_WIDTH, LEFT, RIGHT = 0, 1, 2
+
+
+def reading_order_keys(boxes: Sequence[Box]) -> List[OrderKey]:
+    """
+    Compute reading-order keys for the blocks of one page.
+
+    Args:
+        boxes: Bounding boxes of all positioned blocks on the page
+
+    Returns:
+        One sortable key per box, in the same order as ``boxes``
+    """
+    if not boxes:
+        return []
+
+    left_edge = min(box[0] for box in boxes)
+    right_edge = max(box[2] for box in boxes)
+    gutter = (left_edge + right_edge) / 2
+    sides = [
+        LEFT if box[2] <= gutter + GUTTER_TOLERANCE
+        else RIGHT if box[0] >= gutter - GUTTER_TOLERANCE
+        else FULL_WIDTH
+        for box in boxes
+    ]
+
+    if not _is_two_column(boxes, sides):
+        return [(0, FULL_WIDTH, box[1], box[0]) for box in boxes]
+
+    # Each full-width block opens a new band
+    band_starts = sorted(box[1] for box, side in zip(boxes, sides) if side == FULL_WIDTH)
+    return [
+        (bisect_right(band_starts, box[1]), side, box[1], box[0])
+        for box, side in zip(boxes, sides)
+    ]
+
+
+def _is_two_column(boxes: Sequence[Box], sides: Sequence[int]) -> bool:
+    """Check whether enough blocks sit side by side across the gutter."""
+    left = sorted((box[1], box[3]) for box, side in zip(boxes, sides) if side == LEFT)
+    right = sorted((box[1], box[3]) for box, side in zip(boxes, sides) if side == RIGHT)
+    if len(left) < MIN_COLUMN_BLOCKS or len(right) < MIN_COLUMN_BLOCKS:
+        return False
+
+    # Sweep both sides by top edge, counting right blocks overlapping a left block
+    overlapping = 0
+    index = 0
+    reach = -math.inf
+    for y0, y1 in right:
+        while index < len(left) and left[index][0] < y1:
+            reach = max(reach, left[index][1])
+            index += 1
+        if reach > y0:
+            overlapping += 1
+    return overlapping >= MIN_COLUMN_BLOCKS
@@ -3,7 +3,7 @@ XLSX Parser using openpyxl.
 Extracts tables and text content from Excel files.
 """
 
-from typing import Optional, AsyncGenerator
+from typing import Optional, AsyncGenerator, AsyncIterator
 from pathlib import Path
 from openpyxl import load_workbook
 
@@ -22,11 +22,17 @@ class XLSXParser(BaseParser):
         self, file_path: Path, progress_callback: Optional[AsyncGenerator[ParseProgress, None]] = None
     ) -> DocumentAST:
         """Parse XLSX document and extract content."""
+        return await self._collect_stream(file_path, progress_callback)
+
+    async def parse_stream(
+        self, file_path: Path, progress_callback: Optional[AsyncGenerator[ParseProgress, None]] = None
+    ) -> AsyncIterator[DocumentAST]:
+        """Parse XLSX document incrementally, yielding one fragment per sheet."""
         try:
             await self._emit_progress(progress_callback, "initialization", 0.0, "Opening XLSX document")
 
             workbook = load_workbook(file_path, data_only=True)
-            ast = DocumentAST(metadata={"format": "XLSX", "sheets": workbook.sheetnames})
+            yield DocumentAST(metadata={"format": "XLSX", "sheets": workbook.sheetnames})
 
             total_sheets = len(workbook.sheetnames)
             
@@ -39,6 +45,7 @@ class XLSXParser(BaseParser):
                 )
                 
                 worksheet = workbook[sheet_name]
+                ast = DocumentAST()
                 
                 # Extract table data from each worksheet
                 if worksheet.max_row > 0:
@@ -69,8 +76,9 @@ class XLSXParser(BaseParser):
                         markdown_table += "| " + " | ".join(row) + " |\n"
                     ast.metadata[f"markdown_{sheet_name}"] = markdown_table
 
+                yield ast
+
             await self._emit_progress(progress_callback, "completion", 1.0, "XLSX parsing completed")
-            return ast
 
         except Exception as e:
             raise ParseError(f"Failed to parse XLSX: {str(e)}", file_path, e)
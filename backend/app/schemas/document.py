@@ -36,6 +36,7 @@ class DocumentResponse(BaseModel):
     file_size: int
     file_type: str
     mime_type: str
+    content_hash: Optional[str] = None
     file_path: Optional[str] = None
     processing_status: str
     created_at: datetime
@@ -47,11 +48,34 @@ class DocumentResponse(BaseModel):
     extracted_text: Optional[str] = None
     ai_description: Optional[str] = None
     markdown_path: Optional[str] = None
+    markdown_size: Optional[int] = None
+    markdown_sha256: Optional[str] = None
     
     class Config:
         from_attributes = True
 
 
+class DocumentSummary(BaseModel):
+    """
+    Schema for a document in a listing, without extracted content.
+    """
+    id: str
+    filename: str
+    original_filename: str
+    file_size: int
+    file_type: str
+    mime_type: str
+    content_hash: Optional[str] = None
+    markdown_path: Optional[str] = None
+    markdown_size: Optional[int] = None
+    processing_status: str
+    processing_started_at: Optional[datetime] = None
+    processing_completed_at: Optional[datetime] = None
+    user_id: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
 class DocumentList(BaseModel):
     """
     Schema for listing documents.
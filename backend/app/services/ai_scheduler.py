@@ -0,0 +1,219 @@
+"""
+Process-wide scheduler for OpenAI API requests.
+Enforces requests-per-minute and tokens-per-minute budgets and adapts the
+number of concurrent requests to rate limiting signalled by the API.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Pause applied after a 429 response that carries no Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: int):
+        """
+        Initialize the bucket full.
+
+        Args:
+            per_minute: Budget per minute, which is also the bucket capacity
+        """
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float) -> None:
+        """Wait until ``amount`` tokens are available and take them."""
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def refund(self, amount: float) -> None:
+        """Return unused tokens to the bucket."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class AdaptiveScheduler:
+    """
+    Concurrency limiter with rate budgets and additive-increase,
+    multiplicative-decrease adaptation.
+
+    The concurrency limit grows by one after a full window of successful
+    requests and is halved on every 429 response, which also pauses all new
+    requests for the Retry-After period. Requests from every document share
+    the same limit and budgets.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        min_concurrency: int = 1
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Upper bound for concurrent requests
+            requests_per_minute: Request budget (0 disables the limit)
+            tokens_per_minute: Token budget (0 disables the limit)
+            min_concurrency: Lower bound the limit never shrinks below
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = self.max_concurrency
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._paused_until = 0.0
+        self._successes = 0
+        self.completed = 0
+        self.rate_limited = 0
+
+    @staticmethod
+    def is_rate_limit_error(error: BaseException) -> bool:
+        """Check whether an exception is an HTTP 429 response."""
+        return getattr(error, "status_code", None) == 429
+
+    @staticmethod
+    def retry_after(error: BaseException) -> Optional[float]:
+        """Read the Retry-After delay in seconds from an API error, if present."""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return None
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000.0
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except (TypeError, ValueError):
+            pass
+        return None
+
+    async def run(self, call: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """
+        Run an API call once a concurrency slot and rate budget are available.
+
+        Args:
+            call: Factory returning the awaitable API call
+            tokens: Estimated tokens consumed by the call
+
+        Returns:
+            Result of the call
+
+        Raises:
+            Exception: Any error raised by the call, after adapting to rate limits
+        """
+        await self._acquire_slot()
+        try:
+            if self.requests is not None:
+                await self.requests.acquire(1)
+            if self.tokens is not None and tokens:
+                await self.tokens.acquire(tokens)
+
+            try:
+                result = await call()
+            except Exception as e:
+                if self.is_rate_limit_error(e):
+                    self._on_rate_limited(self.retry_after(e))
+                raise
+
+            self._on_success()
+            return result
+        finally:
+            self._release_slot()
+
+    def reconcile_tokens(self, estimated: int, actual: Optional[int]) -> None:
+        """Refund the difference between estimated and reported token usage."""
+        if self.tokens is not None and actual is not None and actual < estimated:
+            self.tokens.refund(estimated - actual)
+
+    async def _acquire_slot(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            if self._active < self.limit:
+                self._active += 1
+                return
+
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # Woken for a free slot but cancelled before taking it: pass it on
+                    self._wake_waiters()
+                raise
+
+    def _release_slot(self) -> None:
+        self._active -= 1
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        free = self.limit - self._active
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if waiter.done() or waiter.get_loop().is_closed():
+                continue
+            waiter.set_result(None)
+            free -= 1
+
+    def _on_success(self) -> None:
+        self.completed += 1
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_concurrency:
+            self.limit += 1
+            self._successes = 0
+            self._wake_waiters()
+
+    def _on_rate_limited(self, retry_after: Optional[float]) -> None:
+        self.rate_limited += 1
+        self._successes = 0
+        self.limit = max(self.min_concurrency, self.limit // 2)
+        delay = retry_after if retry_after is not None else DEFAULT_RETRY_AFTER
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        logger.warning(f"Rate limited by the API; concurrency reduced to {self.limit}, pausing {delay:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get current concurrency and rate limiting statistics."""
+        return {
+            "concurrency_limit": self.limit,
+            "max_concurrency": self.max_concurrency,
+            "active_requests": self._active,
+            "queued_requests": len(self._waiters),
+            "completed_requests": self.completed,
+            "rate_limited_responses": self.rate_limited,
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 3),
+        }
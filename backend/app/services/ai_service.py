@@ -5,20 +5,99 @@ Provides image description functionality with retry logic and OCR fallback.
 
 import asyncio
 import base64
+import copy
+import hashlib
 import logging
-from typing import Optional, Dict, Any
-from io import BytesIO
+from typing import Optional, Dict, Any, List, Tuple, Union
 
 import httpx
 from openai import AsyncOpenAI
 from PIL import Image
-import pytesseract
 
 from app.core.config import get_openai_config
+from app.services.ai_scheduler import AdaptiveScheduler
+from app.services.analysis_cache import AnalysisCache
+from app.services.ocr_pool import get_ocr_pool
 
 
 logger = logging.getLogger(__name__)
 
+# Raw image bytes, or an already base64-encoded string
+ImageInput = Union[bytes, bytearray, memoryview, str]
+
+# Rough input token cost of one image at high detail, used for rate budgeting
+IMAGE_TOKEN_ESTIMATE = 1105
+
+# System prompt for structured image analysis
+STRUCTURED_ANALYSIS_PROMPT = """You are a document analysis assistant.
+
+Your task is to extract structured metadata and contextual understanding of a figure (image, chart, or diagram) from a document.
+
+Please output the result in valid JSON matching the following schema:
+
+{
+  "id": "",
+  "type": "", 
+  "title": "",
+  "caption": "",
+  "source": {
+    "filename": "",
+    "page": 0,
+    "documentSection": ""
+  },
+  "location": {
+    "x": 0,
+    "y": 0,
+    "width": 0,
+    "height": 0
+  },
+  "description": "",
+  "contextualSummary": "",
+  "linkedEntities": [
+    { "type": "", "value": "" }
+  ],
+  "textReferences": [
+    {
+      "text": "",
+      "section": "",
+      "page": 0
+    }
+  ],
+  "semanticTags": [],
+  "aiAnnotations": {
+    "objectsDetected": [],
+    "ocrText": "",
+    "language": "",
+    "explanationGenerated": ""
+  },
+  "relations": {
+    "explains": [],
+    "referencedBy": []
+  }
+}
+
+Ensure all fields are completed if the data is available. Use intelligent guesses for sections like description, contextualSummary, and explanationGenerated based on visual and textual information provided.
+
+For the 'type' field, use one of: image, diagram, chart, graph, table, flowchart, screenshot, photo, illustration.
+
+For 'linkedEntities', identify key concepts, units, components, or terms visible in the image.
+
+For 'semanticTags', provide relevant keywords that describe the content and purpose of the image.
+
+IMPORTANT: Return your response with the JSON wrapped in markdown code blocks like this:
+```json
+{ your JSON here }
+```
+
+Do not include any text outside the code block."""
+
+STRUCTURED_ANALYSIS_INSTRUCTION = "Analyze this image and provide structured metadata."
+
+# Cached analyses are invalidated whenever the prompts change
+STRUCTURED_ANALYSIS_PROMPT_VERSION = hashlib.sha256(
+    f"{STRUCTURED_ANALYSIS_PROMPT}\n{STRUCTURED_ANALYSIS_INSTRUCTION}".encode()
+).hexdigest()[:16]
+
 
 class AIServiceError(Exception):
     """Base exception for AI service errors."""
@@ -51,11 +130,32 @@ class AIService:
             config: Optional configuration dictionary. If None, uses default config.
         """
         self.config = config or get_openai_config()
+        # Retries are handled here so rate limiting is visible to the scheduler
         self.client = AsyncOpenAI(
             api_key=self.config["api_key"],
-            timeout=self.config["timeout"]
+            timeout=self.config["timeout"],
+            max_retries=0
         )
         self._validate_config()
+        
+        # Process-wide scheduler shared by every Vision API request
+        self.scheduler = AdaptiveScheduler(
+            max_concurrency=self.config.get("max_concurrency", 8),
+            requests_per_minute=self.config.get("requests_per_minute", 0),
+            tokens_per_minute=self.config.get("tokens_per_minute", 0)
+        )
+        
+        # In-flight structured analyses keyed by image content digest
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        # Persistent cache of structured analyses
+        self.cache: Optional[AnalysisCache] = None
+        if self.config.get("cache_enabled", False):
+            self.cache = AnalysisCache(
+                path=self.config["cache_path"],
+                ttl_seconds=self.config.get("cache_ttl_seconds", 0),
+                max_entries=self.config.get("cache_max_entries", 50000)
+            )
     
     def _validate_config(self) -> None:
         """Validate configuration parameters."""
@@ -73,12 +173,12 @@ class AIService:
         if self.config.get("retry_delay", 0) <= 0:
             raise AIServiceError("Retry delay must be positive")
     
-    async def describe_image(self, base64_img: str, metadata: dict) -> dict:
+    async def describe_image(self, base64_img: ImageInput, metadata: dict) -> dict:
         """
         Describe an image using OpenAI Vision API and generate metadata.
         
         Args:
-            base64_img: Base64-encoded image string
+            base64_img: Raw image bytes or base64-encoded image string
             metadata: Dictionary containing additional metadata for the image
 
         Returns:
@@ -138,13 +238,25 @@ class AIService:
 
         return structured_metadata.dict()
     
-    async def analyze_image_structured(self, base64_img: str, context: dict = None) -> dict:
+    async def analyze_image_structured(
+        self,
+        base64_img: ImageInput,
+        context: dict = None,
+        digest: Optional[str] = None,
+        force_reanalysis: bool = False
+    ) -> dict:
         """
         Analyze an image and generate structured metadata using GPT-4o.
         
+        Results are cached by image digest, vision model and prompt version, so
+        the same image is only sent to the Vision API once. Concurrent requests
+        for the same image (from any document) share a single Vision API call.
+        
         Args:
-            base64_img: Base64-encoded image string
+            base64_img: Raw image bytes or base64-encoded image string
             context: Optional context dictionary with document info
+            digest: Optional content digest of the image
+            force_reanalysis: Skip the cache lookup and call the Vision API
             
         Returns:
             Dictionary with structured metadata matching ImageMetadata schema
@@ -152,101 +264,127 @@ class AIService:
         Raises:
             AIServiceError: If the operation fails
         """
+        if digest is None and self.cache is not None and base64_img:
+            digest = hashlib.sha256(self._decode_image(base64_img)).hexdigest()
+        
+        if digest is None:
+            metadata, _ = await self._analyze_image_structured(base64_img, context)
+            return metadata
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(digest, self.config["vision_model"], STRUCTURED_ANALYSIS_PROMPT_VERSION)
+            if not force_reanalysis:
+                cached = await self.cache.aget(cache_key)
+                if cached is not None:
+                    return self.apply_image_context(cached, context)
+        
+        task = self._inflight.get(digest)
+        if task is None:
+            task = asyncio.ensure_future(self._analyze_and_cache(base64_img, context, cache_key))
+            self._inflight[digest] = task
+            task.add_done_callback(lambda _: self._inflight.pop(digest, None))
+        
+        # Shield the shared call so one cancelled caller does not cancel the others
+        metadata = await asyncio.shield(task)
+        return self.apply_image_context(metadata, context)
+    
+    async def _analyze_and_cache(
+        self,
+        base64_img: ImageInput,
+        context: Optional[dict],
+        cache_key: Optional[str]
+    ) -> dict:
+        """
+        Run the structured analysis and store the result in the cache.
+        
+        Fallback descriptions are returned but not cached, so the image is
+        analysed again on the next request instead of for the full TTL.
+        """
+        metadata, degraded = await self._analyze_image_structured(base64_img, context)
+        if cache_key is not None and not degraded:
+            try:
+                await self.cache.aset(cache_key, metadata)
+            except Exception as e:
+                logger.warning(f"Failed to cache image analysis: {e}")
+        return metadata
+    
+    @staticmethod
+    def image_id(context: dict) -> str:
+        """Get the identifier of an image occurrence from its context."""
+        return context.get('id') or f"img-{context.get('page') or 0}-{context.get('index') or 0}"
+    
+    @staticmethod
+    def apply_image_context(metadata: dict, context: Optional[dict]) -> dict:
+        """
+        Copy shared image metadata and point it at one occurrence.
+        
+        Cached and deduplicated analyses carry the identity of the occurrence
+        they were produced for; the id, source and location are rewritten
+        from ``context`` so every occurrence describes itself.
+        
+        Args:
+            metadata: Structured metadata produced for the image content
+            context: Context of the occurrence (id, filename, page, section, index, location)
+            
+        Returns:
+            Metadata dictionary owned by the caller
+        """
+        metadata = copy.deepcopy(metadata)
+        if not context:
+            return metadata
+        
+        metadata['id'] = AIService.image_id(context)
+        source = metadata.get('source')
+        if not isinstance(source, dict):
+            source = metadata['source'] = {}
+        source['filename'] = context.get('filename', source.get('filename', ''))
+        source['page'] = context.get('page', source.get('page', 0))
+        source['documentSection'] = context.get('section') or source.get('documentSection', '')
+        if context.get('location'):
+            metadata['location'] = dict(context['location'])
+        return metadata
+    
+    async def _analyze_image_structured(self, base64_img: ImageInput, context: dict = None) -> Tuple[dict, bool]:
+        """
+        Run the structured Vision API analysis for a single image.
+        
+        Returns:
+            Tuple of the metadata and whether it is a description-only fallback
+        """
         # Validate input
         if not base64_img:
             raise AIServiceError("Base64 image string is required")
         
-        # Prepare the system prompt
-        system_prompt = """You are a document analysis assistant.
-
-Your task is to extract structured metadata and contextual understanding of a figure (image, chart, or diagram) from a document.
-
-Please output the result in valid JSON matching the following schema:
-
-{
-  "id": "",
-  "type": "", 
-  "title": "",
-  "caption": "",
-  "source": {
-    "filename": "",
-    "page": 0,
-    "documentSection": ""
-  },
-  "location": {
-    "x": 0,
-    "y": 0,
-    "width": 0,
-    "height": 0
-  },
-  "description": "",
-  "contextualSummary": "",
-  "linkedEntities": [
-    { "type": "", "value": "" }
-  ],
-  "textReferences": [
-    {
-      "text": "",
-      "section": "",
-      "page": 0
-    }
-  ],
-  "semanticTags": [],
-  "aiAnnotations": {
-    "objectsDetected": [],
-    "ocrText": "",
-    "language": "",
-    "explanationGenerated": ""
-  },
-  "relations": {
-    "explains": [],
-    "referencedBy": []
-  }
-}
-
-Ensure all fields are completed if the data is available. Use intelligent guesses for sections like description, contextualSummary, and explanationGenerated based on visual and textual information provided.
-
-For the 'type' field, use one of: image, diagram, chart, graph, table, flowchart, screenshot, photo, illustration.
-
-For 'linkedEntities', identify key concepts, units, components, or terms visible in the image.
-
-For 'semanticTags', provide relevant keywords that describe the content and purpose of the image.
-
-IMPORTANT: Return your response with the JSON wrapped in markdown code blocks like this:
-```json
-{ your JSON here }
-```
-
-Do not include any text outside the code block."""
-        
         # Build context message if provided
         context_msg = ""
         if context:
             context_msg = f"\n\nAdditional context:\n- Document: {context.get('filename', 'Unknown')}\n- Page: {context.get('page', 'Unknown')}\n- Section: {context.get('section', 'Unknown')}"
         
+        # Base64 encoding happens only when the API request is built
+        image_base64 = self._encode_image(base64_img)
         max_retries = self.config.get("max_retries", 3)
         retry_delay = self.config.get("retry_delay", 1.0)
         
         for attempt in range(max_retries + 1):
             try:
-                response = await self.client.chat.completions.create(
-                    model=self.config["vision_model"],
+                response = await self._create_completion(
                     messages=[
                         {
                             "role": "system",
-                            "content": system_prompt
+                            "content": STRUCTURED_ANALYSIS_PROMPT
                         },
                         {
                             "role": "user",
                             "content": [
                                 {
                                     "type": "text",
-                                    "text": f"Analyze this image and provide structured metadata.{context_msg}"
+                                    "text": f"{STRUCTURED_ANALYSIS_INSTRUCTION}{context_msg}"
                                 },
                                 {
                                     "type": "image_url",
                                     "image_url": {
-                                        "url": f"data:image/jpeg;base64,{base64_img}"
+                                        "url": f"data:image/jpeg;base64,{image_base64}"
                                     }
                                 }
                             ]
@@ -281,22 +419,22 @@ Do not include any text outside the code block."""
                     # Fill in missing context if provided
                     if context:
                         if not metadata.get('id'):
-                            metadata['id'] = context.get('id', f"img-{context.get('page', 0)}-{context.get('index', 0)}")
+                            metadata['id'] = self.image_id(context)
                         if 'source' in metadata:
                             metadata['source']['filename'] = context.get('filename', metadata['source'].get('filename', ''))
                             metadata['source']['page'] = context.get('page', metadata['source'].get('page', 0))
                             if not metadata['source'].get('documentSection'):
                                 metadata['source']['documentSection'] = context.get('section', '')
                     
-                    return metadata
+                    return metadata, False
                 except json.JSONDecodeError as e:
                     logger.error(f"Failed to parse JSON response: {e}\nJSON String: {json_str[:500]}...")
                     # Fall back to basic description if JSON parsing fails
                     try:
                         # Use the simple description method as fallback
                         description = await self._describe_with_vision_api(base64_img)
-                        return {
-                            "id": context.get('id', f"img-{context.get('page', 0)}-{context.get('index', 0)}") if context else "img-unknown",
+                        fallback = {
+                            "id": self.image_id(context) if context else "img-unknown",
                             "type": "image",
                             "title": "",
                             "caption": "",
@@ -319,6 +457,7 @@ Do not include any text outside the code block."""
                             },
                             "relations": {"explains": [], "referencedBy": []}
                         }
+                        return fallback, True
                     except Exception as fallback_error:
                         logger.error(f"Fallback description also failed: {fallback_error}")
                         raise VisionAPIError(f"Failed to extract structured data: {e}")
@@ -327,6 +466,11 @@ Do not include any text outside the code block."""
                 if attempt == max_retries:
                     raise VisionAPIError(f"Vision API failed after {max_retries + 1} attempts: {e}")
                 
+                if self.scheduler.is_rate_limit_error(e):
+                    # The scheduler already pauses new requests for Retry-After
+                    logger.warning(f"Vision API attempt {attempt + 1} was rate limited. Retrying...")
+                    continue
+                
                 logger.warning(f"Vision API attempt {attempt + 1} failed: {e}. Retrying in {retry_delay} seconds...")
                 await asyncio.sleep(retry_delay)
                 
@@ -335,12 +479,12 @@ Do not include any text outside the code block."""
         
         raise VisionAPIError("Unexpected error in Vision API retry logic")
     
-    async def _describe_with_vision_api(self, base64_img: str) -> str:
+    async def _describe_with_vision_api(self, base64_img: ImageInput) -> str:
         """
         Describe image using OpenAI Vision API with retry logic.
         
         Args:
-            base64_img: Base64-encoded image string
+            base64_img: Raw image bytes or base64-encoded image string
             
         Returns:
             String description of the image
@@ -348,13 +492,14 @@ Do not include any text outside the code block."""
         Raises:
             VisionAPIError: If the API call fails after all retries
         """
+        # Base64 encoding happens only when the API request is built
+        image_base64 = self._encode_image(base64_img)
         max_retries = self.config.get("max_retries", 3)
         retry_delay = self.config.get("retry_delay", 1.0)
         
         for attempt in range(max_retries + 1):
             try:
-                response = await self.client.chat.completions.create(
-                    model=self.config["vision_model"],
+                response = await self._create_completion(
                     messages=[
                         {
                             "role": "user",
@@ -366,7 +511,7 @@ Do not include any text outside the code block."""
                                 {
                                     "type": "image_url",
                                     "image_url": {
-                                        "url": f"data:image/jpeg;base64,{base64_img}"
+                                        "url": f"data:image/jpeg;base64,{image_base64}"
                                     }
                                 }
                             ]
@@ -388,6 +533,11 @@ Do not include any text outside the code block."""
                 if attempt == max_retries:
                     raise VisionAPIError(f"Vision API failed after {max_retries + 1} attempts: {e}")
                 
+                if self.scheduler.is_rate_limit_error(e):
+                    # The scheduler already pauses new requests for Retry-After
+                    logger.warning(f"Vision API attempt {attempt + 1} was rate limited. Retrying...")
+                    continue
+                
                 logger.warning(f"Vision API attempt {attempt + 1} failed: {e}. Retrying in {retry_delay} seconds...")
                 await asyncio.sleep(retry_delay)
                 
@@ -396,12 +546,52 @@ Do not include any text outside the code block."""
         
         raise VisionAPIError("Unexpected error in Vision API retry logic")
     
-    async def _describe_with_ocr(self, base64_img: str) -> str:
+    async def _create_completion(self, messages: List[Dict[str, Any]], max_tokens: int, **kwargs):
+        """
+        Send a chat completion request through the rate-limited scheduler.
+        
+        Args:
+            messages: Chat messages for the request
+            max_tokens: Maximum number of completion tokens
+            **kwargs: Additional request parameters
+            
+        Returns:
+            Chat completion response
+        """
+        estimated_tokens = self._estimate_tokens(messages, max_tokens)
+        response = await self.scheduler.run(
+            lambda: self.client.chat.completions.create(
+                model=self.config["vision_model"],
+                messages=messages,
+                max_tokens=max_tokens,
+                **kwargs
+            ),
+            tokens=estimated_tokens
+        )
+        usage = getattr(response, "usage", None)
+        self.scheduler.reconcile_tokens(estimated_tokens, getattr(usage, "total_tokens", None))
+        return response
+    
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict[str, Any]], max_tokens: int) -> int:
+        """Estimate the tokens a request counts against the per-minute budget."""
+        tokens = max_tokens
+        for message in messages:
+            content = message["content"]
+            parts = content if isinstance(content, list) else [{"type": "text", "text": content}]
+            for part in parts:
+                if part["type"] == "text":
+                    tokens += len(part["text"]) // 4
+                else:
+                    tokens += IMAGE_TOKEN_ESTIMATE
+        return tokens
+    
+    async def _describe_with_ocr(self, base64_img: ImageInput) -> str:
         """
         Extract text from image using OCR as fallback.
         
         Args:
-            base64_img: Base64-encoded image string
+            base64_img: Raw image bytes or base64-encoded image string
             
         Returns:
             Extracted text from the image
@@ -410,24 +600,29 @@ Do not include any text outside the code block."""
             OCRError: If OCR extraction fails
         """
         try:
-            # Decode base64 image
-            image_data = base64.b64decode(base64_img)
-            image = Image.open(BytesIO(image_data))
-            
-            # Configure tesseract if path is provided
-            if self.config.get("tesseract_path"):
-                pytesseract.pytesseract.tesseract_cmd = self.config["tesseract_path"]
-            
-            # Extract text using OCR
-            text = pytesseract.image_to_string(image)
-            
-            if not text.strip():
-                raise OCRError("No text extracted from image")
-            
-            return f"OCR Extracted Text: {text.strip()}"
-            
+            # Decoding and OCR run in the OCR pool, off the event loop
+            text = await get_ocr_pool().image_to_string(self._decode_image(base64_img))
         except Exception as e:
             raise OCRError(f"OCR extraction failed: {e}")
+        
+        if not text.strip():
+            raise OCRError("OCR extraction failed: No text extracted from image")
+        
+        return f"OCR Extracted Text: {text.strip()}"
+    
+    @staticmethod
+    def _encode_image(image: ImageInput) -> str:
+        """Get the base64 representation of an image for an API request."""
+        if isinstance(image, str):
+            return image
+        return base64.b64encode(image).decode()
+
+    @staticmethod
+    def _decode_image(image: ImageInput) -> bytes:
+        """Get the raw bytes of an image."""
+        if isinstance(image, str):
+            return base64.b64decode(image)
+        return bytes(image)
     
     async def health_check(self) -> Dict[str, Any]:
         """
@@ -466,23 +661,23 @@ Do not include any text outside the code block."""
         
         # Check OCR availability if enabled
         if self.config.get("ocr_fallback_enabled", True):
+            ocr_pool = get_ocr_pool()
             try:
                 # Create a simple test image
                 test_image = Image.new('RGB', (100, 30), color='white')
                 
-                if self.config.get("tesseract_path"):
-                    pytesseract.pytesseract.tesseract_cmd = self.config["tesseract_path"]
-                
                 # Test OCR
-                pytesseract.image_to_string(test_image)
+                await ocr_pool.image_to_string(test_image)
                 status["checks"]["ocr"] = {
                     "status": "healthy",
-                    "message": "OCR available"
+                    "message": "OCR available",
+                    "pool": ocr_pool.stats()
                 }
             except Exception as e:
                 status["checks"]["ocr"] = {
                     "status": "unhealthy",
-                    "message": f"OCR unavailable: {e}"
+                    "message": f"OCR unavailable: {e}",
+                    "pool": ocr_pool.stats()
                 }
         else:
             status["checks"]["ocr"] = {
@@ -490,11 +685,27 @@ Do not include any text outside the code block."""
                 "message": "OCR fallback disabled"
             }
         
+        status["checks"]["vision_scheduler"] = self.scheduler.stats()
+        
+        # Report analysis cache effectiveness
+        if self.cache is not None:
+            status["checks"]["analysis_cache"] = {
+                "status": "enabled",
+                **self.cache.stats()
+            }
+        else:
+            status["checks"]["analysis_cache"] = {
+                "status": "disabled",
+                "message": "AI analysis cache disabled"
+            }
+        
         return status
     
     async def close(self) -> None:
         """Close the AI service and cleanup resources."""
         await self.client.close()
+        if self.cache is not None:
+            self.cache.close()
 
 
 # Global service instance
@@ -0,0 +1,161 @@
+"""
+Persistent cache for AI image analysis results.
+Results are keyed by image content digest, vision model and prompt version,
+stored in a local SQLite database, and bounded by TTL and LRU eviction.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """
+    SQLite-backed cache of structured image analyses.
+
+    All database work is synchronous and guarded by a lock; the async
+    helpers run it in a thread so the event loop is never blocked.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int, max_entries: int):
+        """
+        Initialize the cache and create its table if needed.
+
+        Args:
+            path: SQLite database file
+            ttl_seconds: Lifetime of an entry (0 disables expiry)
+            max_entries: Maximum number of entries before LRU eviction
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS image_analyses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_image_analyses_accessed_at ON image_analyses (accessed_at)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(digest: str, model: str, prompt_version: str) -> str:
+        """Build the cache key for an image analysis."""
+        return f"{digest}:{model}:{prompt_version}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached analysis, refreshing its LRU position.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Cached metadata dictionary, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM image_analyses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds and created_at + self.ttl_seconds < now:
+                self._conn.execute("DELETE FROM image_analyses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                self.evictions += 1
+                return None
+
+            self._conn.execute("UPDATE image_analyses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store an analysis, evicting expired and least recently used entries.
+
+        Args:
+            key: Cache key from make_key()
+            value: Metadata dictionary to cache
+        """
+        now = time.time()
+        payload = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO image_analyses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now)
+            )
+            self.writes += 1
+
+            if self.ttl_seconds:
+                cursor = self._conn.execute(
+                    "DELETE FROM image_analyses WHERE created_at < ?", (now - self.ttl_seconds,)
+                )
+                self.evictions += cursor.rowcount
+
+            count = self._conn.execute("SELECT COUNT(*) FROM image_analyses").fetchone()[0]
+            if count > self.max_entries:
+                cursor = self._conn.execute(
+                    "DELETE FROM image_analyses WHERE key IN "
+                    "(SELECT key FROM image_analyses ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+                self.evictions += cursor.rowcount
+            self._conn.commit()
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get()."""
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Dict[str, Any]) -> None:
+        """Async variant of set()."""
+        await asyncio.to_thread(self.set, key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current number of entries."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM image_analyses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
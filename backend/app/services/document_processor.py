@@ -10,8 +10,9 @@ from typing import AsyncGenerator, Optional, Dict, Any
 from ..parsers.parser_factory import ParserFactory
 from ..parsers.ai_processor import AIProcessor
 from ..parsers.markdown_generator import MarkdownGenerator
-from ..parsers.ast_models import DocumentAST, ParseProgress
+from ..parsers.ast_models import ParseProgress
 from .progress_emitter import emit_document_progress
+from ..utils.file_utils import AtomicFileWriter
 from ..core.config import settings
 
 
@@ -30,19 +31,26 @@ class DocumentProcessor:
         self, 
         file_path: Path, 
         document_id: str,
-        enable_ai_processing: bool = True
+        enable_ai_processing: bool = True,
+        force_reanalysis: bool = False
     ) -> AsyncGenerator[ParseProgress, None]:
         """
         Process a document through the complete pipeline.
         
+        The document is consumed as a stream of parser fragments (pages, slides
+        or sheets); each fragment is AI-enhanced and rendered to the Markdown
+        file as soon as it arrives, so output starts before parsing finishes.
+        
         Args:
             file_path: Path to the document to process
             document_id: Unique identifier for real-time progress updates
             enable_ai_processing: Whether to use AI for image/math processing
+            force_reanalysis: Re-run AI image analysis instead of using cached results
             
         Yields:
             ParseProgress objects indicating processing status.
-            The final progress object will contain the result in its `result` attribute.
+            The final progress object carries the path, size and SHA-256 of the
+            Markdown file in its details.
         """
         try:
             # Stage 1: Initialize and validate
@@ -58,79 +66,82 @@ class DocumentProcessor:
             # Get appropriate parser
             parser = self.parser_factory.get_parser(file_path)
             
-            # Stage 2: Parse document
+            # Stage 2: Parse, enhance and render the document fragment by fragment
             progress = ParseProgress(
                 stage="parsing",
                 progress=0.1,
                 message="Parsing document structure",
-                details={"parser": parser.__class__.__name__}
+                details={"parser": parser.__class__.__name__, "ai_enabled": enable_ai_processing}
             )
             await emit_document_progress(document_id, progress)
             yield progress
 
-            # Parse the document
-            ast = await parser.parse(file_path)
+            md_path = Path(settings.markdown_dir) / document_id / f"{file_path.stem}.md"
+            
+            counts = {"text_blocks": 0, "images": 0, "tables": 0, "math_blocks": 0}
+            total_units = None
+            fragments_done = 0
+            units_done = 0
+            last_reported = 0.1
+            
+            # Image analyses and blob references are shared by all fragments, so an
+            # image repeated on later pages is neither analysed nor stored again
+            analyses: Dict[str, dict] = {}
+            images = []
+            
+            try:
+                # Chunks are flushed to a temporary file that replaces md_path once complete
+                async with AtomicFileWriter(str(md_path)) as writer:
+                    async for fragment in parser.parse_stream(file_path):
+                        if total_units is None:
+                            total_units = self._count_units(fragment.metadata)
+                        images.extend(fragment.images)
+                        
+                        # Stage 3: AI Processing (if enabled), applied per fragment
+                        if enable_ai_processing and (fragment.images or fragment.math):
+                            fragment = await self.ai_processor.process_ast(
+                                fragment, force_reanalysis=force_reanalysis, analyses=analyses
+                            )
+                        
+                        # Stage 4: Render this fragment page by page straight to the output file
+                        await self.markdown_generator.write_to(fragment, writer)
+                        
+                        counts["text_blocks"] += fragment.text_block_count
+                        counts["images"] += len(fragment.images)
+                        counts["tables"] += len(fragment.tables)
+                        counts["math_blocks"] += len(fragment.math)
+                        
+                        # The leading metadata fragment does not count as a unit; shards
+                        # of several pages report how many they cover
+                        if fragments_done:
+                            units_done += fragment.units if fragment.units is not None else 1
+                        fragments_done += 1
+                        if total_units:
+                            fraction = min(units_done / total_units, 1.0)
+                            current = 0.1 + 0.8 * fraction
+                            if current - last_reported >= 0.05:
+                                last_reported = current
+                                progress = ParseProgress(
+                                    stage="parsing",
+                                    progress=current,
+                                    message=f"Processed {min(units_done, total_units)} of {total_units} sections",
+                                    details=dict(counts)
+                                )
+                                await emit_document_progress(document_id, progress)
+                                yield progress
+            finally:
+                # Image bytes are no longer needed once the whole document is rendered
+                for image in images:
+                    image.release()
             
-            progress = ParseProgress(
-                stage="parsing",
-                progress=0.4,
-                message="Document parsing completed",
-                details={
-                    "text_blocks": len(ast.textBlocks),
-                    "images": len(ast.images),
-                    "tables": len(ast.tables),
-                    "math_blocks": len(ast.math)
-                }
-            )
-            await emit_document_progress(document_id, progress)
-            yield progress
-
-            # Stage 3: AI Processing (if enabled)
-            if enable_ai_processing and (ast.images or ast.math):
-                progress = ParseProgress(
-                    stage="ai_processing",
-                    progress=0.5,
-                    message="Starting AI enhancement",
-                    details={"ai_enabled": True}
-                )
-                await emit_document_progress(document_id, progress)
-                yield progress
-
-                ast = await self.ai_processor.process_ast(ast)
-                
-                progress = ParseProgress(
-                    stage="ai_processing",
-                    progress=0.8,
-                    message="AI enhancement completed"
-                )
-                await emit_document_progress(document_id, progress)
-                yield progress
-            else:
-                progress = ParseProgress(
-                    stage="ai_processing",
-                    progress=0.8,
-                    message="AI processing skipped",
-                    details={"ai_enabled": False}
-                )
-                await emit_document_progress(document_id, progress)
-                yield progress
-
-            # Stage 4: Generate Markdown
             progress = ParseProgress(
                 stage="markdown_generation",
                 progress=0.9,
-                message="Generating Markdown output"
+                message="Markdown output written",
+                details=dict(counts)
             )
             await emit_document_progress(document_id, progress)
             yield progress
-
-            markdown_content = self.markdown_generator.generate(ast)
-            
-            # Save markdown file
-            output_dir = Path(settings.markdown_dir) / document_id
-            output_dir.mkdir(parents=True, exist_ok=True)
-            md_path = output_dir / f"{file_path.stem}.md"
-            md_path.write_text(markdown_content, encoding="utf-8")
             
             # Stage 5: Complete
             completion_progress = ParseProgress(
@@ -138,13 +149,13 @@ class DocumentProcessor:
                 progress=1.0,
                 message="Document processing completed",
                 details={
-                    "output_length": len(markdown_content),
-                    "total_elements": len(ast.textBlocks) + len(ast.images) + len(ast.tables) + len(ast.math),
-                    "markdown_path": str(md_path)
+                    "output_length": writer.stored.size,
+                    "total_elements": sum(counts.values()),
+                    "markdown_path": writer.stored.path,
+                    "markdown_size": writer.stored.size,
+                    "markdown_sha256": writer.stored.sha256
                 }
             )
-            # Add the result to the progress object
-            completion_progress.result = markdown_content
             await emit_document_progress(document_id, completion_progress)
             yield completion_progress
 
@@ -160,6 +171,24 @@ class DocumentProcessor:
             raise
 
 
+    def _count_units(self, metadata: Dict[str, Any]) -> Optional[int]:
+        """
+        Get the number of fragments (pages, slides or sheets) a parser will yield.
+        
+        Args:
+            metadata: Metadata of the first fragment
+            
+        Returns:
+            Number of content fragments, or None if unknown
+        """
+        for key in ("pages", "slides", "sheets"):
+            value = metadata.get(key)
+            if isinstance(value, int):
+                return value
+            if isinstance(value, list):
+                return len(value)
+        return None
+
     def get_supported_formats(self) -> Dict[str, Any]:
         """
         Get information about supported file formats.
@@ -178,3 +207,20 @@ class DocumentProcessor:
                 "markdown_output": True
             }
         }
+
+
+# Global processor instance, shared by all processing jobs in the process
+_document_processor: Optional[DocumentProcessor] = None
+
+
+def get_document_processor() -> DocumentProcessor:
+    """
+    Get or create the global document processor instance.
+    
+    Returns:
+        DocumentProcessor instance
+    """
+    global _document_processor
+    if _document_processor is None:
+        _document_processor = DocumentProcessor()
+    return _document_processor
@@ -2,23 +2,125 @@
 Document service for managing document operations and database interactions.
 """
 
+import asyncio
+import base64
+import hashlib
 import os
 import uuid
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Iterable, Tuple
+from datetime import datetime, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, delete, insert, and_, or_
+from sqlalchemy.orm import selectinload, undefer_group
 
-from app.models.document import Document
+from app.models.document import CONTENT_GROUP, Document
 from app.core.config import get_settings
 from app.services.ai_service import get_ai_service
+from app.utils.file_utils import stream_to_file
 
 
 settings = get_settings()
 
 
+def _remove_file(path: str) -> None:
+    """Remove a stored file that no document record refers to."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _read_text(path: str) -> str:
+    """Read a UTF-8 text file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _remove_files(paths: Iterable[str]) -> None:
+    """Remove several stored files."""
+    for path in paths:
+        _remove_file(path)
+
+
+# Columns needed to report processing status
+STATUS_COLUMNS = (
+    Document.id,
+    Document.processing_status,
+    Document.processing_started_at,
+    Document.processing_completed_at,
+    Document.processing_error,
+    Document.markdown_path,
+    Document.markdown_size,
+    Document.markdown_sha256,
+)
+
+# Columns returned by document listings; excludes large text and JSON columns
+SUMMARY_COLUMNS = (
+    Document.id,
+    Document.filename,
+    Document.original_filename,
+    Document.file_size,
+    Document.file_type,
+    Document.mime_type,
+    Document.content_hash,
+    Document.markdown_path,
+    Document.markdown_size,
+    Document.processing_status,
+    Document.processing_started_at,
+    Document.processing_completed_at,
+    Document.user_id,
+    Document.created_at,
+    Document.updated_at,
+)
+
+
+def encode_cursor(created_at: datetime, document_id: str) -> str:
+    """
+    Encode the position of a document in the listing order.
+    
+    Args:
+        created_at: Creation time of the last document on a page
+        document_id: ID of the last document on a page
+        
+    Returns:
+        Opaque URL-safe cursor
+    """
+    raw = f"{created_at.isoformat()}|{document_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+    
+    Args:
+        cursor: Cursor string
+        
+    Returns:
+        Tuple of (created_at, document_id)
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, document_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), document_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+@dataclass
+class UploadItem:
+    """One file of a multi-file upload."""
+    filename: str
+    upload: Any
+    file_type: str
+    mime_type: str
+
+
 class DocumentService:
     """
     Service class for document management operations.
@@ -33,7 +135,8 @@ class DocumentService:
         file_content: bytes,
         file_type: str,
         mime_type: str,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        reuse_existing: Optional[bool] = None
     ) -> Document:
         """
         Create a new document record and save file.
@@ -44,80 +147,464 @@ class DocumentService:
             file_type: File extension
             mime_type: MIME type of the file
             user_id: ID of the user who uploaded the document
+            reuse_existing: Link to an identical completed document instead of
+                storing and processing the file again; defaults to the
+                upload_dedup_enabled setting
             
         Returns:
             Document: Created document instance
         """
+        content_hash = hashlib.sha256(file_content).hexdigest()
+        existing = await self._find_reusable(content_hash, user_id, reuse_existing)
+        if existing:
+            return await self._save(Document(**self._reuse_values(existing, filename, mime_type, user_id)))
+        
         # Generate unique filename
         doc_id = str(uuid.uuid4())
         stored_filename = f"{doc_id}{file_type}"
         file_path = os.path.join(settings.upload_dir, stored_filename)
         
-        # Save file to disk
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+        # Save file to disk without blocking the event loop
+        def write_file():
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "wb") as f:
+                f.write(file_content)
+        
+        await asyncio.to_thread(write_file)
         
-        # Create document record
-        document = Document(
+        return await self._save(Document(
             id=doc_id,
             filename=stored_filename,
             original_filename=filename,
             file_size=len(file_content),
             file_type=file_type,
             mime_type=mime_type,
+            content_hash=content_hash,
             file_path=file_path,
             user_id=user_id,
             processing_status="pending"
+        ), file_path)
+    
+    async def create_document_from_upload(
+        self,
+        filename: str,
+        upload: Any,
+        file_type: str,
+        mime_type: str,
+        user_id: Optional[str] = None,
+        max_size: Optional[int] = None,
+        reuse_existing: Optional[bool] = None
+    ) -> Document:
+        """
+        Create a new document record, streaming the upload to disk.
+        
+        The upload is read in chunks and hashed as it is written, so memory use
+        is bounded by the chunk size regardless of the file size.
+        
+        Args:
+            filename: Original filename
+            upload: Object with an async ``read(size)`` method, e.g. an UploadFile
+            file_type: File extension
+            mime_type: MIME type of the file
+            user_id: ID of the user who uploaded the document
+            max_size: Maximum accepted size in bytes; defaults to the upload limit
+            reuse_existing: Link to an identical completed document instead of
+                keeping and processing the file again; defaults to the
+                upload_dedup_enabled setting
+            
+        Returns:
+            Document: Created document instance
+            
+        Raises:
+            UploadTooLargeError: If the upload exceeds ``max_size``
+        """
+        doc_id = str(uuid.uuid4())
+        stored_filename = f"{doc_id}{file_type}"
+        stored = await stream_to_file(
+            upload,
+            os.path.join(settings.upload_dir, stored_filename),
+            max_size=max_size
+        )
+        
+        existing = await self._find_reusable(stored.sha256, user_id, reuse_existing)
+        if existing:
+            # The digest is only known once the stream is written; drop the copy
+            await asyncio.to_thread(_remove_file, stored.path)
+            return await self._save(Document(**self._reuse_values(existing, filename, mime_type, user_id)))
+        
+        return await self._save(Document(
+            id=doc_id,
+            filename=stored_filename,
+            original_filename=filename,
+            file_size=stored.size,
+            file_type=file_type,
+            mime_type=mime_type,
+            content_hash=stored.sha256,
+            file_path=stored.path,
+            user_id=user_id,
+            processing_status="pending"
+        ), stored.path)
+    
+    async def create_documents_from_uploads(
+        self,
+        items: List[UploadItem],
+        user_id: Optional[str] = None,
+        max_size: Optional[int] = None,
+        reuse_existing: Optional[bool] = None,
+        max_concurrency: Optional[int] = None
+    ) -> List[Document]:
+        """
+        Create document records for several uploads at once.
+        
+        Files are streamed to disk concurrently, at most ``max_concurrency`` at
+        a time, and all records are then inserted in a single transaction with
+        one bulk insert. If any file fails, every file stored for the batch is
+        removed and nothing is inserted.
+        
+        Args:
+            items: Uploaded files
+            user_id: ID of the user who uploaded the documents
+            max_size: Maximum accepted size per file in bytes; defaults to the upload limit
+            reuse_existing: Link to identical completed documents instead of
+                keeping and processing the files again; defaults to the
+                upload_dedup_enabled setting
+            max_concurrency: Maximum number of files written at once; defaults
+                to the upload_max_concurrency setting
+            
+        Returns:
+            Created documents, in the order of ``items``
+            
+        Raises:
+            UploadTooLargeError: If any upload exceeds ``max_size``
+        """
+        if not items:
+            return []
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or settings.upload_max_concurrency))
+        
+        async def store(item: UploadItem):
+            async with semaphore:
+                doc_id = str(uuid.uuid4())
+                stored_filename = f"{doc_id}{item.file_type}"
+                stored = await stream_to_file(
+                    item.upload,
+                    os.path.join(settings.upload_dir, stored_filename),
+                    max_size=max_size
+                )
+                return doc_id, stored_filename, stored
+        
+        results = await asyncio.gather(*(store(item) for item in items), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            await asyncio.to_thread(
+                _remove_files, [result[2].path for result in results if not isinstance(result, BaseException)]
+            )
+            raise errors[0]
+        
+        reusable = await self._find_reusable_many(
+            {stored.sha256 for _, _, stored in results}, user_id, reuse_existing
+        )
+        rows = []
+        kept_paths = []
+        duplicate_paths = []
+        for item, (doc_id, stored_filename, stored) in zip(items, results):
+            existing = reusable.get(stored.sha256)
+            if existing:
+                duplicate_paths.append(stored.path)
+                rows.append(self._reuse_values(existing, item.filename, item.mime_type, user_id))
+                continue
+            kept_paths.append(stored.path)
+            rows.append({
+                "id": doc_id,
+                "filename": stored_filename,
+                "original_filename": item.filename,
+                "file_size": stored.size,
+                "file_type": item.file_type,
+                "mime_type": item.mime_type,
+                "content_hash": stored.sha256,
+                "file_path": stored.path,
+                "user_id": user_id,
+                "processing_status": "pending"
+            })
+        await asyncio.to_thread(_remove_files, duplicate_paths)
+        
+        try:
+            result = await self.db.scalars(
+                insert(Document).returning(Document, sort_by_parameter_order=True),
+                rows
+            )
+            documents = list(result.all())
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            await asyncio.to_thread(_remove_files, kept_paths)
+            raise
+        
+        return documents
+    
+    async def find_completed_by_hash(self, content_hash: str, user_id: Optional[str]) -> Optional[Document]:
+        """
+        Find the most recent completed document of a user with the given content.
+        
+        Args:
+            content_hash: SHA-256 hex digest of the file
+            user_id: Owner of the document; None matches anonymous uploads only
+            
+        Returns:
+            Document or None if no completed document has this content
+        """
+        result = await self.db.execute(
+            select(Document)
+            .where(
+                Document.content_hash == content_hash,
+                self._owned_by(user_id),
+                Document.processing_status == "completed",
+                Document.is_deleted == False
+            )
+            .order_by(Document.processing_completed_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    def _owned_by(user_id: Optional[str]):
+        """Filter documents uploaded by ``user_id`` (anonymous uploads when None)."""
+        return Document.user_id == user_id if user_id is not None else Document.user_id.is_(None)
+    
+    async def _find_reusable(
+        self,
+        content_hash: str,
+        user_id: Optional[str],
+        reuse_existing: Optional[bool]
+    ) -> Optional[Document]:
+        """Look up a completed duplicate of the user when deduplication is enabled."""
+        return (await self._find_reusable_many({content_hash}, user_id, reuse_existing)).get(content_hash)
+    
+    async def _find_reusable_many(
+        self,
+        content_hashes: Iterable[str],
+        user_id: Optional[str],
+        reuse_existing: Optional[bool]
+    ) -> Dict[str, Document]:
+        """
+        Look up the latest completed duplicate of each digest when deduplication is enabled.
+        
+        Only documents of the same user are reused, since the copied analysis,
+        descriptions and summaries belong to the document owner.
+        """
+        if reuse_existing is None:
+            reuse_existing = settings.upload_dedup_enabled
+        content_hashes = list(content_hashes)
+        if not reuse_existing or not content_hashes:
+            return {}
+        
+        result = await self.db.execute(
+            select(Document)
+            .where(
+                Document.content_hash.in_(content_hashes),
+                self._owned_by(user_id),
+                Document.processing_status == "completed",
+                Document.is_deleted == False
+            )
+            .options(undefer_group(CONTENT_GROUP))
+            .order_by(Document.processing_completed_at.desc())
         )
+        reusable: Dict[str, Document] = {}
+        for document in result.scalars():
+            if document.content_hash in reusable:
+                continue
+            if await asyncio.to_thread(os.path.exists, document.file_path):
+                reusable[document.content_hash] = document
+        return reusable
+    
+    @staticmethod
+    def _reuse_values(
+        existing: Document,
+        filename: str,
+        mime_type: str,
+        user_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Column values for a completed document sharing the stored file and results of ``existing``."""
+        return {
+            "id": str(uuid.uuid4()),
+            "filename": existing.filename,
+            "original_filename": filename,
+            "file_size": existing.file_size,
+            "file_type": existing.file_type,
+            "mime_type": mime_type,
+            "content_hash": existing.content_hash,
+            "file_path": existing.file_path,
+            "markdown_path": existing.markdown_path,
+            "markdown_size": existing.markdown_size,
+            "markdown_sha256": existing.markdown_sha256,
+            "user_id": user_id,
+            "processing_status": "completed",
+            "processing_completed_at": datetime.now(timezone.utc),
+            "extracted_text": existing.extracted_text,
+            "ai_description": existing.ai_description,
+            "ai_summary": existing.ai_summary,
+            "analysis_results": existing.analysis_results,
+            "document_metadata": {**(existing.document_metadata or {}), "reused_from": existing.id}
+        }
+    
+    async def _save(self, document: Document, stored_path: Optional[str] = None) -> Document:
+        """
+        Insert a document record.
         
-        self.db.add(document)
-        await self.db.commit()
-        await self.db.refresh(document)
+        Args:
+            document: Document to insert
+            stored_path: File written for this document, removed if the insert fails
+            
+        Returns:
+            The inserted document
+        """
+        try:
+            self.db.add(document)
+            await self.db.commit()
+        except Exception:
+            if stored_path:
+                await asyncio.to_thread(_remove_file, stored_path)
+            raise
+        # Only server-generated columns; a full refresh would unload the deferred content
+        await self.db.refresh(document, ["created_at", "updated_at"])
         
         return document
     
-    async def get_document(self, document_id: str) -> Optional[Document]:
+    async def get_document(self, document_id: str, with_content: bool = False) -> Optional[Document]:
         """
         Retrieve a document by ID.
         
         Args:
             document_id: Document ID
+            with_content: Also load the deferred text and JSON columns
             
         Returns:
             Document or None if not found
         """
+        query = select(Document).where(Document.id == document_id, Document.is_deleted == False)
+        if with_content:
+            query = query.options(undefer_group(CONTENT_GROUP))
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+    
+    async def get_document_status(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve only the processing status columns of a document.
+        
+        Args:
+            document_id: Document ID
+            
+        Returns:
+            Dictionary of the columns in ``STATUS_COLUMNS``, or None if not found
+        """
         result = await self.db.execute(
-            select(Document).where(Document.id == document_id, Document.is_deleted == False)
+            select(*STATUS_COLUMNS).where(Document.id == document_id, Document.is_deleted == False)
         )
-        return result.scalar_one_or_none()
+        row = result.mappings().one_or_none()
+        return dict(row) if row else None
+    
+    async def read_markdown(self, document: Document) -> Optional[str]:
+        """
+        Read the markdown generated for a document.
+        
+        The markdown is read from ``markdown_path``; documents processed before
+        it was stored only on disk fall back to ``extracted_text``, which must
+        then be loaded with ``with_content=True``.
+        
+        Args:
+            document: Document to read the markdown of
+            
+        Returns:
+            Markdown content, or None if there is none
+        """
+        if document.markdown_path:
+            try:
+                return await asyncio.to_thread(_read_text, document.markdown_path)
+            except FileNotFoundError:
+                pass
+        return document.extracted_text
     
     async def list_documents(
         self,
         user_id: Optional[str] = None,
         limit: int = 10,
-        offset: int = 0
+        cursor: Optional[str] = None,
+        processing_status: Optional[str] = None
     ) -> List[Document]:
         """
-        List documents with optional filtering.
+        List documents with optional filtering, newest first.
         
         Args:
             user_id: Filter by user ID
             limit: Number of documents to return
-            offset: Offset for pagination
+            cursor: Cursor from a previous page, see ``encode_cursor``
+            processing_status: Filter by processing status
             
         Returns:
             List of documents
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = self._listing_query(select(Document), user_id, cursor, processing_status).limit(limit)
+        
+        result = await self.db.execute(query)
+        return result.scalars().all()
+    
+    async def list_document_summaries(
+        self,
+        user_id: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        processing_status: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List a page of document summaries, newest first.
+        
+        Only the columns in ``SUMMARY_COLUMNS`` are selected, so extracted
+        text and JSON results are never loaded. Pages are fetched with keyset
+        pagination on ``(created_at, id)``, so the cost of a page does not
+        depend on how far into the list it is.
+        
+        Args:
+            user_id: Filter by user ID
+            limit: Page size
+            cursor: Cursor returned with the previous page
+            processing_status: Filter by processing status
+            
+        Returns:
+            Tuple of the summaries and the cursor of the next page (None on the last page)
+            
+        Raises:
+            ValueError: If the cursor is malformed
         """
-        query = select(Document).where(Document.is_deleted == False)
+        query = self._listing_query(
+            select(*SUMMARY_COLUMNS), user_id, cursor, processing_status
+        ).limit(limit + 1)
+        
+        rows = (await self.db.execute(query)).mappings().all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return [dict(row) for row in rows], next_cursor
+    
+    @staticmethod
+    def _listing_query(query, user_id: Optional[str], cursor: Optional[str], processing_status: Optional[str]):
+        """Apply listing filters, the keyset condition and ordering to ``query``."""
+        query = query.where(Document.is_deleted == False)
         
         if user_id:
             query = query.where(Document.user_id == user_id)
+        if processing_status:
+            query = query.where(Document.processing_status == processing_status)
+        if cursor:
+            created_at, document_id = decode_cursor(cursor)
+            query = query.where(or_(
+                Document.created_at < created_at,
+                and_(Document.created_at == created_at, Document.id < document_id)
+            ))
         
-        query = query.order_by(Document.created_at.desc()).offset(offset).limit(limit)
-        
-        result = await self.db.execute(query)
-        return result.scalars().all()
+        return query.order_by(Document.created_at.desc(), Document.id.desc())
     
     async def update_document(
         self,
@@ -172,12 +659,18 @@ class DocumentService:
             }
         )
         
-        # Remove file from disk
-        try:
-            if os.path.exists(document.file_path):
-                os.remove(document.file_path)
-        except Exception:
-            pass  # File deletion failure shouldn't fail the operation
+        # Remove file from disk unless a deduplicated upload still links to it
+        shared = await self.db.scalar(
+            select(Document.id)
+            .where(Document.file_path == document.file_path, Document.is_deleted == False)
+            .limit(1)
+        )
+        if not shared:
+            try:
+                if os.path.exists(document.file_path):
+                    os.remove(document.file_path)
+            except Exception:
+                pass  # File deletion failure shouldn't fail the operation
         
         return True
     
@@ -0,0 +1,287 @@
+"""
+Durable job queue backed by the processing_jobs table.
+Jobs are claimed atomically with a compare-and-set update, held under a lease
+that workers renew with heartbeats, and retried with exponential backoff.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.db.database import AsyncSessionLocal
+from app.models.processing_job import ProcessingJob
+
+
+logger = logging.getLogger(__name__)
+
+PROCESS_DOCUMENT_JOB = "process_document"
+
+# Maximum delay between retries of a failed job
+MAX_RETRY_DELAY = 600.0
+
+
+def utcnow() -> datetime:
+    """Current time in UTC."""
+    return datetime.now(timezone.utc)
+
+
+class JobQueue:
+    """
+    Job queue operations on ProcessingJob rows.
+
+    Each method runs in its own short transaction, so the queue can be shared
+    by API processes and any number of worker processes.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+        lease_seconds: Optional[float] = None,
+        retry_delay: Optional[float] = None
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            session_factory: Factory for database sessions
+            lease_seconds: Lease length granted on claim and heartbeat
+            retry_delay: Base delay before the first retry of a failed job
+        """
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds if lease_seconds is not None else settings.job_lease_seconds
+        self.retry_delay = retry_delay if retry_delay is not None else settings.job_retry_delay
+
+    async def enqueue(
+        self,
+        document_id: str,
+        payload: Optional[Dict[str, Any]] = None,
+        priority: int = 0,
+        job_type: str = PROCESS_DOCUMENT_JOB,
+        max_attempts: Optional[int] = None,
+        batch_id: Optional[str] = None,
+        session: Optional[AsyncSession] = None
+    ) -> ProcessingJob:
+        """
+        Add a job to the queue.
+
+        Args:
+            document_id: Document the job operates on
+            payload: Job arguments
+            priority: Higher priorities are claimed first
+            job_type: Type of job
+            max_attempts: Attempts before the job is marked failed
+            batch_id: Batch the job belongs to
+            session: Optional session to add the job to; the caller commits
+
+        Returns:
+            The queued ProcessingJob
+        """
+        job = ProcessingJob(
+            document_id=document_id,
+            job_type=job_type,
+            batch_id=batch_id,
+            status="pending",
+            payload=payload or {},
+            priority=priority,
+            attempts=0,
+            max_attempts=max_attempts or get_settings().job_max_attempts,
+            run_after=utcnow()
+        )
+        if session is not None:
+            session.add(job)
+            return job
+
+        async with self.session_factory() as db:
+            db.add(job)
+            await db.commit()
+            await db.refresh(job)
+        return job
+
+    def _claimable(self, now: datetime):
+        """Condition matching jobs that may be claimed at ``now``."""
+        return or_(
+            and_(
+                ProcessingJob.status == "pending",
+                or_(ProcessingJob.run_after.is_(None), ProcessingJob.run_after <= now)
+            ),
+            # A worker died while holding the job; its lease ran out
+            and_(
+                ProcessingJob.status == "running",
+                ProcessingJob.lease_expires_at < now,
+                ProcessingJob.attempts < ProcessingJob.max_attempts
+            )
+        )
+
+    async def claim(self, worker_id: str, job_type: str = PROCESS_DOCUMENT_JOB) -> Optional[ProcessingJob]:
+        """
+        Atomically claim the next job in priority order.
+
+        The candidate is selected and then taken with an UPDATE guarded by the
+        same condition; if another worker won the race, the next candidate is
+        tried.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+            job_type: Type of job to claim
+
+        Returns:
+            The claimed job, or None if no job is available
+        """
+        async with self.session_factory() as db:
+            for _ in range(5):
+                now = utcnow()
+                candidate = await db.scalar(
+                    select(ProcessingJob.id)
+                    .where(ProcessingJob.job_type == job_type, self._claimable(now))
+                    .order_by(ProcessingJob.priority.desc(), ProcessingJob.created_at, ProcessingJob.id)
+                    .limit(1)
+                )
+                if candidate is None:
+                    return None
+
+                result = await db.execute(
+                    update(ProcessingJob)
+                    .where(ProcessingJob.id == candidate, self._claimable(now))
+                    .values(
+                        status="running",
+                        worker_id=worker_id,
+                        attempts=ProcessingJob.attempts + 1,
+                        started_at=now,
+                        heartbeat_at=now,
+                        lease_expires_at=now + timedelta(seconds=self.lease_seconds)
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                if result.rowcount == 1:
+                    return await db.get(ProcessingJob, candidate)
+        return None
+
+    async def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """
+        Extend the lease of a running job.
+
+        Args:
+            job_id: Claimed job
+            worker_id: Worker holding the lease
+
+        Returns:
+            False if the worker no longer owns the job
+        """
+        now = utcnow()
+        return await self._update_owned(job_id, worker_id, {
+            "heartbeat_at": now,
+            "lease_expires_at": now + timedelta(seconds=self.lease_seconds)
+        })
+
+    async def complete(self, job_id: str, worker_id: str, result_data: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Mark a claimed job as completed.
+
+        Args:
+            job_id: Claimed job
+            worker_id: Worker holding the lease
+            result_data: Job results
+
+        Returns:
+            False if the worker no longer owns the job
+        """
+        return await self._update_owned(job_id, worker_id, {
+            "status": "completed",
+            "completed_at": utcnow(),
+            "result_data": result_data or {},
+            "error_message": None,
+            "lease_expires_at": None
+        })
+
+    async def fail(self, job_id: str, worker_id: str, error: str, attempts: int, max_attempts: int) -> bool:
+        """
+        Record a failed attempt, scheduling a retry while attempts remain.
+
+        Args:
+            job_id: Claimed job
+            worker_id: Worker holding the lease
+            error: Error message
+            attempts: Attempts made so far, including this one
+            max_attempts: Maximum attempts for the job
+
+        Returns:
+            True if the job will be retried
+        """
+        values: Dict[str, Any] = {"error_message": error[:500], "lease_expires_at": None}
+        retry = attempts < max_attempts
+        if retry:
+            delay = min(self.retry_delay * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+            values.update(status="pending", worker_id=None, run_after=utcnow() + timedelta(seconds=delay))
+        else:
+            values.update(status="failed", completed_at=utcnow())
+        await self._update_owned(job_id, worker_id, values)
+        return retry
+
+    async def reap_expired(self) -> int:
+        """
+        Fail running jobs whose lease expired after their last allowed attempt.
+
+        Returns:
+            Number of jobs marked failed
+        """
+        now = utcnow()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(ProcessingJob)
+                .where(
+                    ProcessingJob.status == "running",
+                    ProcessingJob.lease_expires_at < now,
+                    ProcessingJob.attempts >= ProcessingJob.max_attempts
+                )
+                .values(status="failed", completed_at=now, error_message="Job lease expired")
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            return result.rowcount
+
+    async def batch_progress(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Get aggregate job status counts for a batch.
+
+        Args:
+            batch_id: Batch identifier
+
+        Returns:
+            Dictionary with the total and per-status job counts
+        """
+        async with self.session_factory() as db:
+            rows = await db.execute(
+                select(ProcessingJob.status, func.count())
+                .where(ProcessingJob.batch_id == batch_id)
+                .group_by(ProcessingJob.status)
+            )
+            counts = {status: count for status, count in rows}
+        return {
+            "total": sum(counts.values()),
+            "pending": counts.get("pending", 0),
+            "running": counts.get("running", 0),
+            "completed": counts.get("completed", 0),
+            "failed": counts.get("failed", 0),
+        }
+
+    async def _update_owned(self, job_id: str, worker_id: str, values: Dict[str, Any]) -> bool:
+        """Update a running job only while ``worker_id`` still owns it."""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(ProcessingJob)
+                .where(
+                    ProcessingJob.id == job_id,
+                    ProcessingJob.worker_id == worker_id,
+                    ProcessingJob.status == "running"
+                )
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            return result.rowcount == 1
@@ -0,0 +1,199 @@
+"""
+Bounded worker pool for Tesseract OCR.
+Image decoding and OCR run in worker threads (Tesseract itself runs as a
+subprocess), so OCR never blocks the event loop serving HTTP requests.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from PIL import Image
+import pytesseract
+
+from app.core.config import get_ocr_config
+
+
+ImageSource = Union[bytes, bytearray, memoryview, Image.Image]
+
+
+class OCRTimeoutError(Exception):
+    """Raised when OCR of a single image exceeds the per-image timeout."""
+    pass
+
+
+class OCRPool:
+    """
+    Size-limited OCR thread pool with queue-depth metrics.
+
+    At most ``max_workers`` images are recognised at once; further submissions
+    wait in the executor queue and are reported as queued.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        timeout: float,
+        language: str = "eng",
+        tesseract_cmd: Optional[str] = None
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            max_workers: Maximum number of concurrent OCR jobs
+            timeout: Per-image timeout in seconds (0 disables)
+            language: Tesseract language code
+            tesseract_cmd: Optional path to the Tesseract executable
+        """
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.language = language
+        if tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ocr")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+
+    async def image_to_string(self, image: ImageSource) -> str:
+        """
+        Recognise the text of an image.
+
+        Args:
+            image: Raw image bytes or a PIL image
+
+        Returns:
+            Recognised text
+
+        Raises:
+            OCRTimeoutError: If recognition exceeds the per-image timeout
+        """
+        return await self.submit(self._image_to_string, image)
+
+    async def image_to_string_batch(self, images: Sequence[ImageSource]) -> List[Union[str, Exception]]:
+        """
+        Recognise several images in parallel.
+
+        Args:
+            images: Raw image bytes or PIL images
+
+        Returns:
+            Recognised text per image, or the exception raised for it
+        """
+        return await asyncio.gather(
+            *(self.image_to_string(image) for image in images),
+            return_exceptions=True
+        )
+
+    async def submit(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a blocking OCR function in the pool.
+
+        Args:
+            func: Function to run in a worker thread
+            *args: Arguments for ``func``
+
+        Returns:
+            Result of ``func``
+        """
+        with self._lock:
+            self._queued += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run, func, args)
+
+    def _run(self, func: Callable[..., Any], args: Sequence[Any]) -> Any:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            result = func(*args)
+        except RuntimeError as e:
+            # pytesseract kills Tesseract and raises RuntimeError on timeout
+            with self._lock:
+                if "timeout" in str(e).lower():
+                    self._timed_out += 1
+                    raise OCRTimeoutError(f"OCR exceeded {self.timeout}s") from e
+                self._failed += 1
+            raise
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        else:
+            with self._lock:
+                self._completed += 1
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _image_to_string(self, image: ImageSource) -> str:
+        return pytesseract.image_to_string(
+            self._open(image), lang=self.language, timeout=self.timeout
+        )
+
+    @staticmethod
+    def _open(image: ImageSource) -> Image.Image:
+        """Decode image bytes in the worker thread."""
+        if isinstance(image, Image.Image):
+            return image
+        return Image.open(BytesIO(image))
+
+    def stats(self) -> Dict[str, int]:
+        """Get queue depth and job counters."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "timed_out": self._timed_out,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+# Global pool instance
+_ocr_pool: Optional[OCRPool] = None
+
+
+def get_ocr_pool() -> OCRPool:
+    """
+    Get or create the global OCR pool.
+
+    Returns:
+        OCRPool instance
+    """
+    global _ocr_pool
+    if _ocr_pool is None:
+        config = get_ocr_config()
+        _ocr_pool = OCRPool(
+            max_workers=config["max_workers"],
+            timeout=config["timeout"],
+            language=config["language"],
+            tesseract_cmd=config["tesseract_path"]
+        )
+    return _ocr_pool
+
+
+def shutdown_ocr_pool(wait: bool = True) -> None:
+    """
+    Shutdown the global OCR pool.
+
+    Args:
+        wait: Whether to wait for running OCR jobs to finish
+    """
+    global _ocr_pool
+    if _ocr_pool is not None:
+        _ocr_pool.shutdown(wait=wait)
+        _ocr_pool = None
@@ -0,0 +1,185 @@
+"""
+Document processing pipeline run on behalf of a queued job.
+Each run uses its own database session, independent of any API request.
+"""
+
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.db.database import AsyncSessionLocal
+from app.services.document_processor import DocumentProcessor, get_document_processor
+from app.services.document_service import DocumentService
+from app.services.job_queue import JobQueue
+from app.services.progress_broker import get_progress_broker
+from app.services.progress_store import get_progress_store, status_fields
+from app.models.processing_job import ProcessingJob
+from app.socketio import emit_batch_update, emit_document_event
+
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which a document's event stream ends
+FINAL_STATUSES = ("completed", "failed")
+
+
+class DocumentNotFoundError(Exception):
+    """Raised when a job refers to a document that no longer exists."""
+    pass
+
+
+class JobLeaseLostError(Exception):
+    """Raised when another worker took over a job before its results were stored."""
+    pass
+
+
+async def run_document_processing(
+    document_id: str,
+    enable_ai_processing: bool = True,
+    force_reanalysis: bool = False,
+    processing_options: Optional[Dict[str, Any]] = None,
+    document_processor: Optional[DocumentProcessor] = None,
+    still_owned: Optional[Callable[[], Awaitable[bool]]] = None
+) -> Dict[str, Any]:
+    """
+    Process a document and store the results on its record.
+
+    Args:
+        document_id: ID of the document to process
+        enable_ai_processing: Whether to enable AI processing
+        force_reanalysis: Re-run AI image analysis instead of using cached results
+        processing_options: Processing configuration
+        document_processor: Processor to use; defaults to the shared processor
+        still_owned: Check, run before the results are stored, that the job
+            still belongs to the caller
+
+    Returns:
+        Result summary stored on the job
+
+    Raises:
+        DocumentNotFoundError: If the document does not exist
+        JobLeaseLostError: If ``still_owned`` reports the job was taken over
+        Exception: Any processing error; the caller decides whether to retry
+    """
+    document_processor = document_processor or get_document_processor()
+
+    async with AsyncSessionLocal() as db:
+        document_service = DocumentService(db)
+        document = await document_service.get_document(document_id)
+        if not document:
+            raise DocumentNotFoundError(f"Document {document_id} not found")
+
+        started = {
+            "processing_status": "processing",
+            "processing_started_at": datetime.now(timezone.utc),
+            "processing_completed_at": None,
+            "processing_error": None,
+            "processing_options": processing_options or {}
+        }
+        await document_service.update_document(document_id, started)
+        await record_status(document_id, started, progress=0)
+
+        # Process the document
+        markdown_path = ""
+        markdown_size, markdown_sha256 = None, None
+        async for progress in document_processor.process_document(
+            Path(document.file_path),
+            document_id,
+            enable_ai_processing,
+            force_reanalysis
+        ):
+            if progress.stage == "completion":
+                # The markdown stays in its file; the record keeps a size and checksum reference
+                markdown_path = progress.details.get("markdown_path", "")
+                markdown_size = progress.details.get("markdown_size")
+                markdown_sha256 = progress.details.get("markdown_sha256")
+
+        if still_owned is not None and not await still_owned():
+            raise JobLeaseLostError(f"Lost the job for document {document_id} before storing its results")
+
+        # Update document with results
+        completed = {
+            "processing_status": "completed",
+            "processing_completed_at": datetime.now(timezone.utc),
+            "extracted_text": None,
+            "ai_description": f"Document processed successfully with AI={enable_ai_processing}",
+            "markdown_path": markdown_path,
+            "markdown_size": markdown_size,
+            "markdown_sha256": markdown_sha256
+        }
+        await document_service.update_document(document_id, completed)
+        # Recorded after the commit so clients never see completion before the results
+        await record_status(document_id, completed, progress=100)
+
+    return {"markdown_path": markdown_path}
+
+
+async def record_status(document_id: str, values: Dict[str, Any], **fields: Any) -> None:
+    """
+    Record a committed status change in the progress store and push it to subscribers.
+
+    SSE streams receive it as a ``status`` event, which ends the stream once
+    the document is completed or failed; Socket.IO clients in the document's
+    room receive it as ``document_status``.
+
+    Args:
+        document_id: ID of the document
+        values: Document column values that were written
+        **fields: Extra progress fields, e.g. progress
+    """
+    entry = await get_progress_store().update(document_id, **fields, **status_fields(values))
+    event = {"documentId": document_id, **entry}
+    get_progress_broker().publish(
+        document_id, event, event="status", terminal=entry.get("status") in FINAL_STATUSES
+    )
+    try:
+        await emit_document_event(document_id, "document_status", event)
+    except Exception as e:
+        logger.warning(f"Failed to emit status of document {document_id}: {e}")
+
+
+async def record_processing_failure(document_id: str, error: str, retrying: bool) -> None:
+    """
+    Record a failed processing attempt on the document.
+
+    Args:
+        document_id: ID of the document
+        error: Error message
+        retrying: Whether the job has been scheduled for another attempt
+    """
+    failed = {
+        "processing_status": "pending" if retrying else "failed",
+        "processing_error": error,
+        "processing_completed_at": None if retrying else datetime.now(timezone.utc)
+    }
+    async with AsyncSessionLocal() as db:
+        await DocumentService(db).update_document(document_id, failed)
+    await record_status(document_id, failed)
+
+
+async def report_batch_progress(queue: JobQueue, job: ProcessingJob) -> None:
+    """
+    Emit aggregate progress for the batch a finished job belongs to.
+
+    Updates go to the Socket.IO room named in the job payload (``session_id``),
+    or to the room named after the batch.
+
+    Args:
+        queue: Job queue holding the batch
+        job: Job that just finished
+    """
+    if not job.batch_id:
+        return
+    progress = await queue.batch_progress(job.batch_id)
+    payload = job.payload or {}
+    try:
+        await emit_batch_update(
+            payload.get("session_id") or job.batch_id,
+            job.batch_id,
+            progress["completed"] + progress["failed"],
+            progress["total"],
+            current_document=job.document_id
+        )
+    except Exception as e:
+        logger.warning(f"Failed to emit batch update for batch {job.batch_id}: {e}")
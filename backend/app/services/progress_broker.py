@@ -0,0 +1,275 @@
+"""
+Broker fanning document progress events out to subscribers such as
+Server-Sent Events streams.
+Each subscriber has a bounded queue; a slow consumer loses intermediate
+events, never the terminal one. When a Redis URL is configured, events are
+also relayed through a Redis channel so subscribers in the API process
+receive events published by standalone workers.
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+from uuid import uuid4
+
+from app.core.config import get_settings
+
+try:
+    import redis.asyncio as redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+# Redis channel relaying events between processes
+REDIS_CHANNEL = "document-events"
+
+# Seconds to wait before resubscribing after the Redis connection fails
+RECONNECT_DELAY = 1.0
+
+
+class Subscription:
+    """
+    Stream of events for one document.
+
+    Items are dictionaries with the event name under ``event`` and the
+    payload under ``data``. Iterating yields items until a terminal event has
+    been delivered.
+    """
+
+    def __init__(self, document_id: str, max_queue: int):
+        """
+        Initialize the subscription.
+
+        Args:
+            document_id: Document whose events are received
+            max_queue: Maximum number of undelivered events
+        """
+        self.document_id = document_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_queue))
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item: Dict[str, Any], terminal: bool) -> None:
+        """Queue an item, dropping the oldest undelivered one when full."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait((item, terminal))
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next item.
+
+        Args:
+            timeout: Seconds to wait; None waits indefinitely
+
+        Returns:
+            The next item, or None if the timeout expired or the stream has ended
+        """
+        if self.closed:
+            return None
+        try:
+            item, terminal = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.closed = terminal
+        return item
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        item = await self.get()
+        if item is None:
+            raise StopAsyncIteration
+        return item
+
+
+class ProgressBroker:
+    """
+    Publish/subscribe hub for progress events.
+
+    ``publish`` never blocks: events are put on local subscriber queues
+    directly and, with Redis, forwarded to other processes in the background.
+    Subscriptions must be used on the event loop that publishes to them.
+    """
+
+    def __init__(self, max_queue: int = 100, redis_url: Optional[str] = None):
+        """
+        Initialize the broker.
+
+        Args:
+            max_queue: Maximum number of undelivered events per subscriber
+            redis_url: Optional Redis URL; when set, events are shared between processes
+        """
+        self.max_queue = max_queue
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+        self.relayed = 0
+        self.origin = uuid4().hex
+        self.redis_client = None
+        if redis_url:
+            if REDIS_AVAILABLE:
+                self.redis_client = redis.from_url(redis_url, decode_responses=True)
+            else:
+                logger.warning("Redis not available. Progress events will be process-local")
+        self._listener: Optional[asyncio.Task] = None
+        self._forwarding: Set[asyncio.Task] = set()
+
+    @asynccontextmanager
+    async def subscribe(self, document_id: str) -> AsyncIterator[Subscription]:
+        """
+        Subscribe to a document's events for the duration of the context.
+
+        Args:
+            document_id: Document ID
+
+        Yields:
+            Subscription receiving the events
+        """
+        if self.redis_client is not None and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.create_task(self._listen())
+        subscription = Subscription(document_id, self.max_queue)
+        self._subscribers.setdefault(document_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._subscribers.get(document_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[document_id]
+
+    def publish(
+        self,
+        document_id: str,
+        data: Dict[str, Any],
+        event: str = "progress",
+        terminal: bool = False
+    ) -> int:
+        """
+        Deliver an event to every subscriber of a document.
+
+        Args:
+            document_id: Document ID
+            data: Event payload
+            event: Event name
+            terminal: Whether the event ends the stream
+
+        Returns:
+            Number of local subscribers the event was queued for
+        """
+        self.published += 1
+        if self.redis_client is not None:
+            self._forward(document_id, data, event, terminal)
+        return self._deliver(document_id, data, event, terminal)
+
+    def _deliver(self, document_id: str, data: Dict[str, Any], event: str, terminal: bool) -> int:
+        """Queue an event for the local subscribers of a document."""
+        subscribers = self._subscribers.get(document_id, ())
+        for subscription in subscribers:
+            subscription.put({"event": event, "data": data}, terminal)
+        return len(subscribers)
+
+    def _forward(self, document_id: str, data: Dict[str, Any], event: str, terminal: bool) -> None:
+        """Publish an event on the Redis channel without waiting for it."""
+        message = json.dumps({
+            "origin": self.origin,
+            "document_id": document_id,
+            "event": event,
+            "data": data,
+            "terminal": terminal,
+        }, default=str)
+        task = asyncio.create_task(self._send(message))
+        self._forwarding.add(task)
+        task.add_done_callback(self._forwarding.discard)
+
+    async def _send(self, message: str) -> None:
+        try:
+            await self.redis_client.publish(REDIS_CHANNEL, message)
+        except Exception as e:
+            logger.warning(f"Failed to relay progress event through Redis: {e}")
+
+    async def _listen(self) -> None:
+        """Deliver events published by other processes to local subscribers."""
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(REDIS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    item = json.loads(message["data"])
+                    if item.get("origin") == self.origin:
+                        continue
+                    self.relayed += 1
+                    self._deliver(item["document_id"], item["data"], item["event"], item["terminal"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Progress event relay interrupted: {e}")
+                await asyncio.sleep(RECONNECT_DELAY)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    def stats(self) -> Dict[str, int]:
+        """Get subscriber counts."""
+        return {
+            "documents": len(self._subscribers),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "relayed": self.relayed,
+        }
+
+    async def close(self) -> None:
+        """Stop relaying events and close the Redis connection, if any."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self._forwarding:
+            await asyncio.gather(*self._forwarding, return_exceptions=True)
+        if self.redis_client is not None:
+            await self.redis_client.close()
+            self.redis_client = None
+
+
+# Global broker instance
+_progress_broker: Optional[ProgressBroker] = None
+
+
+def get_progress_broker() -> ProgressBroker:
+    """
+    Get or create the global progress broker.
+
+    Returns:
+        ProgressBroker instance
+    """
+    global _progress_broker
+    if _progress_broker is None:
+        settings = get_settings()
+        _progress_broker = ProgressBroker(
+            max_queue=settings.progress_subscriber_queue_size,
+            redis_url=settings.progress_store_redis_url or None
+        )
+    return _progress_broker
+
+
+async def shutdown_progress_broker() -> None:
+    """Close the global progress broker."""
+    global _progress_broker
+    if _progress_broker is not None:
+        await _progress_broker.close()
+        _progress_broker = None
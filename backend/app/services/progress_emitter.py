@@ -1,13 +1,23 @@
 """
 Progress Emitter Service - Emits processing progress via Redis pub/sub for real-time updates.
+Events are queued in memory and delivered by a background task, so emitting
+progress never blocks document processing.
 """
 
 import json
+import time
 import asyncio
 import logging
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
+
+import httpx
+
 from ..parsers.ast_models import ParseProgress
 from ..core.config import Settings
+from .progress_broker import get_progress_broker
+from .progress_store import get_progress_store
+from ..socketio import emit_document_event
 
 try:
     import redis.asyncio as redis
@@ -16,26 +26,42 @@ except ImportError:
     redis = None
     REDIS_AVAILABLE = False
 
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    requests = None
-    REQUESTS_AVAILABLE = False
-
 logger = logging.getLogger(__name__)
 
+# Stages that end processing; these events are never coalesced or dropped
+TERMINAL_STAGES = {"completion", "error"}
+
 
 class ProgressEmitter:
     """
     Service for emitting progress updates via Redis pub/sub or direct HTTP calls.
+
+    ``emit_progress`` only enqueues the event. Consecutive non-terminal events
+    for the same document are coalesced so only the latest is sent, and when
+    more documents are pending than the queue allows, the stalest non-terminal
+    events are dropped.
     """
 
     def __init__(self, settings: Optional[Settings] = None):
         """Initialize the progress emitter."""
         self.settings = settings or Settings()
         self.redis_client: Optional[redis.Redis] = None
+        self.http_client: Optional[httpx.AsyncClient] = None
         self.frontend_base_url = getattr(self.settings, 'FRONTEND_BASE_URL', 'http://localhost:3000')
+        self.max_pending = getattr(self.settings, 'progress_max_pending', 1000)
+        self.http_timeout = getattr(self.settings, 'progress_http_timeout', 5.0)
+        self.http_enabled = getattr(self.settings, 'progress_http_enabled', True)
+        
+        # Pending events per document, in arrival order of the documents
+        self._pending: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._sender: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
         
     async def initialize_redis(self):
         """Initialize Redis connection for pub/sub."""
@@ -56,81 +82,164 @@ class ProgressEmitter:
             logger.warning(f"Redis connection failed: {e}. Falling back to HTTP updates")
             self.redis_client = None
 
-    async def emit_progress_redis(
+    async def emit_progress(
         self, 
         document_id: str, 
         progress: ParseProgress
     ) -> bool:
         """
-        Emit progress via Redis pub/sub.
+        Publish a progress event to in-process subscribers and queue it for
+        background delivery.
         
         Args:
             document_id: Unique identifier for the document being processed
             progress: ParseProgress object containing progress information
             
         Returns:
-            True if successful, False otherwise
+            True once the event is queued
         """
-        if not self.redis_client:
-            return False
+        self._ensure_sender()
+        
+        event = self._build_payload(document_id, progress)
+        get_progress_broker().publish(document_id, event["payload"])
+        events = self._pending.get(document_id)
+        if events is None:
+            self._pending[document_id] = [event]
+        elif not event["terminal"] and not events[-1]["terminal"]:
+            # Superseded by the newer event for the same document
+            events[-1] = event
+            self.coalesced += 1
+        else:
+            events.append(event)
+        
+        self._shed_load()
+        self._idle.clear()
+        self._wakeup.set()
+        return True
+
+    async def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait until all queued events have been delivered.
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+        """
+        if self._idle is None or self._loop is not asyncio.get_running_loop():
+            return
+        await asyncio.wait_for(self._idle.wait(), timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """Get delivery statistics."""
+        return {
+            "pending_documents": len(self._pending),
+            "pending_events": sum(len(events) for events in self._pending.values()),
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def _ensure_sender(self) -> None:
+        """Start the background sender on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or the previous loop has gone away
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._idle = asyncio.Event()
+            self._idle.set()
+            self._sender = None
+            self.http_client = None
+        if self._sender is None or self._sender.done():
+            self._sender = loop.create_task(self._run_sender())
 
+    def _shed_load(self) -> None:
+        """Drop the stalest non-terminal events when too many documents are pending."""
+        excess = len(self._pending) - self.max_pending
+        if excess <= 0:
+            return
+        for document_id in list(self._pending):
+            if excess <= 0:
+                break
+            events = self._pending[document_id]
+            kept = [event for event in events if event["terminal"]]
+            self.dropped += len(events) - len(kept)
+            if kept:
+                self._pending[document_id] = kept
+            else:
+                del self._pending[document_id]
+                excess -= 1
+
+    async def _run_sender(self) -> None:
+        """Deliver queued events, oldest document first."""
+        while True:
+            if not self._pending:
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            
+            document_id, events = self._pending.popitem(last=False)
+            for event in events:
+                await self._send(event["payload"])
+
+    async def _send(self, payload: Dict[str, Any]) -> None:
+        """Push one event to Socket.IO subscribers, then Redis or the frontend over HTTP."""
         try:
-            progress_data = {
-                'documentId': document_id,
-                'stage': self._map_stage_to_frontend(progress.stage),
-                'progress': min(100, max(0, progress.progress * 100)),  # Convert to 0-100 range
-                'message': progress.message,
-                'timestamp': progress.timestamp,
-                'details': progress.details or {}
-            }
+            await emit_document_event(payload['documentId'], "document_progress", payload)
+        except Exception as e:
+            logger.error(f"Failed to emit progress via Socket.IO: {e}")
+        if self.redis_client and await self._send_redis(payload):
+            self.sent += 1
+            return
+        if not self.http_enabled or await self._send_http(payload):
+            self.sent += 1
+        else:
+            self.failed += 1
 
-            await self.redis_client.publish(
-                'document-progress', 
-                json.dumps(progress_data)
-            )
+    async def _send_redis(self, payload: Dict[str, Any]) -> bool:
+        """
+        Publish an event via Redis pub/sub.
+        
+        Args:
+            payload: Event payload
             
-            logger.debug(f"Progress emitted via Redis for document {document_id}: {progress.stage}")
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            await self.redis_client.publish('document-progress', json.dumps(payload, default=str))
+            logger.debug(f"Progress emitted via Redis for document {payload['documentId']}: {payload['stage']}")
             return True
-            
         except Exception as e:
             logger.error(f"Failed to emit progress via Redis: {e}")
             return False
 
-    def emit_progress_http(
-        self, 
-        document_id: str, 
-        progress: ParseProgress
-    ) -> bool:
+    async def _send_http(self, payload: Dict[str, Any]) -> bool:
         """
-        Emit progress via HTTP API call to frontend.
+        Post an event to the frontend over a pooled HTTP client.
         
         Args:
-            document_id: Unique identifier for the document being processed
-            progress: ParseProgress object containing progress information
+            payload: Event payload
             
         Returns:
             True if successful, False otherwise
         """
-        if not REQUESTS_AVAILABLE:
-            logger.debug(f"HTTP requests not available. Progress logged for document {document_id}: {progress.stage}")
-            return True  # Consider it successful for development
-            
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient(
+                base_url=self.frontend_base_url,
+                timeout=self.http_timeout
+            )
+        
         try:
-            progress_data = {
-                'documentId': document_id,
-                'stage': self._map_stage_to_frontend(progress.stage),
-                'progress': min(100, max(0, progress.progress * 100)),  # Convert to 0-100 range
-                'message': progress.message
-            }
-
-            response = requests.post(
-                f"{self.frontend_base_url}/api/progress",
-                json=progress_data,
-                timeout=5
+            response = await self.http_client.post(
+                "/api/progress",
+                content=json.dumps(payload, default=str),
+                headers={"Content-Type": "application/json"}
             )
             
             if response.status_code == 200:
-                logger.debug(f"Progress emitted via HTTP for document {document_id}: {progress.stage}")
+                logger.debug(f"Progress emitted via HTTP for document {payload['documentId']}: {payload['stage']}")
                 return True
             else:
                 logger.warning(f"HTTP progress update failed with status {response.status_code}")
@@ -140,29 +249,19 @@ class ProgressEmitter:
             logger.error(f"Failed to emit progress via HTTP: {e}")
             return False
 
-    async def emit_progress(
-        self, 
-        document_id: str, 
-        progress: ParseProgress
-    ) -> bool:
-        """
-        Emit progress using the best available method (Redis preferred, HTTP fallback).
-        
-        Args:
-            document_id: Unique identifier for the document being processed
-            progress: ParseProgress object containing progress information
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        # Try Redis first
-        if self.redis_client:
-            success = await self.emit_progress_redis(document_id, progress)
-            if success:
-                return True
-
-        # Fallback to HTTP
-        return self.emit_progress_http(document_id, progress)
+    def _build_payload(self, document_id: str, progress: ParseProgress) -> Dict[str, Any]:
+        """Convert a progress object into a queued event."""
+        return {
+            "terminal": progress.stage in TERMINAL_STAGES,
+            "payload": {
+                'documentId': document_id,
+                'stage': self._map_stage_to_frontend(progress.stage),
+                'progress': min(100, max(0, progress.progress * 100)),  # Convert to 0-100 range
+                'message': progress.message,
+                'timestamp': time.time(),
+                'details': progress.details or {}
+            }
+        }
 
     def _map_stage_to_frontend(self, backend_stage: str) -> str:
         """
@@ -185,8 +284,18 @@ class ProgressEmitter:
         
         return stage_mapping.get(backend_stage, 'parsing')
 
-    async def close(self):
-        """Clean up resources."""
+    async def close(self, timeout: float = 5.0):
+        """Deliver remaining events and clean up resources."""
+        try:
+            await self.flush(timeout)
+        except (asyncio.TimeoutError, RuntimeError):
+            logger.warning(f"Dropping {self.stats()['pending_events']} undelivered progress events")
+        if self._sender is not None and self._loop is asyncio.get_running_loop():
+            self._sender.cancel()
+        self._sender = None
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
         if self.redis_client:
             await self.redis_client.close()
 
@@ -202,16 +311,31 @@ async def get_progress_emitter() -> ProgressEmitter:
         await _progress_emitter.initialize_redis()
     return _progress_emitter
 
+async def shutdown_progress_emitter() -> None:
+    """Flush and shutdown the global progress emitter instance."""
+    global _progress_emitter
+    if _progress_emitter is not None:
+        await _progress_emitter.close()
+        _progress_emitter = None
+
 async def emit_document_progress(document_id: str, progress: ParseProgress) -> bool:
     """
     Convenience function to emit progress for a document.
+    The latest stage and percentage are recorded in the progress store for
+    status polling; the event itself is queued and delivered in the background.
     
     Args:
         document_id: Unique identifier for the document
         progress: ParseProgress object
         
     Returns:
-        True if successful, False otherwise
+        True once the event is queued
     """
     emitter = await get_progress_emitter()
+    await get_progress_store().update(
+        document_id,
+        stage=emitter._map_stage_to_frontend(progress.stage),
+        progress=min(100, max(0, progress.progress * 100)),
+        message=progress.message
+    )
     return await emitter.emit_progress(document_id, progress)
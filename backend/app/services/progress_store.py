@@ -0,0 +1,283 @@
+"""
+Progress store for cheap processing status lookups.
+Keeps the latest status, stage and percentage of each document in memory, or
+in Redis when several processes share it, so status polling never touches the
+database.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.core.config import get_settings
+
+try:
+    import redis.asyncio as redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+# Redis hash holding the progress entry of a document
+REDIS_KEY_PREFIX = "document-progress:"
+
+# Document columns mirrored in progress entries, and their entry field names
+STATUS_FIELDS = {
+    "processing_status": "status",
+    "processing_started_at": "started_at",
+    "processing_completed_at": "completed_at",
+    "processing_error": "error",
+    "markdown_size": "markdown_size",
+    "markdown_sha256": "markdown_sha256",
+}
+
+
+def status_fields(values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Pick the status columns out of document values, renamed to entry fields.
+
+    Args:
+        values: Document column values, e.g. an update or a status row
+
+    Returns:
+        Entry fields for ``ProgressStore.update``
+    """
+    return {STATUS_FIELDS[name]: value for name, value in values.items() if name in STATUS_FIELDS}
+
+
+def compute_etag(entry: Dict[str, Any]) -> str:
+    """
+    Compute the entity tag of a progress entry.
+
+    Args:
+        entry: Progress entry
+
+    Returns:
+        Quoted strong ETag that changes whenever the entry changes
+    """
+    encoded = json.dumps(entry, sort_keys=True, default=str).encode()
+    return f'"{hashlib.sha1(encoded).hexdigest()[:20]}"'
+
+
+class ProgressStore:
+    """
+    Latest processing state per document.
+
+    Entries are partial dictionaries that ``update`` merges into; in memory
+    they are kept in LRU order and expire ``ttl_seconds`` after their last
+    update.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 3600.0,
+        redis_url: Optional[str] = None
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            max_entries: Maximum number of documents kept in memory
+            ttl_seconds: Seconds an entry is kept after its last update
+            redis_url: Optional Redis URL; when set, entries are shared through Redis
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.redis_client = None
+        if redis_url:
+            if REDIS_AVAILABLE:
+                self.redis_client = redis.from_url(redis_url, decode_responses=True, socket_timeout=1.0)
+            else:
+                logger.warning("Redis not available. Progress store will be process-local")
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._updated: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def update(self, document_id: str, **fields: Any) -> Dict[str, Any]:
+        """
+        Merge fields into a document's entry.
+
+        Args:
+            document_id: Document ID
+            **fields: Fields to set, e.g. status, stage, progress, message
+
+        Returns:
+            Copy of the entry held in memory after the update
+        """
+        fields = {key: _serializable(value) for key, value in fields.items()}
+        fields["updated_at"] = time.time()
+
+        entry = self._entries.pop(document_id, None)
+        if entry is None or self._expired(document_id):
+            entry = {}
+        entry.update(fields)
+        self._entries[document_id] = entry
+        self._updated[document_id] = fields["updated_at"]
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._updated.pop(evicted, None)
+
+        if self.redis_client is not None:
+            key = REDIS_KEY_PREFIX + document_id
+            try:
+                async with self.redis_client.pipeline(transaction=True) as pipe:
+                    pipe.hset(key, mapping={name: json.dumps(value) for name, value in fields.items()})
+                    pipe.expire(key, int(self.ttl_seconds))
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Failed to store progress for document {document_id} in Redis: {e}")
+        return dict(entry)
+
+    async def get(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a document's entry.
+
+        Redis, when configured, is authoritative because other processes may
+        have updated the entry; memory is used if Redis cannot be reached.
+
+        Args:
+            document_id: Document ID
+
+        Returns:
+            Copy of the entry, or None if the document is not tracked
+        """
+        entry = None
+        if self.redis_client is not None:
+            try:
+                raw = await self.redis_client.hgetall(REDIS_KEY_PREFIX + document_id)
+                entry = {name: json.loads(value) for name, value in raw.items()} or None
+            except Exception as e:
+                logger.warning(f"Failed to read progress for document {document_id} from Redis: {e}")
+                entry = self._get_local(document_id)
+        else:
+            entry = self._get_local(document_id)
+
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(entry)
+
+    @property
+    def shared(self) -> bool:
+        """Whether entries are shared with other processes through Redis."""
+        return self.redis_client is not None
+
+    async def reconcile(self, document_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Bring a document's entry in line with its stored status.
+
+        An entry that already matches is returned unchanged, so its ETag stays
+        stable between polls. A different status replaces the entry, dropping
+        the stage and progress reported for the previous status.
+
+        Args:
+            document_id: Document ID
+            fields: Entry fields read from the database, see ``status_fields``
+
+        Returns:
+            Copy of the entry after reconciling
+        """
+        fields = {key: _serializable(value) for key, value in fields.items()}
+        entry = await self.get(document_id)
+        if entry is not None:
+            if all(entry.get(key) == value for key, value in fields.items()):
+                return entry
+            if entry.get("status") != fields.get("status"):
+                await self.discard(document_id)
+        return await self.update(document_id, **fields)
+
+    async def discard(self, document_id: str) -> None:
+        """
+        Forget a document, e.g. after it was deleted.
+
+        Args:
+            document_id: Document ID
+        """
+        self._entries.pop(document_id, None)
+        self._updated.pop(document_id, None)
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.delete(REDIS_KEY_PREFIX + document_id)
+            except Exception as e:
+                logger.warning(f"Failed to remove progress for document {document_id} from Redis: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis" if self.redis_client is not None else "memory",
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    async def close(self) -> None:
+        """Close the Redis connection, if any."""
+        if self.redis_client is not None:
+            await self.redis_client.close()
+            self.redis_client = None
+
+    def _get_local(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Get an unexpired in-memory entry, refreshing its LRU position."""
+        entry = self._entries.get(document_id)
+        if entry is None:
+            return None
+        if self._expired(document_id):
+            del self._entries[document_id]
+            self._updated.pop(document_id, None)
+            return None
+        self._entries.move_to_end(document_id)
+        return entry
+
+    def _expired(self, document_id: str) -> bool:
+        updated = self._updated.get(document_id)
+        return updated is None or time.time() - updated > self.ttl_seconds
+
+
+def _serializable(value: Any) -> Any:
+    """Convert values that JSON cannot encode."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+# Global store instance
+_progress_store: Optional[ProgressStore] = None
+
+
+def get_progress_store() -> ProgressStore:
+    """
+    Get or create the global progress store.
+
+    Returns:
+        ProgressStore instance
+    """
+    global _progress_store
+    if _progress_store is None:
+        settings = get_settings()
+        _progress_store = ProgressStore(
+            max_entries=settings.progress_store_max_entries,
+            ttl_seconds=settings.progress_store_ttl,
+            redis_url=settings.progress_store_redis_url or None
+        )
+    return _progress_store
+
+
+async def shutdown_progress_store() -> None:
+    """Close the global progress store."""
+    global _progress_store
+    if _progress_store is not None:
+        await _progress_store.close()
+        _progress_store = None
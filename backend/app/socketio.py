@@ -97,7 +97,53 @@ async def leave_room(sid: str, data: Dict[str, Any]):
         await sio.emit("left_room", {"room": room}, room=sid)
 
 
+def document_room(document_id: str) -> str:
+    """
+    Name of the room receiving a document's progress events.
+    
+    Args:
+        document_id: Document ID
+        
+    Returns:
+        Room name clients join to follow the document
+    """
+    return f"document:{document_id}"
+
+
+@sio.event
+async def subscribe_document(sid: str, data: Dict[str, Any]):
+    """
+    Handle a client subscribing to a document's progress events.
+    """
+    document_id = data.get("document_id")
+    if document_id:
+        await sio.enter_room(sid, document_room(document_id))
+        await sio.emit("subscribed", {"document_id": document_id}, room=sid)
+
+
+@sio.event
+async def unsubscribe_document(sid: str, data: Dict[str, Any]):
+    """
+    Handle a client unsubscribing from a document's progress events.
+    """
+    document_id = data.get("document_id")
+    if document_id:
+        await sio.leave_room(sid, document_room(document_id))
+
+
 # Progress event functions
+async def emit_document_event(document_id: str, event: str, data: Dict[str, Any]):
+    """
+    Emit a document progress or status event to the document's room.
+    
+    Args:
+        document_id: The document ID
+        event: Event name, ``document_progress`` or ``document_status``
+        data: Event payload
+    """
+    await sio.emit(event, data, room=document_room(document_id))
+
+
 async def emit_progress(
     session_id: str,
     progress: float,
@@ -0,0 +1,205 @@
+"""
+Content-addressed blob store for binary payloads such as extracted images.
+Blobs are kept as raw bytes in memory and spilled to disk once the memory
+budget is exhausted; callers only ever hold the SHA-256 digest.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+from app.core.config import get_settings
+
+
+BlobData = Union[bytes, bytearray, memoryview]
+
+
+class BlobNotFoundError(KeyError):
+    """Raised when a digest is not present in the store."""
+    pass
+
+
+class BlobStore:
+    """
+    Reference-counted, content-addressed blob store.
+
+    Storing the same content twice returns the same digest and keeps a single
+    copy; every ``put`` or ``retain`` must be balanced by a ``release``.
+    """
+
+    def __init__(self, max_memory_bytes: Optional[int] = None, spill_dir: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            max_memory_bytes: Memory budget for blobs; None means unbounded
+            spill_dir: Directory for blobs that do not fit in memory
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self._memory: Dict[str, bytes] = {}
+        self._spilled: Dict[str, Path] = {}
+        self._refs: Dict[str, int] = {}
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(data: BlobData) -> str:
+        """Compute the content digest of a payload."""
+        return hashlib.sha256(data).hexdigest()
+
+    def put(self, data: BlobData, digest: Optional[str] = None) -> str:
+        """
+        Store a payload and take a reference to it.
+
+        Args:
+            data: Raw bytes to store
+            digest: Precomputed digest of ``data``, if already known
+
+        Returns:
+            SHA-256 hex digest identifying the payload
+        """
+        digest = digest or self.digest(data)
+        with self._lock:
+            if digest in self._refs:
+                self._refs[digest] += 1
+                return digest
+
+            size = len(data)
+            fits = self.max_memory_bytes is None or self._memory_bytes + size <= self.max_memory_bytes
+            if fits or self.spill_dir is None:
+                self._memory[digest] = bytes(data)
+                self._memory_bytes += size
+            else:
+                self._spilled[digest] = self._spill(digest, data)
+            self._refs[digest] = 1
+        return digest
+
+    def retain(self, digest: str) -> None:
+        """Take an additional reference to a stored payload."""
+        with self._lock:
+            if digest not in self._refs:
+                raise BlobNotFoundError(digest)
+            self._refs[digest] += 1
+
+    def release(self, digest: str) -> None:
+        """
+        Drop a reference; the payload is discarded when no references remain.
+        Releasing an unknown digest is a no-op.
+        """
+        with self._lock:
+            refs = self._refs.get(digest)
+            if refs is None:
+                return
+            if refs > 1:
+                self._refs[digest] = refs - 1
+                return
+
+            del self._refs[digest]
+            data = self._memory.pop(digest, None)
+            if data is not None:
+                self._memory_bytes -= len(data)
+            path = self._spilled.pop(digest, None)
+
+        if path is not None:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def get(self, digest: str, size: Optional[int] = None) -> BlobData:
+        """
+        Read a payload without copying it when it is held in memory.
+
+        Args:
+            digest: Digest returned by ``put``
+            size: Read at most this many leading bytes
+
+        Returns:
+            Payload bytes (a memoryview for in-memory blobs)
+
+        Raises:
+            BlobNotFoundError: If the digest is unknown
+        """
+        with self._lock:
+            data = self._memory.get(digest)
+            path = self._spilled.get(digest)
+
+        if data is not None:
+            view = memoryview(data)
+            return view if size is None else view[:size]
+        if path is None:
+            raise BlobNotFoundError(digest)
+
+        with open(path, "rb") as blob_file:
+            return blob_file.read() if size is None else blob_file.read(size)
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            return digest in self._refs
+
+    def items(self) -> Iterator[Tuple[str, BlobData]]:
+        """Iterate over (digest, payload) pairs currently stored."""
+        with self._lock:
+            digests = list(self._refs)
+        for digest in digests:
+            yield digest, self.get(digest)
+
+    def stats(self) -> Dict[str, int]:
+        """Get store usage statistics."""
+        with self._lock:
+            return {
+                "blobs": len(self._refs),
+                "memory_blobs": len(self._memory),
+                "spilled_blobs": len(self._spilled),
+                "memory_bytes": self._memory_bytes,
+            }
+
+    def _spill(self, digest: str, data: BlobData) -> Path:
+        """Write a payload to the spill directory atomically."""
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        path = self.spill_dir / digest
+        if not path.exists():
+            tmp_path = path.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as blob_file:
+                blob_file.write(data)
+            os.replace(tmp_path, path)
+        return path
+
+
+# Global store instance
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """
+    Get or create the global blob store instance.
+
+    Returns:
+        BlobStore instance
+    """
+    global _blob_store
+    if _blob_store is None:
+        settings = get_settings()
+        _blob_store = BlobStore(
+            max_memory_bytes=settings.blob_store_memory_limit,
+            spill_dir=settings.blob_store_dir
+        )
+    return _blob_store
+
+
+def reset_blob_store() -> BlobStore:
+    """
+    Replace the global store with an empty, unbounded in-memory store.
+
+    Used by parse worker processes: their blobs are shipped back to the
+    parent with each fragment and must not spill into the parent's directory.
+
+    Returns:
+        The new BlobStore instance
+    """
+    global _blob_store
+    _blob_store = BlobStore()
+    return _blob_store
@@ -2,17 +2,40 @@
 File utilities for handling document uploads and processing.
 """
 
+import asyncio
+import hashlib
 import os
 import mimetypes
-from typing import Optional, Tuple
+import uuid
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
 from pathlib import Path
 
+try:
+    import aiofiles
+    AIOFILES_AVAILABLE = True
+except ImportError:
+    AIOFILES_AVAILABLE = False
+
 from app.core.config import get_settings
 
 
 settings = get_settings()
 
 
+class UploadTooLargeError(Exception):
+    """Raised when an upload stream exceeds the maximum upload size."""
+    pass
+
+
+@dataclass
+class StoredFile:
+    """A file streamed to disk, with its size and SHA-256 digest."""
+    path: str
+    size: int
+    sha256: str
+
+
 def get_file_info(filename: str) -> Tuple[str, str]:
     """
     Get file type and MIME type from filename.
@@ -107,3 +130,180 @@ def clean_filename(filename: str) -> str:
         clean_name = f"{name_part}{ext_part}"
     
     return clean_name
+
+
+def _temp_path(dest_path: str) -> str:
+    """Create the directory of ``dest_path`` and return a unique temporary path next to it."""
+    directory = os.path.dirname(dest_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f".{os.path.basename(dest_path)}.{uuid.uuid4().hex}.part")
+
+
+async def stream_to_file(
+    source: Any,
+    dest_path: str,
+    max_size: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> StoredFile:
+    """
+    Stream an upload to disk chunk by chunk, hashing it on the way.
+
+    The data is written to a temporary file next to ``dest_path`` and renamed
+    into place only once it is complete, so readers never see partial files.
+    At most one chunk is held in memory.
+
+    Args:
+        source: Object with an async ``read(size)`` method, e.g. an UploadFile
+        dest_path: Final path of the file
+        max_size: Maximum number of bytes accepted; defaults to the upload limit
+        chunk_size: Bytes read per chunk; defaults to the configured chunk size
+
+    Returns:
+        StoredFile describing the written file
+
+    Raises:
+        UploadTooLargeError: If the stream is larger than ``max_size``
+    """
+    max_size = max_size if max_size is not None else settings.max_upload_size
+    chunk_size = chunk_size or settings.upload_chunk_size
+
+    temp_path = _temp_path(dest_path)
+
+    digest = hashlib.sha256()
+    size = 0
+
+    async def chunks():
+        nonlocal size
+        while chunk := await source.read(chunk_size):
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLargeError(f"File too large. Maximum size is {max_size} bytes")
+            digest.update(chunk)
+            yield chunk
+
+    try:
+        if AIOFILES_AVAILABLE:
+            async with aiofiles.open(temp_path, "wb") as f:
+                async for chunk in chunks():
+                    await f.write(chunk)
+        else:
+            f = await asyncio.to_thread(open, temp_path, "wb")
+            try:
+                async for chunk in chunks():
+                    await asyncio.to_thread(f.write, chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+
+        await asyncio.to_thread(os.replace, temp_path, dest_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    return StoredFile(path=dest_path, size=size, sha256=digest.hexdigest())
+
+
+class AtomicFileWriter:
+    """
+    Asynchronous text writer that publishes its file atomically.
+
+    Text is encoded and hashed as it is written and flushed to a temporary
+    file whenever ``flush_size`` bytes are buffered. Leaving the context
+    normally renames the temporary file to the destination; an exception
+    removes it, so the destination only ever holds complete output.
+
+    Usage:
+        async with AtomicFileWriter(path) as writer:
+            await writer.write(text)
+        stored = writer.stored
+    """
+
+    def __init__(self, dest_path: str, flush_size: Optional[int] = None, encoding: str = "utf-8"):
+        """
+        Initialize the writer.
+
+        Args:
+            dest_path: Final path of the file
+            flush_size: Bytes buffered before a flush; defaults to the configured markdown flush size
+            encoding: Text encoding
+        """
+        self.dest_path = dest_path
+        self.flush_size = max(1, flush_size or settings.markdown_flush_size)
+        self.encoding = encoding
+        self.size = 0
+        self.stored: Optional[StoredFile] = None
+        self._digest = hashlib.sha256()
+        self._buffer: list = []
+        self._buffered = 0
+        self._temp_path: Optional[str] = None
+        self._file = None
+
+    async def __aenter__(self) -> "AtomicFileWriter":
+        self._temp_path = await asyncio.to_thread(_temp_path, self.dest_path)
+        if AIOFILES_AVAILABLE:
+            self._file = await aiofiles.open(self._temp_path, "wb")
+        else:
+            self._file = await asyncio.to_thread(open, self._temp_path, "wb")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            await self._discard()
+            return
+        try:
+            await self.flush()
+            await self._close()
+            await asyncio.to_thread(os.replace, self._temp_path, self.dest_path)
+        except BaseException:
+            await self._discard()
+            raise
+        self.stored = StoredFile(path=self.dest_path, size=self.size, sha256=self._digest.hexdigest())
+
+    async def write(self, text: str) -> None:
+        """
+        Write text, flushing once enough is buffered.
+
+        Args:
+            text: Text to append
+        """
+        data = text.encode(self.encoding)
+        self._digest.update(data)
+        self.size += len(data)
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self.flush_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write buffered text to the temporary file."""
+        if not self._buffer:
+            return
+        data = b"".join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        if AIOFILES_AVAILABLE:
+            await self._file.write(data)
+        else:
+            await asyncio.to_thread(self._file.write, data)
+
+    async def _close(self) -> None:
+        if self._file is None:
+            return
+        file, self._file = self._file, None
+        if AIOFILES_AVAILABLE:
+            await file.close()
+        else:
+            await asyncio.to_thread(file.close)
+
+    async def _discard(self) -> None:
+        """Close and remove the temporary file after a failure."""
+        try:
+            await self._close()
+        except Exception:
+            pass
+        try:
+            os.remove(self._temp_path)
+        except OSError:
+            pass
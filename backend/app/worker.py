@@ -0,0 +1,209 @@
+"""
+Document processing worker.
+Claims jobs from the durable job queue and runs up to N of them concurrently.
+
+Usage:
+    python -m app.worker [--concurrency 4] [--worker-id parse-1]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+from typing import Optional, Set
+from uuid import uuid4
+
+from app.core.config import get_settings
+from app.core.logging import setup_logging
+from app.db.database import close_db, init_db
+from app.models.processing_job import ProcessingJob
+from app.services.job_queue import JobQueue
+from app.services.processing_runner import (
+    DocumentNotFoundError,
+    JobLeaseLostError,
+    record_processing_failure,
+    report_batch_progress,
+    run_document_processing,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Job queue consumer.
+
+    Each claimed job gets a heartbeat task that renews its lease; if the
+    worker dies, the lease runs out and another worker reclaims the job. A
+    worker that finds its lease taken over cancels the job and leaves it to
+    the new owner.
+    """
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        worker_id: Optional[str] = None
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            queue: Job queue to consume
+            concurrency: Maximum number of jobs run at once
+            poll_interval: Seconds to wait when the queue is empty
+            worker_id: Identifier recorded on claimed jobs
+        """
+        settings = get_settings()
+        self.queue = queue or JobQueue()
+        self.concurrency = max(1, concurrency or settings.worker_concurrency)
+        self.poll_interval = poll_interval if poll_interval is not None else settings.worker_poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:6]}"
+        self._running: Set[asyncio.Task] = set()
+        self._stopping: Optional[asyncio.Event] = None
+
+    async def run(self) -> None:
+        """Claim and run jobs until ``stop`` is called."""
+        self._stopping = asyncio.Event()
+        logger.info(f"Worker {self.worker_id} started with concurrency {self.concurrency}")
+        try:
+            while not self._stopping.is_set():
+                claimed = await self.run_available()
+                if not claimed:
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            if self._running:
+                await asyncio.gather(*self._running, return_exceptions=True)
+            logger.info(f"Worker {self.worker_id} stopped")
+
+    async def run_available(self) -> int:
+        """
+        Claim jobs for every free slot and start them.
+
+        Returns:
+            Number of jobs claimed
+        """
+        claimed = 0
+        try:
+            await self.queue.reap_expired()
+            while len(self._running) < self.concurrency:
+                job = await self.queue.claim(self.worker_id)
+                if job is None:
+                    break
+                task = asyncio.create_task(self._run_job(job))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+                claimed += 1
+        except Exception as e:
+            logger.error(f"Failed to claim jobs: {e}")
+        return claimed
+
+    def stop(self) -> None:
+        """Stop claiming jobs; running jobs are allowed to finish."""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def _run_job(self, job: ProcessingJob) -> None:
+        """Run one claimed job while keeping its lease alive."""
+        payload = job.payload or {}
+        processing = asyncio.create_task(run_document_processing(
+            job.document_id,
+            enable_ai_processing=payload.get("enable_ai_processing", True),
+            force_reanalysis=payload.get("force_reanalysis", False),
+            processing_options=payload.get("processing_options"),
+            still_owned=lambda: self.queue.heartbeat(job.id, self.worker_id)
+        ))
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        try:
+            await asyncio.wait((processing, heartbeat), return_when=asyncio.FIRST_COMPLETED)
+            if not processing.done():
+                # The lease was lost: another worker may already be running the job
+                processing.cancel()
+                await asyncio.gather(processing, return_exceptions=True)
+                logger.warning(f"Cancelled job {job.id} for document {job.document_id} after losing its lease")
+                return
+            result = processing.result()
+        except JobLeaseLostError as e:
+            logger.warning(f"Job {job.id}: {e}")
+            return
+        except DocumentNotFoundError as e:
+            retrying = False
+            await self.queue.fail(job.id, self.worker_id, str(e), job.max_attempts, job.max_attempts)
+        except Exception as e:
+            logger.error(f"Job {job.id} for document {job.document_id} failed (attempt {job.attempts}): {e}")
+            retrying = await self.queue.fail(job.id, self.worker_id, str(e), job.attempts, job.max_attempts)
+            await record_processing_failure(job.document_id, str(e), retrying)
+        else:
+            retrying = False
+            if not await self.queue.complete(job.id, self.worker_id, result):
+                logger.warning(f"Job {job.id} was taken over by another worker before it completed")
+                return
+        finally:
+            heartbeat.cancel()
+            processing.cancel()
+        
+        if not retrying:
+            await report_batch_progress(self.queue, job)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        """Renew a job's lease at a third of the lease length; returns once the lease is lost."""
+        interval = max(self.queue.lease_seconds / 3, 0.1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.queue.heartbeat(job_id, self.worker_id):
+                    logger.warning(f"Worker {self.worker_id} lost the lease on job {job_id}")
+                    return
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {job_id} failed: {e}")
+
+
+async def _serve(worker: Worker) -> None:
+    """Run a worker until SIGINT or SIGTERM."""
+    await init_db()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:
+            pass
+    try:
+        await worker.run()
+    finally:
+        # Imported here to avoid loading AI and parser pools before they are needed
+        from app.services.ai_service import shutdown_ai_service
+        from app.services.progress_broker import shutdown_progress_broker
+        from app.services.progress_emitter import shutdown_progress_emitter
+        from app.services.progress_store import shutdown_progress_store
+        from app.parsers.process_pool import shutdown_process_pool
+        from app.services.ocr_pool import shutdown_ocr_pool
+
+        await shutdown_progress_emitter()
+        await shutdown_progress_broker()
+        await shutdown_progress_store()
+        await shutdown_ai_service()
+        shutdown_process_pool()
+        shutdown_ocr_pool()
+        await close_db()
+
+
+def main() -> None:
+    """Entry point for ``python -m app.worker``."""
+    arg_parser = argparse.ArgumentParser(description="Document processing worker")
+    arg_parser.add_argument("--concurrency", type=int, default=None, help="Maximum concurrent jobs")
+    arg_parser.add_argument("--worker-id", default=None, help="Identifier recorded on claimed jobs")
+    args = arg_parser.parse_args()
+
+    setup_logging()
+    asyncio.run(_serve(Worker(concurrency=args.concurrency, worker_id=args.worker_id)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark for single-pass PDF page layout extraction.
+
+Compares the previous extraction strategy, where every page was decoded three
+times (``get_text("dict")`` for text blocks and tables, ``get_text()`` for
+math), against decoding the page once into a shared PageLayout.
+
+Usage:
+    python benchmarks/bench_pdf_layout.py [--pages 200] [--lines 45] [--repeat 3]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.parsers.ast_models import DocumentAST
+from app.parsers.pdf_layout import PageLayout
+from app.parsers.pdf_parser import PDFParser
+
+
+def build_text_heavy_pdf(path: Path, pages: int, lines: int) -> None:
+    """Create a PDF with ``pages`` pages of ``lines`` text lines each."""
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        text = "\n".join(
+            f"Page {page_num + 1} line {line}: the quick brown fox jumps over the lazy dog, x = {line} + 1"
+            for line in range(lines)
+        )
+        page.insert_text((48, 48), text, fontsize=9)
+    doc.save(str(path))
+    doc.close()
+
+
+def legacy_decode(page) -> None:
+    """Decode a page the way the extractors used to: three separate passes."""
+    page.get_text("dict")  # text blocks
+    page.get_text("dict")  # tables
+    page.get_text()  # math
+
+
+def single_pass_decode(page, page_num: int) -> None:
+    """Decode a page once and derive the plain text from the same layout."""
+    layout = PageLayout.from_page(page, page_num)
+    layout.text
+
+
+def parse_pages(parser: PDFParser, doc) -> None:
+    """Run the full per-page extraction used by PDFParser."""
+    ast = DocumentAST()
+    for page_num in range(doc.page_count):
+        ast.extend(parser._parse_page(doc[page_num], page_num))
+
+
+def best_of(repeat: int, func) -> float:
+    """Return the best wall-clock time of ``repeat`` runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--pages", type=int, default=200)
+    arg_parser.add_argument("--lines", type=int, default=45)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = Path(tmp_dir) / "bench.pdf"
+        build_text_heavy_pdf(pdf_path, args.pages, args.lines)
+
+        with fitz.open(str(pdf_path)) as doc:
+            legacy = best_of(args.repeat, lambda: [legacy_decode(page) for page in doc])
+            single = best_of(args.repeat, lambda: [single_pass_decode(page, i) for i, page in enumerate(doc)])
+            full_parse = best_of(args.repeat, lambda: parse_pages(PDFParser(), doc))
+
+    print(f"Document: {args.pages} pages x {args.lines} lines")
+    print(f"  before (3 decodes per page): {legacy * 1000:8.1f} ms")
+    print(f"  after  (1 decode per page):  {single * 1000:8.1f} ms  ({legacy / single:.2f}x faster)")
+    print(f"  full page extraction:        {full_parse * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
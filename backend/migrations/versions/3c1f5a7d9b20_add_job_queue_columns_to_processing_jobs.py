@@ -0,0 +1,43 @@
+"""Add job queue columns to processing_jobs table
+
+Revision ID: 3c1f5a7d9b20
+Revises: 86ea82d35c42
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f5a7d9b20'
+down_revision: Union[str, None] = '86ea82d35c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Queue state used by workers to claim, lease and retry jobs
+    with op.batch_alter_table('processing_jobs') as batch_op:
+        batch_op.add_column(sa.Column('payload', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='3'))
+        batch_op.add_column(sa.Column('run_after', sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column('worker_id', sa.String(100), nullable=True))
+        batch_op.add_column(sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_processing_jobs_claim', 'processing_jobs', ['status', 'priority', 'run_after'])
+    op.create_index('ix_processing_jobs_document_id', 'processing_jobs', ['document_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_processing_jobs_document_id', table_name='processing_jobs')
+    op.drop_index('ix_processing_jobs_claim', table_name='processing_jobs')
+    with op.batch_alter_table('processing_jobs') as batch_op:
+        batch_op.drop_column('heartbeat_at')
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('worker_id')
+        batch_op.drop_column('run_after')
+        batch_op.drop_column('max_attempts')
+        batch_op.drop_column('payload')
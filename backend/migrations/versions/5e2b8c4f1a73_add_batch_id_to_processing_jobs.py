@@ -0,0 +1,30 @@
+"""Add batch_id column to processing_jobs table
+
+Revision ID: 5e2b8c4f1a73
+Revises: 3c1f5a7d9b20
+Create Date: 2026-10-17 10:03:18.542917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b8c4f1a73'
+down_revision: Union[str, None] = '3c1f5a7d9b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Groups jobs scheduled together by the batch processing API
+    op.add_column('processing_jobs', sa.Column('batch_id', sa.String(36), nullable=True))
+    op.create_index('ix_processing_jobs_batch_id', 'processing_jobs', ['batch_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_processing_jobs_batch_id', table_name='processing_jobs')
+    with op.batch_alter_table('processing_jobs') as batch_op:
+        batch_op.drop_column('batch_id')
@@ -0,0 +1,30 @@
+"""Add content_hash column to documents table
+
+Revision ID: 7a9d3e1b5c64
+Revises: 5e2b8c4f1a73
+Create Date: 2026-10-17 11:20:44.103562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a9d3e1b5c64'
+down_revision: Union[str, None] = '5e2b8c4f1a73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SHA-256 of the uploaded file, used to find identical earlier uploads
+    op.add_column('documents', sa.Column('content_hash', sa.String(64), nullable=True))
+    op.create_index('ix_documents_content_hash', 'documents', ['content_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_content_hash', table_name='documents')
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_column('content_hash')
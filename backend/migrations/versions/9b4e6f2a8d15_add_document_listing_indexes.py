@@ -0,0 +1,41 @@
+"""Add document listing indexes
+
+Revision ID: 9b4e6f2a8d15
+Revises: 7a9d3e1b5c64
+Create Date: 2026-10-17 12:05:37.618204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e6f2a8d15'
+down_revision: Union[str, None] = '7a9d3e1b5c64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows filled by the CURRENT_TIMESTAMP server default lack the fractional seconds
+# SQLAlchemy stores and binds on SQLite; the shorter text sorts before cursors
+# with the same second, so keyset pagination would return those rows again
+NORMALISE_CREATED_AT = (
+    "UPDATE documents SET created_at = created_at || '.000000' "
+    "WHERE length(created_at) = 19"
+)
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == 'sqlite':
+        op.execute(NORMALISE_CREATED_AT)
+    
+    # Keyset pagination on (created_at, id), overall and per user
+    op.create_index('ix_documents_listing', 'documents', ['is_deleted', 'created_at', 'id'])
+    op.create_index('ix_documents_user_listing', 'documents', ['user_id', 'is_deleted', 'created_at', 'id'])
+    op.create_index('ix_documents_processing_status', 'documents', ['processing_status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_processing_status', table_name='documents')
+    op.drop_index('ix_documents_user_listing', table_name='documents')
+    op.drop_index('ix_documents_listing', table_name='documents')
@@ -0,0 +1,30 @@
+"""Add markdown size and checksum columns to documents table
+
+Revision ID: b2c7d9e4f631
+Revises: 9b4e6f2a8d15
+Create Date: 2026-10-17 12:48:09.274511
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2c7d9e4f631'
+down_revision: Union[str, None] = '9b4e6f2a8d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Generated markdown is kept only in the file at markdown_path
+    op.add_column('documents', sa.Column('markdown_size', sa.Integer(), nullable=True))
+    op.add_column('documents', sa.Column('markdown_sha256', sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_column('markdown_sha256')
+        batch_op.drop_column('markdown_size')
@@ -0,0 +1,46 @@
+"""Allow one active processing job per document
+
+Revision ID: c4a8e2f6b913
+Revises: b2c7d9e4f631
+Create Date: 2026-10-17 16:42:11.305817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8e2f6b913'
+down_revision: Union[str, None] = 'b2c7d9e4f631'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = "status IN ('pending', 'running')"
+
+
+def upgrade() -> None:
+    # Keep the oldest active job of each document; later duplicates would process it again
+    op.execute(
+        "UPDATE processing_jobs SET status = 'failed', "
+        "error_message = 'Superseded by an earlier job for the document' "
+        f"WHERE {ACTIVE} AND EXISTS ("
+        "SELECT 1 FROM processing_jobs AS earlier "
+        "WHERE earlier.document_id = processing_jobs.document_id "
+        "AND earlier.status IN ('pending', 'running') "
+        "AND (earlier.created_at < processing_jobs.created_at "
+        "OR (earlier.created_at = processing_jobs.created_at AND earlier.id < processing_jobs.id)))"
+    )
+    op.create_index(
+        'uq_processing_jobs_active_document',
+        'processing_jobs',
+        ['document_id'],
+        unique=True,
+        sqlite_where=sa.text(ACTIVE),
+        postgresql_where=sa.text(ACTIVE)
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_processing_jobs_active_document', table_name='processing_jobs')
@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""
+Start script for a Document Parser processing worker (same as `python -m app.worker`).
+"""
+
+from app.worker import main
+
+if __name__ == "__main__":
+    main()
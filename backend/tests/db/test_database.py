@@ -0,0 +1,32 @@
+"""
+Unit tests for the database engine configuration.
+"""
+
+import pytest
+from sqlalchemy import text
+
+from app.db.database import async_database_url, build_engine, pool_status
+
+
+def test_async_database_url_selects_async_drivers():
+    assert async_database_url("sqlite:///./docparser.db") == "sqlite+aiosqlite:///./docparser.db"
+    assert async_database_url("postgres://u:p@db/docparser") == "postgresql+asyncpg://u:p@db/docparser"
+    assert async_database_url("postgresql+psycopg://u@db/x") == "postgresql+psycopg://u@db/x"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_engine_applies_pragmas_and_reports_pool(tmp_path):
+    engine = build_engine({"url": f"sqlite:///{tmp_path / 'app.db'}", "pool_size": 2, "max_overflow": 2})
+    try:
+        async with engine.connect() as conn:
+            pragmas = [
+                (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+                for name in ("journal_mode", "synchronous", "busy_timeout")
+            ]
+            status = pool_status(engine)
+        
+        assert pragmas == ["wal", 1, 5000]
+        assert status["pool"] == "AsyncAdaptedQueuePool"
+        assert (status["size"], status["checked_out"], status["utilisation"]) == (2, 1, 0.25)
+    finally:
+        await engine.dispose()
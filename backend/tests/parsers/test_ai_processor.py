@@ -0,0 +1,63 @@
+import pytest
+
+from app.parsers import ai_processor as ai_processor_module
+from app.parsers.ai_processor import AIProcessor
+from app.parsers.ast_models import DocumentAST, ImageBlock
+from app.services.ai_service import AIService
+
+
+class FakeAIService:
+    """Records structured analysis calls instead of calling the Vision API."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def analyze_image_structured(self, image, context=None, digest=None, force_reanalysis=False):
+        self.calls.append(digest)
+        return {
+            "id": AIService.image_id(context),
+            "description": f"Logo seen on page {context['page']}",
+            "source": {"filename": context["filename"], "page": context["page"], "documentSection": ""}
+        }
+
+    apply_image_context = staticmethod(AIService.apply_image_context)
+
+
+@pytest.fixture
+def fake_ai_service(monkeypatch):
+    service = FakeAIService()
+
+    async def _get_ai_service():
+        return service
+
+    monkeypatch.setattr(ai_processor_module, "get_ai_service", _get_ai_service)
+    return service
+
+@pytest.mark.asyncio
+async def test_ai_processor_analyses_repeated_images_once(fake_ai_service):
+    logo = "bG9nbw=="
+    ast = DocumentAST(images=[
+        ImageBlock(data=logo, format="PNG", source="report.pdf", page=page)
+        for page in range(1, 4)
+    ] + [ImageBlock(data="Y2hhcnQ=", format="PNG", source="report.pdf", page=2)])
+    
+    await AIProcessor().process_ast(ast)
+    
+    assert len(fake_ai_service.calls) == 2
+    assert [image.alt_text for image in ast.images[:3]] == ["Logo seen on page 1"] * 3
+    assert [image.metadata["source"]["page"] for image in ast.images[:3]] == [1, 2, 3]
+    assert [image.metadata["id"] for image in ast.images[:3]] == ["img-1-0", "img-2-0", "img-3-0"]
+
+
+@pytest.mark.asyncio
+async def test_ai_processor_reuses_analyses_across_fragments(fake_ai_service):
+    analyses = {}
+    pages = [DocumentAST(images=[ImageBlock(data="bG9nbw==", format="PNG", source="report.pdf", page=page)])
+             for page in (1, 2)]
+    
+    for fragment in pages:
+        await AIProcessor().process_ast(fragment, analyses=analyses)
+    
+    assert len(fake_ai_service.calls) == 1
+    assert [fragment.images[0].alt_text for fragment in pages] == ["Logo seen on page 1"] * 2
+    assert [fragment.images[0].metadata["source"]["page"] for fragment in pages] == [1, 2]
@@ -0,0 +1,45 @@
+import pickle
+
+from app.parsers.ast_models import BlockType, DocumentAST, TextBlock
+from app.parsers.compact_ast import TextColumns
+
+
+def test_text_columns_round_trip_and_intern_styles():
+    columns = TextColumns()
+    style = {"font": "Helvetica", "size": 12.0, "flags": 0}
+    columns.append(BlockType.HEADING, "Title", level=1, style={"font": "Helvetica", "size": 24.0, "flags": 16}, bbox=(10, 20, 200, 48), page=0)
+    columns.append(BlockType.PARAGRAPH, "First line", style=style, bbox=(10, 60, 180, 72), page=0)
+    columns.append(BlockType.PARAGRAPH, "Second line", style=dict(style), page=1)
+    
+    assert len(columns) == 3
+    assert len(columns.style_table) == 2
+    assert columns.content(1) == "First line"
+    assert list(columns.rows())[0] == (BlockType.HEADING, "Title", 1)
+    
+    blocks = pickle.loads(pickle.dumps(columns)).to_blocks()
+    assert blocks[0] == TextBlock(
+        type=BlockType.HEADING, content="Title", level=1,
+        style={"font": "Helvetica", "size": 24.0, "flags": 16},
+        bbox={"x0": 10.0, "y0": 20.0, "x1": 200.0, "y1": 48.0, "page": 0}
+    )
+    assert blocks[1].style == style and blocks[2].bbox is None
+
+
+def test_document_ast_extend_keeps_text_order_across_representations():
+    first = DocumentAST()
+    first.columns.append(BlockType.PARAGRAPH, "one", style={"font": "A"})
+    second = DocumentAST(textBlocks=[TextBlock(type=BlockType.PARAGRAPH, content="two")])
+    second.columns.append(BlockType.PARAGRAPH, "zero", style={"font": "B"})
+    third = DocumentAST()
+    third.columns.append(BlockType.CODE, "three", style={"font": "A"})
+    
+    first.extend(second)
+    first.extend(third)
+    
+    assert [row[1] for row in first.iter_text()] == ["one", "zero", "two", "three"]
+    assert first.text_block_count == 4
+    assert len(first.columns.style_table) == 3  # A, B and the empty style of "two"
+    
+    first.materialize()
+    assert [block.content for block in first.textBlocks] == ["one", "zero", "two", "three"]
+    assert first.model_dump()["textBlocks"][3]["style"] == {"font": "A"}
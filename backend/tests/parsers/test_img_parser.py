@@ -38,4 +38,14 @@ async def test_img_parser_parse(img_parser, image_file):
     assert "data" in image
     assert "format" in image
     assert image["format"] == "PNG"
-    assert len(image["data"]) > 0  # Base64 encoded data
+    assert image["ref"] is not None  # Digest of the raw bytes in the blob store
+    assert image["data"] is None
+
+@pytest.mark.asyncio
+async def test_img_parser_stores_raw_bytes(img_parser, image_file):
+    ast = await img_parser.parse(image_file)
+    image = ast.images[0]
+    
+    assert bytes(image.get_bytes()) == image_file.read_bytes()
+    assert image.ref in img_parser.blob_store
+    image.release()
@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+import threading
 from pathlib import Path
 
 from app.parsers.pdf_parser import PDFParser
@@ -38,3 +39,203 @@ async def test_pdf_parser_parse(pdf_parser, pdf_file):
     assert "textBlocks" in result
     # Should extract at least some text from our simple PDF
     assert len(result["textBlocks"]) >= 1
+
+@pytest.mark.asyncio
+async def test_pdf_parser_decodes_pages_off_the_event_loop(pdf_parser, pdf_file, monkeypatch):
+    parse_threads = []
+    parse_page = pdf_parser._parse_page
+    
+    def _parse_page(*args):
+        parse_threads.append(threading.current_thread())
+        return parse_page(*args)
+    
+    monkeypatch.setattr(pdf_parser, "_parse_page", _parse_page)
+    ast = await pdf_parser.parse(pdf_file)
+    
+    assert ast.textBlocks
+    assert parse_threads and threading.main_thread() not in parse_threads
+
+@pytest.fixture
+def multipage_pdf_file(tmp_path):
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    
+    path = tmp_path / "multipage.pdf"
+    
+    c = canvas.Canvas(str(path), pagesize=letter)
+    for page in range(6):
+        c.drawString(100, 750, f"Page {page + 1} heading")
+        c.drawString(100, 730, f"Body text for page {page + 1}.")
+        c.showPage()
+    c.save()
+    
+    return path
+
+@pytest.mark.asyncio
+async def test_pdf_parser_parallel_matches_serial(multipage_pdf_file):
+    from app.parsers.process_pool import shutdown_process_pool
+    
+    serial = await PDFParser().parse(multipage_pdf_file)
+    parallel_parser = PDFParser({"parallel_workers": 2, "pages_per_shard": 2, "parallel_min_pages": 1})
+    try:
+        parallel = await parallel_parser.parse(multipage_pdf_file)
+        shards = [fragment async for fragment in parallel_parser.parse_stream(multipage_pdf_file)][1:]
+    finally:
+        shutdown_process_pool()
+    
+    assert parallel_parser._shard_pages(6) == [(0, 2), (2, 4), (4, 6)]
+    assert [shard.units for shard in shards] == [2, 2, 2]
+    assert [block.content for block in parallel.textBlocks] == [block.content for block in serial.textBlocks]
+    assert [block.bbox["page"] for block in parallel.textBlocks] == sorted(block.bbox["page"] for block in serial.textBlocks)
+
+@pytest.mark.asyncio
+async def test_pdf_parser_layout_cache(pdf_file):
+    import fitz
+    from app.parsers.pdf_layout import PageLayout
+    
+    parser = PDFParser({"layout_cache_size": 4})
+    first = await parser.parse(pdf_file)
+    second = await parser.parse(pdf_file)
+    
+    assert len(parser._layout_cache) == 1
+    assert [block.content for block in first.textBlocks] == [block.content for block in second.textBlocks]
+    
+    with fitz.open(str(pdf_file)) as doc:
+        assert PageLayout.from_page(doc[0], 0).text == doc[0].get_text()
+
+@pytest.mark.asyncio
+async def test_pdf_parser_extracts_repeated_xref_once(tmp_path):
+    import fitz
+    from PIL import Image
+    from io import BytesIO
+    
+    png = BytesIO()
+    Image.new('RGB', (20, 20), color='blue').save(png, format="PNG")
+    
+    path = tmp_path / "logo.pdf"
+    doc = fitz.open()
+    xref = 0
+    for _ in range(3):
+        page = doc.new_page()
+        xref = page.insert_image(fitz.Rect(10, 10, 50, 50), stream=png.getvalue(), xref=xref)
+    doc.save(str(path))
+    doc.close()
+    
+    ast = await PDFParser().parse(path)
+    
+    assert len(ast.images) == 3
+    assert len({image.ref for image in ast.images}) == 1
+    assert [image.bbox["page"] for image in ast.images] == [0, 1, 2]
+    for image in ast.images:
+        image.release()
+    assert ast.images[0].ref not in PDFParser().blob_store
+
+@pytest.mark.asyncio
+async def test_pdf_parser_ocrs_scanned_pages(tmp_path, monkeypatch):
+    import fitz
+    from PIL import Image
+    from io import BytesIO
+    from app.parsers import pdf_parser as pdf_parser_module
+    from app.parsers.pdf_ocr import ocr_data_to_blocks, rasterize_page
+    
+    scan = BytesIO()
+    Image.new('L', (200, 260), color=255).save(scan, format="PNG")
+    
+    path = tmp_path / "scan.pdf"
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_image(page.rect, stream=scan.getvalue())
+    doc.save(str(path))
+    doc.close()
+    
+    def fake_recognise(image, page_num, dpi, language, timeout):
+        assert image.size == (1190, 1684)  # A4 page at 144 dpi
+        data = {
+            "text": ["Scanned", "invoice", ""],
+            "conf": [91, 88, -1],
+            "block_num": [1, 1, 1], "par_num": [1, 1, 1], "line_num": [1, 1, 1],
+            "left": [100, 400, 0], "top": [200, 210, 0], "width": [280, 240, 0], "height": [40, 40, 0],
+        }
+        return ocr_data_to_blocks(data, page_num, 72.0 / dpi)
+    
+    render_threads = []
+    
+    def tracked_rasterize(page, dpi):
+        render_threads.append(threading.current_thread())
+        return rasterize_page(page, dpi)
+    
+    monkeypatch.setattr(pdf_parser_module, "recognise_page", fake_recognise)
+    monkeypatch.setattr(pdf_parser_module, "rasterize_page", tracked_rasterize)
+    
+    ast = await PDFParser({"ocr_enabled": True, "ocr_dpi": 144}).parse(path)
+    
+    # Rendering the page stays off the event loop thread
+    assert render_threads and threading.main_thread() not in render_threads
+    assert [block.content for block in ast.textBlocks] == ["Scanned invoice"]
+    assert ast.textBlocks[0].bbox == {"x0": 50.0, "y0": 100.0, "x1": 320.0, "y1": 125.0, "page": 0}
+    assert ast.images == []
+
+@pytest.mark.asyncio
+async def test_pdf_parser_coalesces_wrapped_lines_into_paragraphs(tmp_path):
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    
+    path = tmp_path / "paragraphs.pdf"
+    c = canvas.Canvas(str(path), pagesize=letter)
+    c.setFont("Helvetica-Bold", 18)
+    c.drawString(100, 750, "Introduction")
+    c.setFont("Helvetica", 11)
+    for y, line in ((720, "The parser reads every line of a docu-"), (706, "ment and joins wrapped lines into one"), (692, "paragraph.")):
+        c.drawString(100, y, line)
+    # Indented first line after a wider gap starts the next paragraph
+    c.drawString(118, 664, "A second paragraph starts after a")
+    c.drawString(100, 650, "larger gap.")
+    c.save()
+    
+    ast = await PDFParser().parse(path)
+    lines = await PDFParser({"paragraph_coalescing": False}).parse(path)
+    
+    assert [block.content for block in ast.textBlocks] == [
+        "Introduction",
+        "The parser reads every line of a document and joins wrapped lines into one paragraph.",
+        "A second paragraph starts after a larger gap.",
+    ]
+    assert len(lines.textBlocks) == 6
+    paragraph = ast.textBlocks[1].bbox
+    assert (paragraph["x0"], paragraph["page"]) == (100.0, 0)
+    assert paragraph["y1"] - paragraph["y0"] > 28
+
+@pytest.mark.asyncio
+async def test_pdf_parser_detects_ruled_and_whitespace_tables(tmp_path):
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    
+    path = tmp_path / "tables.pdf"
+    c = canvas.Canvas(str(path), pagesize=letter)
+    c.setFont("Helvetica", 11)
+    c.rect(20, 20, 572, 752)  # Page frame, not a table
+    c.drawString(72, 740, "Quarterly results are summarised below.")
+    xs, ys = [72, 200, 330, 460], [700, 680, 660, 640]
+    for x in xs:
+        c.line(x, ys[0], x, ys[-1])
+    for y in ys:
+        c.line(xs[0], y, xs[-1], y)
+    for r, row in enumerate([["Region", "Q1", "Q2"], ["North", "10", "12"], ["South", "7", "9"]]):
+        for col, text in enumerate(row):
+            c.drawString(xs[col] + 4, ys[r] - 14, text)
+    for r, row in enumerate([["Name", "Role"], ["Ada", "Engineer"], ["Grace", "Admiral"]]):
+        for col, text in enumerate(row):
+            c.drawString(72 + col * 150, 580 - r * 16, text)
+    c.drawString(72, 500, "A closing paragraph of plain prose.")
+    c.save()
+    
+    ast = await PDFParser().parse(path)
+    
+    assert [(table.headers, table.rows) for table in ast.tables] == [
+        (["Region", "Q1", "Q2"], [["North", "10", "12"], ["South", "7", "9"]]),
+        (["Name", "Role"], [["Ada", "Engineer"], ["Grace", "Admiral"]]),
+    ]
+    # Cell text is not repeated as text blocks
+    assert [block.content for block in ast.textBlocks] == [
+        "Quarterly results are summarised below.", "A closing paragraph of plain prose."
+    ]
@@ -48,3 +48,16 @@ async def test_pptx_parser_parse(pptx_parser, pptx_file):
     # Check if content was detected
     paragraphs = [block for block in result["textBlocks"] if block["type"] == "paragraph"]
     assert len(paragraphs) > 0
+
+@pytest.mark.asyncio
+async def test_pptx_parser_parse_stream(pptx_parser, pptx_file):
+    fragments = [fragment async for fragment in pptx_parser.parse_stream(pptx_file)]
+    
+    # Metadata fragment followed by one fragment per slide
+    assert len(fragments) == 2
+    assert fragments[0].metadata["slides"] == 1
+    assert not fragments[0].textBlocks
+    assert [block.content for block in fragments[1].textBlocks] == [
+        "Test Presentation",
+        "This is test content for the presentation."
+    ]
@@ -0,0 +1,50 @@
+import pytest
+
+from app.parsers.ast_models import BlockType, DocumentAST, ImageBlock, MathBlock, TableBlock
+from app.parsers.markdown_generator import MarkdownGenerator
+from app.parsers.reading_order import reading_order_keys
+from app.utils.file_utils import AtomicFileWriter
+
+
+def test_two_column_page_reads_left_column_then_right():
+    boxes = {
+        "title": (50, 40, 550, 60),
+        "right-1": (310, 80, 550, 92), "left-1": (50, 80, 290, 92),
+        "right-2": (310, 100, 550, 112), "left-2": (50, 100, 290, 112),
+        "right-3": (310, 120, 550, 132), "left-3": (50, 120, 290, 132),
+        "footer": (50, 700, 550, 712),
+        "after-footer": (50, 720, 290, 732),
+    }
+    keys = dict(zip(boxes, reading_order_keys(list(boxes.values()))))
+    
+    assert sorted(boxes, key=keys.get) == [
+        "title", "left-1", "left-2", "left-3", "right-1", "right-2", "right-3", "footer", "after-footer"
+    ]
+    # A single stray block on the right does not make a page two-column
+    single = reading_order_keys([(50, 80, 290, 92), (400, 60, 550, 72), (50, 100, 290, 112)])
+    assert sorted(range(3), key=single.__getitem__) == [1, 0, 2]
+
+
+@pytest.mark.asyncio
+async def test_markdown_interleaves_blocks_by_page_position(tmp_path):
+    ast = DocumentAST()
+    ast.columns.append(BlockType.PARAGRAPH, "Page two text", bbox=(50, 100, 300, 112), page=1)
+    ast.columns.append(BlockType.HEADING, "Intro", level=1, bbox=(50, 40, 300, 60), page=0)
+    ast.columns.append(BlockType.PARAGRAPH, "Below the table", bbox=(50, 400, 300, 412), page=0)
+    ast.tables.append(TableBlock(
+        headers=["a", "b"], rows=[["1", "2"]], bbox={"x0": 50, "y0": 200, "x1": 300, "y1": 260, "page": 0}
+    ))
+    ast.images.append(ImageBlock(data="aGVsbG8=", format="PNG", bbox={"x0": 50, "y0": 20, "x1": 100, "y1": 60, "page": 1}))
+    ast.math.append(MathBlock(content="x = 1", bbox={"page": 0}))
+    ast.math.append(MathBlock(content="y = 2"))
+    
+    generator = MarkdownGenerator()
+    markdown = generator.generate(ast)
+    
+    order = ["# Intro", "| a | b |", "Below the table", "$$\nx = 1\n$$", "![Image]", "Page two text", "$$\ny = 2\n$$"]
+    positions = [markdown.index(marker) for marker in order]
+    assert positions == sorted(positions)
+    
+    async with AtomicFileWriter(str(tmp_path / "out.md")) as writer:
+        await generator.write_to(ast, writer)
+    assert (tmp_path / "out.md").read_text(encoding="utf-8") == markdown
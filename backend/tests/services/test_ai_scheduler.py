@@ -0,0 +1,73 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.ai_scheduler import AdaptiveScheduler
+
+
+class RateLimited(Exception):
+    """Stand-in for an API error carrying a 429 response."""
+
+    status_code = 429
+
+    def __init__(self, retry_after: str):
+        super().__init__("rate limited")
+        self.response = httpx.Response(429, headers={"retry-after": retry_after})
+
+
+@pytest.mark.asyncio
+async def test_scheduler_bounds_concurrency():
+    scheduler = AdaptiveScheduler(max_concurrency=3)
+    active = 0
+    peak = 0
+
+    async def call():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return True
+
+    results = await asyncio.gather(*(scheduler.run(call) for _ in range(12)))
+
+    assert all(results)
+    assert peak == 3
+    assert scheduler.stats()["completed_requests"] == 12
+
+
+@pytest.mark.asyncio
+async def test_scheduler_backs_off_on_rate_limit():
+    scheduler = AdaptiveScheduler(max_concurrency=8)
+
+    async def limited():
+        raise RateLimited("0.05")
+
+    with pytest.raises(RateLimited):
+        await scheduler.run(limited)
+
+    assert scheduler.limit == 4
+    assert scheduler.stats()["paused_for_seconds"] > 0
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await scheduler.run(lambda: asyncio.sleep(0))
+    assert loop.time() - start >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_passes_its_slot_on():
+    scheduler = AdaptiveScheduler(max_concurrency=1)
+    await scheduler._acquire_slot()
+    first = asyncio.create_task(scheduler.run(lambda: asyncio.sleep(0)))
+    second = asyncio.create_task(scheduler.run(lambda: asyncio.sleep(0, "done")))
+    await asyncio.sleep(0)
+    assert scheduler.stats()["queued_requests"] == 2
+
+    # Free the slot, then cancel the waiter it went to before that waiter resumes
+    scheduler._release_slot()
+    first.cancel()
+
+    assert await asyncio.wait_for(second, 1) == "done"
+    assert scheduler.stats()["active_requests"] == 0
@@ -0,0 +1,76 @@
+import pytest
+
+from app.core.config import get_openai_config
+from app.services.ai_service import AIService
+from app.services.analysis_cache import AnalysisCache
+
+
+def test_analysis_cache_evicts_least_recently_used(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=0, max_entries=2)
+    cache.set("a", {"description": "first"})
+    cache.set("b", {"description": "second"})
+    assert cache.get("a") == {"description": "first"}
+    
+    cache.set("c", {"description": "third"})
+    
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_cached_analysis_skips_vision_api(tmp_path, monkeypatch):
+    config = {**get_openai_config(), "cache_enabled": True, "cache_path": str(tmp_path / "cache.sqlite3")}
+    service = AIService(config)
+    calls = []
+
+    async def _analyze(image, context=None):
+        calls.append(image)
+        return {
+            "id": "img-1-0",
+            "description": "A chart",
+            "source": {"filename": "a.pdf", "page": 1, "documentSection": ""}
+        }, False
+
+    monkeypatch.setattr(service, "_analyze_image_structured", _analyze)
+    try:
+        first = await service.analyze_image_structured(b"chart", {"filename": "a.pdf", "page": 1})
+        second = await service.analyze_image_structured(b"chart", {"filename": "b.pdf", "page": 4, "index": 2})
+        assert len(calls) == 1
+        assert first["description"] == second["description"] == "A chart"
+        assert second["source"]["filename"] == "b.pdf"
+        assert (first["id"], second["id"]) == ("img-1-0", "img-4-2")
+        
+        await service.analyze_image_structured(b"chart", {"filename": "b.pdf", "page": 4}, force_reanalysis=True)
+        assert len(calls) == 2
+        
+        health = await service.health_check()
+        assert health["checks"]["analysis_cache"]["hits"] == 1
+    finally:
+        await service.close()
+
+
+@pytest.mark.asyncio
+async def test_fallback_analysis_is_not_cached(tmp_path, monkeypatch):
+    config = {**get_openai_config(), "cache_enabled": True, "cache_path": str(tmp_path / "cache.sqlite3")}
+    service = AIService(config)
+    calls = []
+
+    async def _analyze(image, context=None):
+        calls.append(image)
+        return {"id": "img-1-0", "description": "Fallback", "source": {}}, True
+
+    monkeypatch.setattr(service, "_analyze_image_structured", _analyze)
+    try:
+        first = await service.analyze_image_structured(b"chart", {"filename": "a.pdf", "page": 1})
+        await service.analyze_image_structured(b"chart", {"filename": "a.pdf", "page": 1})
+        assert first["description"] == "Fallback"
+        assert len(calls) == 2
+        assert service.cache.stats()["entries"] == 0
+    finally:
+        await service.close()
@@ -0,0 +1,114 @@
+"""
+Unit tests for DocumentProcessor streaming pipeline.
+"""
+
+import hashlib
+
+import fitz
+import pytest
+
+from app.core.config import settings
+from app.parsers import ai_processor as ai_processor_module
+from app.parsers.markdown_generator import MarkdownGenerator
+from app.parsers.txt_parser import TXTParser
+from app.services import document_processor as document_processor_module
+from app.services.document_processor import DocumentProcessor
+from app.utils.blob_store import get_blob_store
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    """DocumentProcessor writing into a temporary markdown directory."""
+    monkeypatch.setattr(settings, "markdown_dir", str(tmp_path / "markdown"))
+
+    async def _no_emit(document_id, progress):
+        return True
+
+    monkeypatch.setattr(document_processor_module, "emit_document_progress", _no_emit)
+    return DocumentProcessor()
+
+
+@pytest.mark.asyncio
+async def test_process_document_streams_markdown_to_file(processor, tmp_path):
+    """Streamed output matches rendering the whole AST at once."""
+    source = tmp_path / "notes.txt"
+    source.write_text("# Title\n\nFirst paragraph.\n\n- item", encoding="utf-8")
+
+    updates = [
+        progress async for progress in processor.process_document(source, "doc-1", enable_ai_processing=False)
+    ]
+
+    completion = updates[-1]
+    assert completion.stage == "completion"
+    expected = MarkdownGenerator().generate(await TXTParser().parse(source))
+    with open(completion.details["markdown_path"], encoding="utf-8") as md_file:
+        assert md_file.read() == expected
+    encoded = expected.encode("utf-8")
+    assert completion.details["markdown_size"] == len(encoded)
+    assert completion.details["markdown_sha256"] == hashlib.sha256(encoded).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_repeated_image_is_analysed_once_per_document(processor, tmp_path, monkeypatch):
+    """An image drawn on every page is analysed once and kept until the document is done."""
+    calls = []
+    
+    class FakeAIService:
+        async def analyze_image_structured(self, image, context=None, digest=None, force_reanalysis=False):
+            calls.append((digest, len(image)))
+            return {"description": "Company logo", "source": {"page": context["page"]}}
+        
+        @staticmethod
+        def apply_image_context(metadata, context):
+            return {**metadata, "source": {"page": context["page"]}}
+    
+    async def _get_ai_service():
+        return FakeAIService()
+    
+    monkeypatch.setattr(ai_processor_module, "get_ai_service", _get_ai_service)
+    
+    logo = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), False)
+    logo.clear_with(200)
+    source = tmp_path / "letters.pdf"
+    pdf = fitz.open()
+    xref = 0
+    for number in range(3):
+        page = pdf.new_page()
+        page.insert_text((72, 200), f"Letter {number + 1}")
+        xref = page.insert_image(fitz.Rect(72, 72, 136, 136), pixmap=logo, xref=xref)
+    pdf.save(source)
+    pdf.close()
+    blobs_before = get_blob_store().stats()["blobs"]
+    
+    updates = [progress async for progress in processor.process_document(source, "doc-1")]
+    
+    assert len(calls) == 1 and calls[0][1] > 0
+    with open(updates[-1].details["markdown_path"], encoding="utf-8") as md_file:
+        assert md_file.read().count("![Company logo]") == 3
+    assert get_blob_store().stats()["blobs"] == blobs_before
+
+
+@pytest.mark.asyncio
+async def test_progress_counts_pages_of_multi_page_shards(processor, tmp_path, monkeypatch):
+    """Shards covering several pages advance progress by their page count."""
+    from app.parsers.ast_models import BlockType, DocumentAST
+    
+    class ShardedParser:
+        async def parse_stream(self, file_path):
+            yield DocumentAST(metadata={"format": "PDF", "pages": 40})
+            for shard in range(4):
+                fragment = DocumentAST()
+                fragment.columns.append(BlockType.PARAGRAPH, f"Shard {shard}", page=shard * 10)
+                fragment.units = 10
+                yield fragment
+    
+    monkeypatch.setattr(processor.parser_factory, "get_parser", lambda path: ShardedParser())
+    source = tmp_path / "report.pdf"
+    source.write_bytes(b"%PDF")
+    
+    updates = [
+        progress async for progress in processor.process_document(source, "doc-1", enable_ai_processing=False)
+    ]
+    
+    parsing = [update.message for update in updates if update.stage == "parsing"][1:]
+    assert parsing == [f"Processed {pages} of 40 sections" for pages in (10, 20, 30, 40)]
@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import importlib.util
+import os
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.database import Base
+from app.models import document, processing_job  # noqa: F401 - registers the tables
+from app.services import document_service as document_service_module
+from app.services.document_service import DocumentService, UploadItem
+from app.utils.file_utils import UploadTooLargeError
+
+
+def load_migration(name: str):
+    """Import a migration module from the versions directory."""
+    path = next((Path(__file__).parents[2] / "migrations" / "versions").glob(f"{name}_*.py"))
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest_asyncio.fixture
+async def db_session(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_service_module.settings, "upload_dir", str(tmp_path / "uploads"))
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'docs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_duplicate_upload_reuses_completed_document(db_session):
+    service = DocumentService(db_session)
+    original = await service.create_document("policy.pdf", b"%PDF-same", ".pdf", "application/pdf")
+    
+    # Not reused while the original is still pending
+    pending_copy = await service.create_document("policy.pdf", b"%PDF-same", ".pdf", "application/pdf")
+    assert pending_copy.file_path != original.file_path
+    
+    await service.update_document(original.id, {
+        "processing_status": "completed",
+        "extracted_text": "# Policy",
+        "markdown_path": "markdown/policy.md",
+        "analysis_results": {"pages": 1}
+    })
+    
+    duplicate = await service.create_document("copy.pdf", b"%PDF-same", ".pdf", "application/pdf")
+    
+    assert duplicate.id != original.id
+    assert duplicate.content_hash == original.content_hash
+    assert duplicate.file_path == original.file_path
+    assert duplicate.processing_status == "completed"
+    assert (duplicate.extracted_text, duplicate.markdown_path) == ("# Policy", "markdown/policy.md")
+    assert duplicate.analysis_results == {"pages": 1}
+    assert duplicate.document_metadata["reused_from"] == original.id
+    
+    # The shared file stays until the last document using it is deleted
+    await service.delete_document(original.id)
+    assert os.path.exists(original.file_path)
+    await service.delete_document(duplicate.id)
+    assert not os.path.exists(original.file_path)
+
+
+@pytest.mark.asyncio
+async def test_dedup_can_be_disabled_per_upload(db_session):
+    service = DocumentService(db_session)
+    original = await service.create_document("a.txt", b"hello", ".txt", "text/plain")
+    await service.update_document(original.id, {"processing_status": "completed"})
+    
+    fresh = await service.create_document("a.txt", b"hello", ".txt", "text/plain", reuse_existing=False)
+    
+    assert fresh.processing_status == "pending"
+    assert fresh.file_path != original.file_path
+
+
+@pytest.mark.asyncio
+async def test_dedup_does_not_reuse_other_users_documents(db_session):
+    service = DocumentService(db_session)
+    original = await service.create_document("a.pdf", b"%PDF-private", ".pdf", "application/pdf", user_id="alice")
+    await service.update_document(original.id, {
+        "processing_status": "completed",
+        "ai_summary": "Alice's notes",
+        "analysis_results": {"pages": 1}
+    })
+    
+    other = await service.create_document("a.pdf", b"%PDF-private", ".pdf", "application/pdf", user_id="bob")
+    anonymous = await service.create_document("a.pdf", b"%PDF-private", ".pdf", "application/pdf")
+    own = await service.create_document("b.pdf", b"%PDF-private", ".pdf", "application/pdf", user_id="alice")
+    
+    assert other.processing_status == "pending"
+    assert other.file_path != original.file_path
+    assert anonymous.processing_status == "pending"
+    assert own.processing_status == "completed"
+    assert await service.find_completed_by_hash(original.content_hash, "bob") is None
+    assert (await service.find_completed_by_hash(original.content_hash, "alice")).id in {original.id, own.id}
+
+
+class SlowUpload:
+    """Async reader that yields once per chunk and tracks concurrent readers."""
+    
+    active = 0
+    peak = 0
+    
+    def __init__(self, data: bytes):
+        self.data = data
+    
+    async def read(self, size: int = -1) -> bytes:
+        SlowUpload.active += 1
+        SlowUpload.peak = max(SlowUpload.peak, SlowUpload.active)
+        await asyncio.sleep(0.01)
+        SlowUpload.active -= 1
+        chunk, self.data = self.data[:size], self.data[size:]
+        return chunk
+
+
+@pytest.fixture(autouse=True)
+def reset_slow_upload():
+    """Start every test with fresh concurrency counters."""
+    SlowUpload.active = 0
+    SlowUpload.peak = 0
+
+
+@pytest.mark.asyncio
+async def test_multiple_uploads_are_stored_concurrently_and_inserted_together(db_session):
+    service = DocumentService(db_session)
+    reused = await service.create_document("old.txt", b"already parsed", ".txt", "text/plain", user_id="user-1")
+    await service.update_document(reused.id, {"processing_status": "completed", "extracted_text": "parsed"})
+    
+    items = [
+        UploadItem(f"file{i}.txt", SlowUpload(f"content {i}".encode()), ".txt", "text/plain")
+        for i in range(5)
+    ]
+    items.append(UploadItem("again.txt", SlowUpload(b"already parsed"), ".txt", "text/plain"))
+    
+    documents = await service.create_documents_from_uploads(items, user_id="user-1", max_concurrency=3)
+    
+    assert SlowUpload.peak == 3
+    assert [doc.original_filename for doc in documents] == [item.filename for item in items]
+    assert all(doc.user_id == "user-1" and doc.created_at for doc in documents)
+    assert documents[0].content_hash == hashlib.sha256(b"content 0").hexdigest()
+    assert documents[-1].processing_status == "completed"
+    assert documents[-1].file_path == reused.file_path
+    assert sorted(os.listdir(os.path.dirname(reused.file_path))) == sorted(
+        os.path.basename(doc.file_path) for doc in [reused, *documents[:5]]
+    )
+
+
+@pytest.mark.asyncio
+async def test_multiple_uploads_roll_back_when_one_file_fails(db_session, tmp_path):
+    service = DocumentService(db_session)
+    items = [
+        UploadItem("small.txt", SlowUpload(b"ok"), ".txt", "text/plain"),
+        UploadItem("large.txt", SlowUpload(b"x" * 64), ".txt", "text/plain"),
+    ]
+    
+    with pytest.raises(UploadTooLargeError):
+        await service.create_documents_from_uploads(items, max_size=16)
+    
+    assert await service.list_documents() == []
+    assert os.listdir(tmp_path / "uploads") == []
+
+
+@pytest.mark.asyncio
+async def test_document_summaries_page_with_keyset_cursor(db_session):
+    service = DocumentService(db_session)
+    created = [
+        await service.create_document(f"doc{i}.txt", f"text {i}".encode(), ".txt", "text/plain", user_id="u1")
+        for i in range(5)
+    ]
+    await service.update_document(created[0].id, {"extracted_text": "large text"})
+    await service.create_document("other.txt", b"other", ".txt", "text/plain", user_id="u2")
+    
+    first, cursor = await service.list_document_summaries(user_id="u1", limit=2)
+    second, cursor = await service.list_document_summaries(user_id="u1", limit=2, cursor=cursor)
+    third, last_cursor = await service.list_document_summaries(user_id="u1", limit=2, cursor=cursor)
+    
+    ids = [row["id"] for row in first + second + third]
+    assert ids == [doc.id for doc in reversed(created)]
+    assert last_cursor is None
+    assert "extracted_text" not in third[-1]
+    
+    with pytest.raises(ValueError):
+        await service.list_document_summaries(cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_keyset_cursor_pages_rows_with_server_default_timestamps(db_session):
+    service = DocumentService(db_session)
+    ids = [
+        (await service.create_document(f"doc{i}.txt", f"text {i}".encode(), ".txt", "text/plain")).id
+        for i in range(3)
+    ]
+    # Rows written before created_at was set in Python hold the server default,
+    # without fractional seconds; one statement gives them all the same second
+    await db_session.execute(text("UPDATE documents SET created_at = CURRENT_TIMESTAMP"))
+    await db_session.execute(text(load_migration("9b4e6f2a8d15").NORMALISE_CREATED_AT))
+    await db_session.commit()
+    
+    seen, cursor = [], None
+    for _ in range(len(ids) + 1):
+        page, cursor = await service.list_document_summaries(limit=1, cursor=cursor)
+        seen += [row["id"] for row in page]
+        if cursor is None:
+            break
+    
+    assert sorted(seen) == sorted(ids)
+    assert cursor is None
+
+
+@pytest.mark.asyncio
+async def test_status_and_markdown_come_without_loading_content(db_session, tmp_path):
+    service = DocumentService(db_session)
+    doc = await service.create_document("report.pdf", b"%PDF", ".pdf", "application/pdf")
+    markdown_file = tmp_path / "report.md"
+    markdown_file.write_text("# Report", encoding="utf-8")
+    await service.update_document(doc.id, {
+        "processing_status": "completed",
+        "markdown_path": str(markdown_file),
+        "markdown_size": 8
+    })
+    db_session.expunge_all()
+    
+    status = await service.get_document_status(doc.id)
+    assert status["processing_status"] == "completed"
+    assert status["markdown_size"] == 8
+    
+    loaded = await service.get_document(doc.id)
+    with pytest.raises(InvalidRequestError):
+        _ = loaded.extracted_text
+    assert await service.read_markdown(loaded) == "# Report"
+    
+    # Documents without a markdown file fall back to the stored text
+    await service.update_document(doc.id, {"markdown_path": None, "extracted_text": "legacy"})
+    db_session.expunge_all()
+    loaded = await service.get_document(doc.id, with_content=True)
+    assert await service.read_markdown(loaded) == "legacy"
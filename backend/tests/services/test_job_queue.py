@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.database import Base
+from app.models import document, processing_job  # noqa: F401 - registers the tables
+from app.models.document import Document
+from app.models.processing_job import ProcessingJob
+from app.services.job_queue import JobQueue
+from app.worker import Worker
+
+
+@pytest_asyncio.fixture
+async def job_queue(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    queue = JobQueue(async_sessionmaker(engine, expire_on_commit=False), lease_seconds=60, retry_delay=30)
+    try:
+        yield queue
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_job_queue_claims_by_priority_once(job_queue):
+    await job_queue.enqueue("doc-low", priority=0)
+    await job_queue.enqueue("doc-high", priority=5)
+    
+    first = await job_queue.claim("worker-a")
+    second = await job_queue.claim("worker-b")
+    
+    assert (first.document_id, second.document_id) == ("doc-high", "doc-low")
+    assert first.status == "running" and first.attempts == 1
+    assert await job_queue.claim("worker-c") is None
+    assert await job_queue.heartbeat(first.id, "worker-a")
+    assert not await job_queue.heartbeat(first.id, "worker-b")
+    assert await job_queue.complete(first.id, "worker-a", {"markdown_path": "out.md"})
+
+
+@pytest.mark.asyncio
+async def test_job_queue_retries_with_backoff_then_fails(job_queue):
+    job = await job_queue.enqueue("doc-1", max_attempts=2)
+    
+    claimed = await job_queue.claim("worker-a")
+    assert await job_queue.fail(claimed.id, "worker-a", "boom", claimed.attempts, claimed.max_attempts)
+    # Backoff keeps the job out of reach until run_after
+    assert await job_queue.claim("worker-a") is None
+    
+    async with job_queue.session_factory() as db:
+        row = await db.get(ProcessingJob, job.id)
+        assert row.status == "pending"
+        row.run_after = None
+        await db.commit()
+    
+    claimed = await job_queue.claim("worker-b")
+    assert claimed.attempts == 2
+    assert not await job_queue.fail(claimed.id, "worker-b", "boom", claimed.attempts, claimed.max_attempts)
+    async with job_queue.session_factory() as db:
+        assert (await db.get(ProcessingJob, job.id)).status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_batch_processing_queues_documents_in_one_batch(job_queue):
+    from app.api.v1.endpoints.processing import BatchProcessingRequest, process_batch
+    
+    async with job_queue.session_factory() as db:
+        for doc_id, status in (("doc-1", "pending"), ("doc-2", "completed"), ("doc-3", "processing")):
+            db.add(Document(
+                id=doc_id, filename=f"{doc_id}.pdf", original_filename=f"{doc_id}.pdf", file_size=1,
+                file_type=".pdf", mime_type="application/pdf", file_path=f"/tmp/{doc_id}.pdf",
+                processing_status=status
+            ))
+        await db.commit()
+        
+        response = await process_batch(
+            BatchProcessingRequest(document_ids=["doc-1", "doc-2", "doc-3", "doc-1", "missing"]), db
+        )
+    
+    assert response.queued == ["doc-1", "doc-2"]
+    assert response.skipped == ["doc-3"]
+    assert response.not_found == ["missing"]
+    
+    progress = await job_queue.batch_progress(response.batch_id)
+    assert progress["total"] == 2 and progress["pending"] == 2
+    
+    job = await job_queue.claim("worker-a")
+    await job_queue.complete(job.id, "worker-a")
+    assert (await job_queue.batch_progress(response.batch_id))["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_document_has_one_active_job(job_queue):
+    from app.api.v1.endpoints.processing import BatchProcessingRequest, process_batch
+    
+    job = await job_queue.enqueue("doc-1")
+    with pytest.raises(IntegrityError):
+        await job_queue.enqueue("doc-1")
+    
+    # The document row still says pending, as if a concurrent request had just queued it
+    async with job_queue.session_factory() as db:
+        db.add(Document(
+            id="doc-1", filename="doc-1.pdf", original_filename="doc-1.pdf", file_size=1,
+            file_type=".pdf", mime_type="application/pdf", file_path="/tmp/doc-1.pdf",
+            processing_status="pending"
+        ))
+        await db.commit()
+        response = await process_batch(BatchProcessingRequest(document_ids=["doc-1"]), db)
+    assert response.skipped == ["doc-1"]
+    
+    claimed = await job_queue.claim("worker-a")
+    await job_queue.complete(claimed.id, "worker-a")
+    assert (await job_queue.enqueue("doc-1")).id != job.id
+
+
+@pytest.mark.asyncio
+async def test_worker_cancels_job_after_losing_its_lease(job_queue, monkeypatch):
+    cancelled = asyncio.Event()
+    
+    async def slow_processing(document_id, **kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    monkeypatch.setattr("app.worker.run_document_processing", slow_processing)
+    job_queue.lease_seconds = 0.3
+    worker = Worker(queue=job_queue, worker_id="worker-a")
+    await job_queue.enqueue("doc-1")
+    job = await job_queue.claim("worker-a")
+    
+    # Another worker reclaims the job, e.g. after a long pause of this one
+    async with job_queue.session_factory() as db:
+        await db.execute(update(ProcessingJob).where(ProcessingJob.id == job.id).values(worker_id="worker-b"))
+        await db.commit()
+    
+    await asyncio.wait_for(worker._run_job(job), 5)
+    
+    assert cancelled.is_set()
+    async with job_queue.session_factory() as db:
+        row = await db.get(ProcessingJob, job.id)
+    assert (row.status, row.worker_id) == ("running", "worker-b")
@@ -0,0 +1,34 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.ocr_pool import OCRPool
+
+
+@pytest.mark.asyncio
+async def test_ocr_pool_runs_off_the_event_loop_with_bounded_workers():
+    pool = OCRPool(max_workers=2, timeout=5)
+    loop_thread = threading.get_ident()
+    release = threading.Event()
+    threads = []
+
+    def blocking_ocr(index):
+        threads.append(threading.get_ident())
+        release.wait(1)
+        return f"page {index}"
+
+    try:
+        jobs = [asyncio.ensure_future(pool.submit(blocking_ocr, index)) for index in range(5)]
+        await asyncio.sleep(0.05)
+        
+        stats = pool.stats()
+        assert stats["running"] == 2
+        assert stats["queued"] == 3
+        
+        release.set()
+        assert await asyncio.gather(*jobs) == [f"page {index}" for index in range(5)]
+        assert loop_thread not in threads
+        assert pool.stats()["completed"] == 5
+    finally:
+        pool.shutdown()
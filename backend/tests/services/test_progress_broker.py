@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from app.services.progress_broker import ProgressBroker
+
+
+@pytest.mark.asyncio
+async def test_broker_drops_oldest_events_for_slow_subscribers():
+    broker = ProgressBroker(max_queue=3)
+    
+    async with broker.subscribe("doc-1") as subscription:
+        for step in range(5):
+            broker.publish("doc-1", {"progress": step * 20})
+        broker.publish("doc-1", {"status": "completed"}, event="status", terminal=True)
+        broker.publish("doc-2", {"progress": 50})
+        
+        received = [item async for item in subscription]
+    
+    assert [item["data"] for item in received] == [{"progress": 60}, {"progress": 80}, {"status": "completed"}]
+    assert received[-1]["event"] == "status"
+    assert subscription.dropped == 3
+    assert broker.stats()["subscribers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_subscription_get_times_out_without_events():
+    broker = ProgressBroker()
+    
+    async with broker.subscribe("doc-1") as subscription:
+        assert await subscription.get(timeout=0.01) is None
+        asyncio.get_running_loop().call_soon(broker.publish, "doc-1", {"progress": 10})
+        assert (await subscription.get(timeout=1))["data"] == {"progress": 10}
+
+
+class FakeRedis:
+    """Minimal Redis pub/sub shared by brokers standing in for separate processes."""
+
+    def __init__(self):
+        self.channels = []
+
+    async def publish(self, channel, message):
+        for queue in self.channels:
+            queue.put_nowait({"type": "message", "channel": channel, "data": message})
+
+    def pubsub(self):
+        redis_client = self
+
+        class PubSub:
+            async def subscribe(self, channel):
+                self.queue = asyncio.Queue()
+                redis_client.channels.append(self.queue)
+
+            async def listen(self):
+                while True:
+                    yield await self.queue.get()
+
+            async def close(self):
+                redis_client.channels.remove(self.queue)
+
+        return PubSub()
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_broker_relays_events_published_by_other_processes():
+    redis_client = FakeRedis()
+    api, worker = ProgressBroker(), ProgressBroker()
+    api.redis_client = worker.redis_client = redis_client
+    
+    async with api.subscribe("doc-1") as subscription:
+        await asyncio.sleep(0)
+        worker.publish("doc-1", {"progress": 40})
+        api.publish("doc-1", {"progress": 50})
+        worker.publish("doc-1", {"status": "completed"}, event="status", terminal=True)
+        
+        received = [item["data"] async for item in subscription]
+    
+    # The API broker's own event is delivered once, not again through Redis
+    assert received == [{"progress": 50}, {"progress": 40}, {"status": "completed"}]
+    assert api.stats()["relayed"] == 2
+    await api.close()
+    await worker.close()
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from app.parsers.ast_models import ParseProgress
+from app.services.progress_emitter import ProgressEmitter
+
+
+class RecordingEmitter(ProgressEmitter):
+    """Records delivered events instead of sending them."""
+
+    def __init__(self, settings=None):
+        super().__init__(settings)
+        self.delivered = []
+        self.gate = asyncio.Event()
+
+    async def _send(self, payload):
+        await self.gate.wait()
+        self.delivered.append((payload["documentId"], payload["message"]))
+
+
+@pytest.mark.asyncio
+async def test_emitter_coalesces_superseded_progress():
+    emitter = RecordingEmitter()
+    
+    for step in range(5):
+        assert await emitter.emit_progress("doc-1", ParseProgress(stage="parsing", progress=step / 10, message=f"step {step}"))
+    await emitter.emit_progress("doc-1", ParseProgress(stage="completion", progress=1.0, message="done"))
+    await emitter.emit_progress("doc-2", ParseProgress(stage="parsing", progress=0.1, message="other"))
+    
+    emitter.gate.set()
+    await emitter.flush(timeout=1)
+    
+    assert emitter.delivered == [("doc-1", "step 4"), ("doc-1", "done"), ("doc-2", "other")]
+    assert emitter.stats()["coalesced"] == 4
+    await emitter.close()
+
+
+@pytest.mark.asyncio
+async def test_emitter_drops_stale_events_but_keeps_terminal_ones():
+    emitter = RecordingEmitter()
+    emitter.max_pending = 2
+    
+    await emitter.emit_progress("doc-1", ParseProgress(stage="error", progress=1.0, message="failed"))
+    await emitter.emit_progress("doc-2", ParseProgress(stage="parsing", progress=0.5, message="stale"))
+    await emitter.emit_progress("doc-3", ParseProgress(stage="parsing", progress=0.5, message="fresh"))
+    await emitter.emit_progress("doc-4", ParseProgress(stage="parsing", progress=0.5, message="newest"))
+    
+    emitter.gate.set()
+    await emitter.flush(timeout=1)
+    
+    delivered = [message for _, message in emitter.delivered]
+    assert "failed" in delivered and "stale" not in delivered
+    assert emitter.stats()["dropped"] >= 1
+    await emitter.close()
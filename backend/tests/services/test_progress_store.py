@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.progress_store import ProgressStore, compute_etag, status_fields
+
+
+@pytest.mark.asyncio
+async def test_progress_store_merges_updates_and_changes_etag():
+    store = ProgressStore()
+    assert await store.get("doc-1") is None
+    
+    await store.update("doc-1", **status_fields({
+        "processing_status": "processing",
+        "processing_started_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "file_path": "ignored"
+    }))
+    first = await store.get("doc-1")
+    await store.update("doc-1", stage="parsing", progress=40.0)
+    second = await store.get("doc-1")
+    
+    assert first["status"] == second["status"] == "processing"
+    assert second["started_at"] == "2026-01-01T00:00:00+00:00"
+    assert (second["stage"], second["progress"]) == ("parsing", 40.0)
+    assert "file_path" not in second
+    assert compute_etag(second) == compute_etag(dict(second))
+    assert compute_etag(first) != compute_etag(second)
+    assert store.stats()["hits"] == 2 and store.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_progress_store_evicts_least_recent_and_expired_entries():
+    store = ProgressStore(max_entries=2, ttl_seconds=60)
+    await store.update("doc-1", status="queued")
+    await store.update("doc-2", status="queued")
+    await store.get("doc-1")
+    await store.update("doc-3", status="queued")
+    
+    assert await store.get("doc-2") is None
+    assert await store.get("doc-1") is not None
+    
+    store.ttl_seconds = 0
+    assert await store.get("doc-3") is None
+    await store.discard("doc-1")
+    assert store.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_progress_store_reconciles_with_stored_status():
+    store = ProgressStore()
+    await store.update("doc-1", status="processing", stage="parsing", progress=40.0)
+    
+    unchanged = await store.reconcile("doc-1", {"status": "processing"})
+    assert (unchanged["stage"], unchanged["progress"]) == ("parsing", 40.0)
+    assert compute_etag(unchanged) == compute_etag(await store.get("doc-1"))
+    
+    # A status change from elsewhere drops the progress of the old status
+    completed = await store.reconcile("doc-1", {"status": "completed", "progress": 100})
+    assert (completed["status"], completed["progress"], completed.get("stage")) == ("completed", 100, None)
+
+
+@pytest.mark.asyncio
+async def test_status_endpoint_sees_jobs_finished_by_other_processes(tmp_path, monkeypatch):
+    import httpx
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    
+    from app.api.v1.endpoints import processing
+    from app.db.database import Base
+    from app.main import app
+    from app.models.document import Document
+    
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'status.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as db:
+        db.add(Document(
+            id="doc-1", filename="doc-1.pdf", original_filename="doc-1.pdf", file_size=1,
+            file_type=".pdf", mime_type="application/pdf", file_path="/tmp/doc-1.pdf",
+            processing_status="completed"
+        ))
+        await db.commit()
+    
+    # This process queued the job; a separate worker completed it
+    store = ProgressStore()
+    await store.update("doc-1", status="queued", progress=0)
+    monkeypatch.setattr(processing, "get_progress_store", lambda: store)
+    monkeypatch.setattr(processing, "AsyncSessionLocal", session_factory)
+    
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://localhost") as client:
+            response = await client.get("/api/v1/processing/doc-1/status")
+            repeat = await client.get(
+                "/api/v1/processing/doc-1/status", headers={"If-None-Match": response.headers["etag"]}
+            )
+    finally:
+        await engine.dispose()
+    
+    assert (response.json()["status"], response.json()["progress"]) == ("completed", 100)
+    assert repeat.status_code == 304
@@ -0,0 +1,53 @@
+"""
+Unit tests for the content-addressed blob store.
+"""
+
+import pytest
+
+from app.parsers.ast_models import ImageBlock
+from app.parsers.pdf_parser import PDFParser
+from app.utils import blob_store as blob_store_module
+from app.utils.blob_store import BlobNotFoundError, BlobStore, get_blob_store, reset_blob_store
+
+
+def test_put_deduplicates_and_counts_references():
+    store = BlobStore()
+    first = store.put(b"image-bytes")
+    second = store.put(b"image-bytes")
+
+    assert first == second == BlobStore.digest(b"image-bytes")
+    assert store.stats()["blobs"] == 1
+
+    store.release(first)
+    assert bytes(store.get(first)) == b"image-bytes"
+    store.release(first)
+    assert first not in store
+    with pytest.raises(BlobNotFoundError):
+        store.get(first)
+
+
+def test_blobs_spill_to_disk_over_memory_budget(tmp_path):
+    store = BlobStore(max_memory_bytes=8, spill_dir=str(tmp_path))
+    small = store.put(b"1234")
+    large = store.put(b"0123456789")
+
+    assert store.stats() == {"blobs": 2, "memory_blobs": 1, "spilled_blobs": 1, "memory_bytes": 4}
+    assert store.get(large) == b"0123456789"
+    assert store.get(large, size=3) == b"012"
+    assert bytes(store.get(small, size=2)) == b"12"
+
+    store.release(large)
+    assert not (tmp_path / large).exists()
+
+
+def test_parsers_and_images_share_the_global_store(monkeypatch):
+    monkeypatch.setattr(blob_store_module, "_blob_store", None)
+    get_blob_store().put(b"parent")
+    store = reset_blob_store()
+
+    assert (store.max_memory_bytes, store.spill_dir, store.stats()["blobs"]) == (None, None, 0)
+    assert PDFParser().blob_store is store is get_blob_store()
+    image = ImageBlock(ref=store.put(b"image-bytes"), format="png")
+    assert image.get_bytes() == b"image-bytes"
+    image.release()
+    assert image.ref not in store
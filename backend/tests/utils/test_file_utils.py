@@ -0,0 +1,70 @@
+"""
+Unit tests for streaming uploads to disk.
+"""
+
+import hashlib
+
+import pytest
+
+from app.utils.file_utils import AtomicFileWriter, UploadTooLargeError, stream_to_file
+
+
+class FakeUpload:
+    """Minimal async reader that records the requested chunk sizes."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.position = 0
+        self.reads = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads.append(size)
+        chunk = self.data[self.position:self.position + size]
+        self.position += len(chunk)
+        return chunk
+
+
+@pytest.mark.asyncio
+async def test_stream_to_file_hashes_in_chunks_and_renames(tmp_path):
+    data = b"0123456789" * 100
+    upload = FakeUpload(data)
+    dest = tmp_path / "uploads" / "doc.pdf"
+
+    stored = await stream_to_file(upload, str(dest), max_size=len(data), chunk_size=64)
+
+    assert dest.read_bytes() == data
+    assert stored.size == len(data)
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    assert set(upload.reads) == {64}
+    assert [p.name for p in dest.parent.iterdir()] == ["doc.pdf"]
+
+
+@pytest.mark.asyncio
+async def test_stream_to_file_rejects_oversized_upload(tmp_path):
+    dest = tmp_path / "doc.pdf"
+
+    with pytest.raises(UploadTooLargeError):
+        await stream_to_file(FakeUpload(b"x" * 100), str(dest), max_size=50, chunk_size=16)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_atomic_file_writer_publishes_only_complete_output(tmp_path):
+    dest = tmp_path / "out" / "doc.md"
+    
+    async with AtomicFileWriter(str(dest), flush_size=4) as writer:
+        await writer.write("# Titel\n\n")
+        await writer.write("Grüße")
+        assert not dest.exists()
+    
+    expected = "# Titel\n\nGrüße".encode("utf-8")
+    assert dest.read_bytes() == expected
+    assert (writer.stored.size, writer.stored.sha256) == (len(expected), hashlib.sha256(expected).hexdigest())
+    
+    with pytest.raises(RuntimeError):
+        async with AtomicFileWriter(str(dest)) as writer:
+            await writer.write("partial")
+            raise RuntimeError("render failed")
+    assert dest.read_bytes() == expected
+    assert sorted(path.name for path in dest.parent.iterdir()) == ["doc.md"]